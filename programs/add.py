@@ -22,7 +22,9 @@ __email__ = "klein.dylan@outlook.com"
 #================================== Modules ==================================#
 
 import argparse
+import csv
 from modules.functions import *
+from modules.add import *
 
 #=============================================================================#
 
@@ -43,6 +45,11 @@ def arguments():
     parser.add_argument("-a", "--attribute_files", dest = "attribute_files",
         type = str, required = False, default = None,
         help = "all files containing the attributes")
+    parser.add_argument("-m", "--max_memory", dest = "max_memory",
+        type = float, required = False, default = None,
+        help = "the memory budget of the node names, in MB, beyond \
+        which they are spilled to temporary files, by default SSN_MAX_MEMORY \
+        or no budget")
 
 
     return parser.parse_args()
@@ -52,6 +59,9 @@ def main():
 
     args = arguments()
 
+    if args.max_memory is not None:
+        set_max_memory(args.max_memory)
+
     fieldnames = ["name", "prefix", "Phylum_Metdb", "Class_Metdb",
     "Order_Metdb", "Family_Metdb", "Genus_Metdb", "Species_Metdb",
     "Trophy", "length", "identifiant", "interproscan"]
@@ -63,17 +73,17 @@ def main():
     writer = csv.DictWriter(f_out, delimiter = ";", fieldnames = fieldnames)
     writer.writeheader()
 
-    name_set = set([])
-    
-    for row in read_csv(args.vertices_file):
-        if row["name"] not in name_set:
-            name_set.add(row["name"])
-    
-    ns = sorted(name_set)
-    i = len(ns)
+    set_phase("read vertices and write rows")
+
+    # the sorted names are merged from sorted runs saved on disk if they
+    # exceed the memory budget
+    ns = sorted_unique(row["name"] for row in read_csv(args.vertices_file))
+    i = 0
 
     for index, n in enumerate(ns):
 
+        i += 1
+
 
         if index == 0:
 
@@ -81,7 +91,7 @@ def main():
             previous_n = "-".join(n.split("-")[0:2])
 
         
-        elif index + 1 <= i:
+        else:
 
 
             if previous_n == "-".join(n.split("-")[0:2]):
@@ -105,29 +115,21 @@ def main():
                     nset = set([n])
                     previous_n = "-".join(n.split("-")[0:2])
 
-        
-        elif index + 1 >= i:
 
+    add_count("vertices", i)
 
-            if previous_n == "-".join(n.split("-")[0:2]):
+    # write the rows of the last strain, which are not followed by another
+    # strain
+    if i:
 
-                nset.add(n)
-                nset = sorted(nset)
-                fn = get_fname(nset[0], files)
+        nset = sorted(nset)
+        fn = get_fname(nset[0], files)
 
-                if fn:
-                    rows = get_rows(nset, fn)
-                    write_rows(writer, rows)
-
-
-            else:
+        if fn:
+            rows = get_rows(nset, fn)
+            write_rows(writer, rows)
 
-                nset = set([n])
-                fn = get_fname(nset[0], files)
-
-                if fn:
-                    rows = get_rows(nset, fn)
-                    write_rows(writer, rows)
+    f_out.close()
 
 
 if __name__ == '__main__':
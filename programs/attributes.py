@@ -23,7 +23,11 @@ __email__ = "klein.dylan@outlook.com"
 #================================== Modules ==================================#
 
 import argparse
+import copy
+import csv
+import os
 from modules.functions import *
+from modules.attributes import *
 
 #=============================================================================#
 
@@ -57,6 +61,14 @@ def main():
     # get arguments
     args = arguments()
 
+    # the rows of the strain are found by their METdb ID, which the output
+    # of tables.py only has if one of its input tables gives it
+    row = next(read_csv(args.table_file), None)
+    if row is None or "1_Metdb_ID" not in row.keys():
+        print("*** ERROR ***")
+        print(f"{args.table_file} does not have a 1_Metdb_ID column")
+        quit()
+
     # get filenames
     file_names = get_files_from_argument(args.annotation_files)
 
@@ -90,7 +102,12 @@ def main():
     reset_dict = copy.deepcopy(seq_dict)
 
     # for each sequence ID in file
-    for seq in read_file(args.seq_file):
+    set_phase("attributes")
+    for index, seq in enumerate(read_file(args.seq_file)):
+
+        if index % 1000 == 0:
+            report_progress("ORFs", index)
+        add_count("ORFs")
 
         # fill the dictionary with the annotation linked to the sequence ID
         seq_dict = fill_seq_dict(seq_dict, an_file, seq)
@@ -0,0 +1,108 @@
+"""
+This script measures the time and peak memory of count.py, attributes.py,
+add.py, filter.py, match.py and network.py on synthetic datasets of
+increasing scales, generated with the functions of generate.py.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+A copy of the GNU General Public License is available at
+http://www.gnu.org/licenses/gpl-3.0.html
+"""
+
+__author__ = "KLEIN Dylan"
+__license__ = "GPL"
+__version__ = "1.0.0"
+__email__ = "klein.dylan@outlook.com"
+
+
+#================================== Modules ==================================#
+
+import argparse
+import os
+from modules.functions import *
+from modules.benchmark import *
+from modules.generate import generate_dataset
+
+#=============================================================================#
+
+
+# the number of strains and of genes by strain of each scale
+SCALES = {
+    "small" : (4, 250),
+    "medium" : (16, 2000),
+    "large" : (64, 10000)
+}
+
+PROGRAMS = ["count", "attributes", "add", "filter", "match", "network"]
+
+
+def arguments():
+    """
+    set arguments
+    """
+
+    parser = argparse.ArgumentParser()
+
+    # Optional arguments
+    parser.add_argument("-s", "--scales", dest = "scales",
+        type = str, required = False, default = ["small"], nargs = "+",
+        choices = list(SCALES),
+        help = "the scales of the synthetic datasets")
+    parser.add_argument("-p", "--programs", dest = "programs",
+        type = str, required = False, default = PROGRAMS, nargs = "+",
+        choices = PROGRAMS,
+        help = "the programs to measure")
+    parser.add_argument("-d", "--work_dir", dest = "work_dir",
+        type = str, required = False, default = "../benchmark",
+        help = "the directory of the datasets and of the program outputs")
+    parser.add_argument("-o", "--output", dest = "output",
+        type = str, required = False, default = "../benchmark/benchmark.tsv",
+        help = "the TSV file where to append the measures")
+    parser.add_argument("-w", "--workers", dest = "workers",
+        type = int, required = False, default = 1,
+        help = "the number of workers of count.py and network.py")
+    parser.add_argument("-sd", "--seed", dest = "seed",
+        type = int, required = False, default = 0,
+        help = "the seed of the random generator")
+
+    return parser.parse_args()
+
+
+def main():
+    """
+    Main program function
+    """
+
+    # get arguments
+    args = arguments()
+
+    for scale in args.scales:
+        nb_strains, nb_genes = SCALES[scale]
+        workspace = os.path.abspath(os.path.join(args.work_dir, scale))
+        data = os.path.join(workspace, "data")
+
+        # a dataset is generated once by scale and seed
+        marker = os.path.join(data, f"seed_{args.seed}")
+        if not os.path.exists(marker):
+            print(f"*** GENERATING {scale} DATASET ***")
+            set_phase(f"{scale} generate")
+            summary = generate_dataset(data, nb_strains, nb_genes,
+                seed = args.seed)
+            with open(marker, "w") as f_out:
+                for k, v in summary.items():
+                    f_out.write(f"{k}\t{v}\n")
+
+        print(f"*** BENCHMARKING {scale} DATASET ***")
+        set_phase(f"{scale} benchmark")
+        rows = benchmark_scale(scale, workspace, args.programs, args.workers)
+        save_benchmark(args.output, rows)
+
+
+if __name__ == '__main__':
+    main()
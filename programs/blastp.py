@@ -0,0 +1,108 @@
+"""
+This script runs the all-vs-all diamond blastp by shards of the query
+FASTA file, so that an interrupted run restarts from the shards not done.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+A copy of the GNU General Public License is available at
+http://www.gnu.org/licenses/gpl-3.0.html
+"""
+
+__author__ = "KLEIN Dylan"
+__license__ = "GPL"
+__version__ = "1.0.0"
+__email__ = "klein.dylan@outlook.com"
+
+
+#================================== Modules ==================================#
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from modules.functions import *
+from modules.blastp import *
+
+#=============================================================================#
+
+
+def arguments():
+    """
+    set arguments
+    """
+
+    parser = argparse.ArgumentParser()
+
+    # Mandatory arguments
+    parser.add_argument("-d", "--db", dest = "db",
+        type = str, required = True,
+        help = "the diamond database")
+    parser.add_argument("-q", "--query", dest = "query",
+        type = isfile, required = True,
+        help = "the query FASTA file")
+    parser.add_argument("-o", "--output", dest = "output",
+        type = str, required = True,
+        help = "the output file")
+
+    # Optional arguments
+    parser.add_argument("-s", "--shards", dest = "shards",
+        type = int, required = False, default = 16,
+        help = "the number of shards of the query FASTA file")
+    parser.add_argument("-j", "--jobs", dest = "jobs",
+        type = int, required = False, default = 1,
+        help = "the number of diamond processes run at the same time")
+    parser.add_argument("-t", "--threads", dest = "threads",
+        type = int, required = False, default = None,
+        help = "the number of threads of each diamond process")
+    parser.add_argument("-e", "--evalue", dest = "evalue",
+        type = float, required = False, default = 1e-5,
+        help = "the maximum e-value")
+    parser.add_argument("-x", "--diamond", dest = "diamond",
+        type = str, required = False, default = "diamond",
+        help = "the diamond executable")
+    parser.add_argument("-wd", "--work_dir", dest = "work_dir",
+        type = str, required = False, default = None,
+        help = "the directory of the shards, by default <output>_shards")
+
+    return parser.parse_args()
+
+
+def main():
+    """
+    Main program function
+    """
+
+    # get arguments
+    args = arguments()
+
+    work_dir = args.work_dir or f"{args.output}_shards"
+
+    # split the query FASTA file into shards balanced by residue count
+    set_phase("split")
+    shards = split_fasta(args.query, args.shards, work_dir)
+    outputs = [f"{shard}.tsv" for shard in shards]
+
+    # run diamond on each shard not done yet, with bounded concurrency
+    set_phase("diamond")
+    with ThreadPoolExecutor(max_workers = args.jobs) as pool:
+        runs = [pool.submit(run_diamond_shard, shard, output, args.diamond,
+            args.db, args.evalue, args.threads)
+            for shard, output in zip(shards, outputs)]
+        done = [r.result() for r in runs]
+
+    print(f"{done.count(True)} shards run, {done.count(False)} shards "
+        "already done")
+
+    add_count("shards", done.count(True))
+
+    # merge the shard outputs in shard order
+    set_phase("merge")
+    merge_files(outputs, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -6,5 +6,6 @@
 #SBATCH --mail-type=ALL
 
 module load diamond/0.9.36
+module load python/3.7
 
-srun  diamond blastp -d metdb_dia_db.dmnd -q cat_tr.fasta -o metdb_ssn -e 1e-5 --sensitive -f 6 qseqid qlen qstart qend sseqid slen sstart send length pident ppos score evalue bitscore
+srun python blastp.py -d metdb_dia_db.dmnd -q cat_tr.fasta -o metdb_ssn -e 1e-5 -s 16 -j 4
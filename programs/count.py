@@ -24,6 +24,7 @@ __email__ = "klein.dylan@outlook.com"
 
 import argparse
 from modules.functions import *
+from modules.count import *
 
 #=============================================================================#
 
@@ -43,6 +44,19 @@ def arguments():
         type = isfile, required = True,
         help = "a file containing paths to all transdecoder files")
 
+    # Optional arguments
+    parser.add_argument("-w", "--workers", dest = "workers",
+        type = int, required = False, default = 1,
+        help = "the number of processes counting the strains")
+    parser.add_argument("-c", "--cache", dest = "cache",
+        type = str, required = False, default = None,
+        help = "a cache directory, to count only new or changed strains")
+    parser.add_argument("-m", "--max_memory", dest = "max_memory",
+        type = float, required = False, default = None,
+        help = "the memory budget of the counts of the strains, in MB, \
+        beyond which the strains counted are saved to free the memory, by \
+        default SSN_MAX_MEMORY or no budget")
+
 
     return parser.parse_args()
 
@@ -55,35 +69,67 @@ def main():
     # get arguments
     args = arguments()
 
+    if args.max_memory is not None:
+        set_max_memory(args.max_memory)
+
     # get file names
     an_files = get_files_from_argument(args.an_files)
     transdecoder_files = get_files_from_argument(args.tr_files)
 
-    # get strain ID from transdecoder filenames
-    strain_ids = get_id(transdecoder_files)
+    # strain IDs listed in records_files, by default those of dtr
+    records_ids = None
+
+    set_phase("count strains")
+
+    if args.cache:
+
+        # count only new or changed strains, the others being read from
+        # the cache
+        dtr, transcript, seq_count, db_count, dan, records_ids = \
+            count_strains_cached(transdecoder_files, an_files, args.workers,
+            args.cache)
+
+    elif args.workers > 1 or get_max_memory() is not None:
 
-    # creates transdecoder dictionary
-    dtr = {}
+        # count each strain with a pool of processes, and merge the
+        # transdecoder, transcript, db_count and annotation dictionaries,
+        # the strains beyond the memory budget being saved as soon as
+        # counted
+        dtr, transcript, seq_count, db_count, dan, records_ids = \
+            count_strains(transdecoder_files, an_files, args.workers)
 
-    # creates annotation dictionary
-    dan = {}
+    else:
 
-    # for each ID create a key in each dictionary
-    for idts in strain_ids:
-        if idts not in dtr.keys():
-            dtr[idts] = {"nb_orf" : 0, "records" : []}
-            dan[idts] = {}
+        # get strain ID from transdecoder filenames
+        strain_ids = get_id(transdecoder_files)
 
-    # fill transdecoder dictionary, create a transcript dictionary containing
-    # the length of each ID, count the number of sequences for all transdecoder
-    # files
-    dtr, transcript, seq_count = fill_dtr(dtr, transdecoder_files)
+        # creates transdecoder dictionary
+        dtr = {}
 
-    # create a db_count dictionary containing the number of each database by
-    # annotation file
-    db_count = db_by_an_file(an_files)
+        # creates annotation dictionary
+        dan = {}
+
+        # for each ID create a key in each dictionary
+        for idts in strain_ids:
+            if idts not in dtr.keys():
+                dtr[idts] = {"nb_orf" : 0, "records" : []}
+                dan[idts] = {}
+
+        # fill transdecoder dictionary, create a transcript dictionary
+        # containing the length of each ID, count the number of sequences for
+        # all transdecoder files
+        dtr, transcript, seq_count = fill_dtr(dtr, transdecoder_files)
+
+        # fill annotation dictionary and create a db_count dictionary
+        # containing the number of each database by annotation file, in a
+        # single pass over each annotation file
+        dan, db_count = count_an_files(dan, an_files)
+
+    add_count("strains", len(dtr if records_ids is None else records_ids))
+    add_count("ORFs", seq_count)
 
     # create and save db_count output
+    set_phase("save")
     output = "../results/db_count.txt"
     save_db_count(output, db_count)
 
@@ -91,12 +137,9 @@ def main():
     output = "../results/seq_count.txt"
     save_seq_count(output, seq_count)
 
-    # fill annotation dictionary
-    dan = fill_dan(dan, an_files)
-
     # save transdecoder dictionary, annotation dictionary,
     # and transcript dictionary
-    save_dtr(dtr)
+    save_dtr(dtr, records_ids)
     save_dan(dan)
     save_transcript(transcript)
 
@@ -0,0 +1,134 @@
+"""
+This script estimates the peak memory and the time of blastp.py, filter.py,
+add.py and network.py from the sizes of their inputs, and prints the
+resources to request to SLURM. The cost models of the stages can be fitted
+again on the runs of benchmark.py.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+A copy of the GNU General Public License is available at
+http://www.gnu.org/licenses/gpl-3.0.html
+"""
+
+__author__ = "KLEIN Dylan"
+__license__ = "GPL"
+__version__ = "1.0.0"
+__email__ = "klein.dylan@outlook.com"
+
+
+#================================== Modules ==================================#
+
+import argparse
+from modules.functions import *
+from modules.estimate import *
+
+#=============================================================================#
+
+
+def arguments():
+    """
+    set arguments
+    """
+
+    parser = argparse.ArgumentParser()
+
+    # Optional arguments
+    parser.add_argument("-q", "--query", dest = "query",
+        type = isfile, required = False, default = None,
+        help = "the query FASTA file of blastp.py")
+    parser.add_argument("-d", "--db", dest = "db",
+        type = isfile, required = False, default = None,
+        help = "the FASTA file or the diamond database of blastp.py, by \
+        default the query")
+    parser.add_argument("-s", "--shards", dest = "shards",
+        type = int, required = False, default = 16,
+        help = "the number of shards of blastp.py")
+    parser.add_argument("-j", "--jobs", dest = "jobs",
+        type = int, required = False, default = 1,
+        help = "the number of diamond processes of blastp.py")
+    parser.add_argument("-n", "--node_file", dest = "node_file",
+        type = isfile, required = False, default = None,
+        help = "the alignments file of filter.py")
+    parser.add_argument("-v", "--vertices_file", dest = "vertices_file",
+        type = isfile, required = False, default = None,
+        help = "the vertices file of add.py and network.py")
+    parser.add_argument("-e", "--edges_file", dest = "edges_file",
+        type = isfile, required = False, default = None, nargs = "+",
+        help = "the edges files of network.py, by default bounded by the \
+        alignments file")
+    parser.add_argument("-nw", "--networks", dest = "networks",
+        type = int, required = False, default = 4,
+        help = "the number of networks built by network.py without the \
+        edges files, one by filtration")
+    parser.add_argument("-sf", "--safety", dest = "safety",
+        type = float, required = False, default = 1.5,
+        help = "the factor applied to the predictions in the requests")
+    parser.add_argument("-m", "--models", dest = "models",
+        type = str, required = False,
+        default = "../results/estimate_models.json",
+        help = "the cost models fitted with --calibrate, the default models \
+        being used if the file does not exist")
+    parser.add_argument("-c", "--calibrate", dest = "calibrate",
+        type = isfile, required = False, default = None,
+        help = "the TSV file of benchmark.py, to fit the cost models on its \
+        runs and save them in the models file")
+    parser.add_argument("-bd", "--benchmark_dir", dest = "benchmark_dir",
+        type = str, required = False, default = "../benchmark",
+        help = "the directory of the datasets of benchmark.py")
+
+    return parser.parse_args()
+
+
+def main():
+    """
+    Main program function
+    """
+
+    # get arguments
+    args = arguments()
+
+    models = load_models(args.models)
+
+    if args.calibrate:
+        set_phase("calibrate")
+        models, points = calibrate_models(models, args.calibrate,
+            args.benchmark_dir)
+        for stage, p in points.items():
+            for scale, features, memory, seconds in p:
+                print(f"{stage}\t{scale}\t{memory} MB\t{seconds} s")
+        save_models(args.models, models)
+        print(f"cost models saved in {args.models}")
+        return
+
+    set_phase("inspect inputs")
+    features, inputs = get_stage_features(args)
+
+    if not features:
+        print("*** ERROR ***")
+        print("You must provide the inputs of at least one stage")
+        quit()
+
+    for file, sizes in inputs.items():
+        sizes = ", ".join(f"{v} {k}" for k, v in sizes.items()
+            if v is not None)
+        print(f"{file} : {sizes}")
+
+    set_phase("estimate")
+    print(f"\nthe --mem and --time requests include a safety factor of "
+        f"{args.safety}")
+    print("stage\tpeak_mb\tseconds\tmem\ttime")
+    for stage, f in features.items():
+        memory, seconds = estimate_stage(models[stage], f)
+        mem, time = format_request(memory, seconds, args.safety)
+        print(f"{stage}\t{memory:.0f}\t{seconds:.0f}\t{mem}\t{time}")
+        add_count("stages")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,7 +2,9 @@
 This script remove repeating nodes with the same information: if node pairs
 A > B and B > A are present, only one of the two pairs is kept. In addition,
 this scripts can also filters a diamond output if minimum coverage and identity
-that are wanted are provided in arguments.
+that are wanted are provided in arguments. The alignments can also be read
+from the standard input or a named pipe, or directly from a diamond process
+launched by this script, so that only the filtered SSNs are written on disk.
 
 This program is free software: you can redistribute it and/or modify
 it under the terms of the GNU General Public License as published by
@@ -25,7 +27,11 @@ __email__ = "klein.dylan@outlook.com"
 #================================== Modules ==================================#
 
 import argparse
+import os
+import subprocess
 from modules.functions import *
+from modules.blastp import get_diamond_command
+from modules.filter import *
 
 #=============================================================================#
 
@@ -39,8 +45,9 @@ def arguments():
 
     # Mandatory arguments
     parser.add_argument("-n", "--node_file", dest = "node_file",
-        type = isfile, required = True,
-        help = "The file containing all nodes")
+        type = isinput, required = False, default = None,
+        help = "The file containing all nodes, \"-\" to read it from the "
+        "standard input, or a named pipe")
 
     # Optional arguments
     parser.add_argument("-ov", "--overlap", dest = "overlap",
@@ -49,6 +56,37 @@ def arguments():
     parser.add_argument("-id", "--identity", dest = "identity",
         type = float, required = False, default = None, nargs = "+",
         help = "the filtration wanted of a diamond output")
+    parser.add_argument("-o", "--output", dest = "output",
+        type = str, required = False, default = None,
+        help = "The prefix of the output files, default to the node file")
+    parser.add_argument("-q", "--query", dest = "query",
+        type = isfile, required = False, default = None,
+        help = "A FASTA file to align with diamond, whose output is filtered "
+        "as it is produced instead of reading the node file")
+    parser.add_argument("-d", "--db", dest = "db",
+        type = isfile, required = False, default = None,
+        help = "The diamond database used with --query")
+    parser.add_argument("-x", "--diamond", dest = "diamond",
+        type = str, required = False, default = "diamond",
+        help = "The diamond executable")
+    parser.add_argument("-e", "--evalue", dest = "evalue",
+        type = float, required = False, default = 1e-5,
+        help = "The maximum e-value of the alignments")
+    parser.add_argument("-t", "--threads", dest = "threads",
+        type = int, required = False, default = None,
+        help = "The number of threads of diamond")
+    parser.add_argument("-r", "--resume", dest = "resume",
+        action = "store_true", required = False, default = False,
+        help = "resume an interrupted filtration from its last checkpoint")
+    parser.add_argument("-ce", "--checkpoint_every", dest = "checkpoint_every",
+        type = float, required = False, default = 600,
+        help = "the number of seconds between two checkpoints of the \
+        filtration of a node file, 0 to disable them")
+    parser.add_argument("-m", "--max_memory", dest = "max_memory",
+        type = float, required = False, default = None,
+        help = "the memory budget of the pairs of nodes already seen, in \
+        MB, beyond which they are spilled to temporary files, by default \
+        SSN_MAX_MEMORY or no budget")
 
     return parser.parse_args()
 
@@ -71,40 +109,114 @@ def main():
     # get arguments
     args = arguments()
 
+    if args.max_memory is not None:
+        set_max_memory(args.max_memory)
+
+    if args.query and args.db:
+        set_phase("diamond and filter")
+        # run diamond and read its alignments on the fly, so that the
+        # unfiltered SSN is never written on disk
+        print("*** RUNNING DIAMOND ***")
+        command = get_diamond_command(args.diamond, args.db, args.query,
+            None, args.evalue, args.threads)
+        process = subprocess.Popen(command, stdout = subprocess.PIPE,
+            text = True)
+        inputfile = process.stdout
+        prefix = args.output or os.path.basename(args.query)
+
+    elif args.node_file and not args.query and not args.db:
+        process = None
+        inputfile = args.node_file
+        if args.output:
+            prefix = args.output
+        elif args.node_file != "-":
+            prefix = args.node_file
+        else:
+            print("*** ERROR ***")
+            print("You must provide an output prefix when reading the "
+                "standard input")
+            quit()
+
+    else:
+        print("*** ERROR ***")
+        print("You must provide a node file, or a query AND a database")
+        quit()
+
     if args.overlap and args.identity:
         print("filtering informations provided")
         print("*** FILTERING FILE ***")
-        ov_len = len(args.overlap)
-        id_len = len(args.identity)
 
+        # every filtration is done in a single pass over the alignments
+        outputs = []
         for i in args.identity:
             for j in args.overlap:
-                print(f"filtering infos ||| coverage : {j}%, identity : {i}%")
-                output = f"{args.node_file}_pcov{int(j)}_pident{int(i)}"
-                al_ssn, al_filt, nb_nssn, nb_nfilt = filter_file(args.node_file, output, j, i)
-                
-                print(f"nb of alignments in base SSN : {al_ssn}")
-                print(f"nb of alignments in filtered SSN : {al_filt}")
-                print(f"nb of aligments removed : {al_ssn - al_filt}")
-                print(f"nb of nodes in base SSN : {nb_nssn}")
-                print(f"nb of nodes in filtered SSN : {nb_nfilt}")
-                print(f"nb of nodes removed : {nb_nssn - nb_nfilt}")
-
-                output_stats = f"{output}_stats"
-                save_stats(output_stats, al_ssn, al_filt, nb_nssn, nb_nfilt)
+                output = f"{prefix}_pcov{int(j)}_pident{int(i)}"
+                outputs.append((output, j, i))
+
+        # a regular node file can be read again from a byte offset, so its
+        # filtration is checkpointed
+        checkpoint, state = None, None
+        if (process is None and inputfile != "-" and os.path.isfile(inputfile)
+            and args.checkpoint_every > 0):
+            checkpoint = f"{prefix}_checkpoint"
+
+        if args.resume:
+            if not checkpoint:
+                print("*** ERROR ***")
+                print("Only the filtration of a node file with checkpoints "
+                    "can be resumed")
+                quit()
+
+            state = load_checkpoint(checkpoint)
+            if state is None:
+                print("No checkpoint found, filtering from the beginning")
+            elif (state["input"] != os.path.abspath(inputfile)
+                or state["size"] != os.path.getsize(inputfile)
+                or state["mtime"] != os.path.getmtime(inputfile)
+                or state["outputs"] != [list(o) for o in outputs]):
+                print("*** ERROR ***")
+                print(f"The checkpoint {checkpoint} does not match the node "
+                    "file or the filtrations")
+                quit()
+            else:
+                print(f"*** RESUMING AFTER {state['al_ssn']} ALIGNMENTS ***")
+
+        set_phase("filter")
+        stats = filter_file(inputfile, outputs, checkpoint, state,
+            args.checkpoint_every)
+        add_count("alignments", stats[0][0])
+
+        for (output, j, i), (al_ssn, al_filt, nb_nssn, nb_nfilt) in zip(
+            outputs, stats):
+            print(f"filtering infos ||| coverage : {j}%, identity : {i}%")
+            print(f"nb of alignments in base SSN : {al_ssn}")
+            print(f"nb of alignments in filtered SSN : {al_filt}")
+            print(f"nb of aligments removed : {al_ssn - al_filt}")
+            print(f"nb of nodes in base SSN : {nb_nssn}")
+            print(f"nb of nodes in filtered SSN : {nb_nfilt}")
+            print(f"nb of nodes removed : {nb_nssn - nb_nfilt}")
+
+            output_stats = f"{output}_stats"
+            save_stats(output_stats, al_ssn, al_filt, nb_nssn, nb_nfilt)
 
     elif not args.overlap and not args.identity:
         # open the node file, and remove repeating nodes, saving each lines
         # in a new output file given in argument
         print("No filtering information provided, removing repeating nodes ...")
-        output = f"{args.node_file}_filtered"
-        remove_repeating_nodes(args.node_file, output)
+        output = f"{prefix}_filtered"
+        set_phase("remove repeating nodes")
+        remove_repeating_nodes(inputfile, output)
 
     else:
         print("*** ERROR ***")
         print("You must provide overlap AND identity filtration parameters")
         quit()
 
+    if process and process.wait() != 0:
+        print("*** ERROR ***")
+        print(f"diamond exited with code {process.returncode}")
+        quit()
+
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
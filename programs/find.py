@@ -24,6 +24,7 @@ __email__ = "klein.dylan@outlook.com"
 
 import argparse
 from modules.functions import *
+from modules.find import *
 
 #=============================================================================#
 
@@ -37,14 +38,22 @@ def arguments():
 
     # Mandatory arguments
     parser.add_argument("-p", "--pattern", dest = "pattern",
-        type = str, required = True,
-        help = "the pattern of the files to be found")
+        type = str, required = True, nargs = "+",
+        help = "the patterns of the files to be found")
     parser.add_argument("-d", "--path", dest = "path",
         type = str, required = True,
         help = "absolute path to directory")
     parser.add_argument("-o", "--output", dest = "output",
-        type = str, required = True,
-        help = "the output file")
+        type = str, required = True, nargs = "+",
+        help = "the output files, one for each pattern")
+
+    # Optional arguments
+    parser.add_argument("-w", "--workers", dest = "workers",
+        type = int, required = False, default = 8,
+        help = "the number of threads listing the directories")
+    parser.add_argument("-c", "--cache", dest = "cache",
+        type = str, required = False, default = None,
+        help = "a JSON file caching the directory listings")
 
     return parser.parse_args()
 
@@ -57,11 +66,21 @@ def main():
     # get arguments
     args = arguments()
 
-    # get all matches in a list
-    result = find_file(args.pattern, args.path)
+    if len(args.pattern) != len(args.output):
+        print("*** ERROR ***")
+        print("You must provide one output file for each pattern")
+        quit()
+
+    # get all matches of each pattern in a list, in a single traversal
+    set_phase("scan")
+    result = find_files(args.pattern, args.path, args.workers, args.cache)
+
+    add_count("files", sum(len(v) for v in result.values()))
 
-    # save in output file
-    save_to_txt(result, args.output)
+    # save each list in its output file
+    set_phase("save")
+    for pattern, output in zip(args.pattern, args.output):
+        save_to_txt(result[pattern], output)
 
 
 if __name__ == '__main__':
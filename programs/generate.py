@@ -0,0 +1,89 @@
+"""
+This script generates a synthetic dataset at a configurable scale, in order
+to measure the performance of the programs without the MMETSP data:
+TransDecoder FASTA files, InterProScan TSV files, a MetDB CSV table, the
+vertices of the SSN and a diamond output with power law family sizes.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+A copy of the GNU General Public License is available at
+http://www.gnu.org/licenses/gpl-3.0.html
+"""
+
+__author__ = "KLEIN Dylan"
+__license__ = "GPL"
+__version__ = "1.0.0"
+__email__ = "klein.dylan@outlook.com"
+
+
+#================================== Modules ==================================#
+
+import argparse
+from modules.functions import *
+from modules.generate import *
+
+#=============================================================================#
+
+
+def arguments():
+    """
+    set arguments
+    """
+
+    parser = argparse.ArgumentParser()
+
+    # Mandatory arguments
+    parser.add_argument("-o", "--output", dest = "output",
+        type = str, required = True,
+        help = "the directory where to save the dataset")
+
+    # Optional arguments
+    parser.add_argument("-n", "--strains", dest = "strains",
+        type = int, required = False, default = 10,
+        help = "the number of strains")
+    parser.add_argument("-g", "--genes", dest = "genes",
+        type = int, required = False, default = 1000,
+        help = "the number of genes by strain")
+    parser.add_argument("-a", "--alpha", dest = "alpha",
+        type = float, required = False, default = 2.5,
+        help = "the exponent of the power law of the family sizes, above 1")
+    parser.add_argument("-mh", "--max_hits", dest = "max_hits",
+        type = int, required = False, default = 50,
+        help = "the maximum number of hits of a protein")
+    parser.add_argument("-s", "--seed", dest = "seed",
+        type = int, required = False, default = 0,
+        help = "the seed of the random generator")
+
+    return parser.parse_args()
+
+
+def main():
+    """
+    Main program function
+    """
+
+    # get arguments
+    args = arguments()
+
+    if args.alpha <= 1:
+        print("*** ERROR ***")
+        print("The exponent of the power law must be above 1")
+        quit()
+
+    set_phase("generate")
+    summary = generate_dataset(args.output, args.strains, args.genes,
+        args.alpha, args.max_hits, args.seed)
+
+    for k, v in summary.items():
+        print(f"nb of {k} : {v}")
+        add_count(k, v)
+
+
+if __name__ == '__main__':
+    main()
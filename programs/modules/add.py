@@ -0,0 +1,117 @@
+"""
+This module file contains the functions necessary for the operation of
+add.py
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+A copy of the GNU General Public License is available at
+http://www.gnu.org/licenses/gpl-3.0.html
+"""
+
+__author__ = "KLEIN Dylan"
+__license__ = "GPL"
+__version__ = "1.0.0"
+__email__ = "klein.dylan@outlook.com"
+
+
+#================================== Modules ==================================#
+
+import re
+from modules.functions import read_csv
+
+#=============================================================================#
+
+
+def get_fname(n, files):
+    """
+    Retrieves the file name containing the attributes of an ORF ID
+
+    Parameters
+    ----------
+
+        n : an ORF ID
+        files : a list of filenames
+
+    Returns
+    -------
+
+        file : the file containing the attributes of the ORF ID
+    """
+
+    for file in files:
+        i = "-".join(n.split("-")[0:2])
+        if re.search(i, file):
+            return file
+
+
+def get_prefix(n):
+    """
+    Retrieves the ORF prefix based on an ORF ID
+
+    Parameters
+    ----------
+
+        n : an ORF ID
+
+    Returns
+    -------
+
+        an ORF ID prefix
+    """
+
+    pr = n.replace("-", ".").split(".")[0:5]
+
+    if pr[3] == "Transcript":
+        return "-".join(pr)
+    else:
+        del pr[-1]
+        return "-".join(pr)
+
+
+def get_rows(nset, file):
+    """
+    Retrieves a list of rows containing the ORF name, prefix and attributes
+
+    Parameters
+    ----------
+
+        nset : a set of ORF IDs
+        file : the file where to search the ORFs
+
+    Returns
+    -------
+
+        rlist : a list of rows
+    """
+
+    rlist = []
+    
+    for row in read_csv(file):
+        if row["peptides"] in nset:
+            row["name"] = row["peptides"]
+            row["prefix"] = get_prefix(row["peptides"])
+            row.pop("peptides")
+            rlist.append(row)
+
+    return rlist
+
+
+def write_rows(writer, rows):
+    """
+    Writes all rows contained in a list of rows in a file
+
+    Parameters
+    ----------
+
+        writer : a csv.DictWriter
+        rows : a list of rows
+    """
+
+    for row in rows:
+        writer.writerow(row)
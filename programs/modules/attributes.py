@@ -0,0 +1,163 @@
+"""
+This module file contains the functions necessary for the operation of
+attributes.py
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+A copy of the GNU General Public License is available at
+http://www.gnu.org/licenses/gpl-3.0.html
+"""
+
+__author__ = "KLEIN Dylan"
+__license__ = "GPL"
+__version__ = "1.0.0"
+__email__ = "klein.dylan@outlook.com"
+
+
+#================================== Modules ==================================#
+
+from modules.functions import get_id, read_as_tsv_file, read_csv
+
+#=============================================================================#
+
+
+def add_keys_to_seq_dict(k, name, table_file):
+    """
+    Create a dictionary containing taxonomy and trophic information
+
+    Parameters
+    ----------
+
+        k : a list of fieldnames
+        name : an ID
+        table_file : a CSV file
+
+    Returns
+    -------
+
+        seq_dict : a dictionary containing all keys, the taxonomy, and the 
+        trophy information
+    """
+
+    seq_dict = {}.fromkeys(set(k))
+
+    for row in read_csv(table_file):
+        if row["1_Metdb_ID"] == name.upper():
+            for key, v in row.items():
+                if key in seq_dict.keys():
+                    seq_dict[key] = v
+
+    for key, val in seq_dict.items():
+        if not val and key != "peptides":
+            seq_dict[key] = []
+
+    return seq_dict
+
+
+def check_value_in_row(row, seq_dict):
+    """
+    Fill a dictionary where values of specific keys are initiated lists
+
+    Parameters
+    ----------
+
+        row : a dictionary containing the data
+        seq_dict : the dictionary we want to fill
+
+    Returns
+    -------
+
+        seq_dict : the dictionary filled
+    """
+
+    for key, value in row.items():
+        if key in seq_dict and value not in seq_dict[key]:
+            if value == None:
+                if "NA" not in seq_dict[key]:
+                    seq_dict[key].append("NA")
+            else:
+                seq_dict[key].append(value)
+
+    return seq_dict
+
+
+def fill_seq_dict(seq_dict, an_file, seq):
+    """
+    Fill the dictionary with the annotation linked to the sequence ID
+
+    Parameters
+    ----------
+
+        seq_dict : the dictionary we want to fill
+        an_file : the file containing the data
+        seq : the ID
+
+    Returns
+    -------
+
+        seq_dict : the dictionary filled
+    """
+
+    seq_dict["peptides"] = seq
+    for an in read_as_tsv_file(an_file):
+        if an["peptides"] == seq:
+            seq_dict = check_value_in_row(an, seq_dict)
+
+    seq_dict = replace_values(seq_dict)
+
+    return seq_dict
+
+
+def get_an_file(seq_file, an_filenames):
+    """
+    Retrives the ID and annotation file linked to the seq_file
+
+    Parameters
+    ----------
+
+        seq_file : the dictionary we want to fill
+        an_filenames : the file containing the data
+
+    Returns
+    -------
+
+        file : the annotation file linked to the seq_file
+        name : the ID linked to the seq_file
+    """
+
+    name = seq_file.split("/")[-1].strip("_records.txt")
+    
+    for file in an_filenames:
+        i = get_id(file)
+        if i == name:
+            return file, name
+
+
+def replace_values(seq_dict):
+    """
+    Replace values of a sequence dictionary
+
+    Parameters
+    ----------
+
+        seq_dict : a dictionary
+
+    Returns
+    -------
+
+        seq_dict : the dictionary completed
+    """
+
+    for k, v in seq_dict.items():
+        if not seq_dict[k]:
+            seq_dict[k] = "NA"
+        elif seq_dict[k] and type(v) == list:
+            seq_dict[k] = "|".join(v)
+
+    return seq_dict
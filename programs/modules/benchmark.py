@@ -0,0 +1,255 @@
+"""
+This module file contains the functions necessary for the operation of
+benchmark.py
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+A copy of the GNU General Public License is available at
+http://www.gnu.org/licenses/gpl-3.0.html
+"""
+
+__author__ = "KLEIN Dylan"
+__license__ = "GPL"
+__version__ = "1.0.0"
+__email__ = "klein.dylan@outlook.com"
+
+
+#================================== Modules ==================================#
+
+import glob
+import gzip
+import os
+import shutil
+import subprocess
+import sys
+import time
+from modules.functions import get_files_from_argument
+
+#=============================================================================#
+
+
+def benchmark_scale(scale, workspace, programs, workers = 1):
+    """
+    Runs the programs on a synthetic dataset, in the order of the workflow,
+    each program being timed with its peak memory
+
+    Parameters
+    ----------
+
+        scale : the name of the scale
+        workspace : the directory containing the data directory of the
+        dataset, the results and run directories being created in it
+        programs : the names of the programs to measure
+        workers : the number of workers of the programs running in parallel
+
+    Returns
+    -------
+
+        rows : a list of dictionaries containing the scale, program, time in
+        seconds, peak memory in MB and status of each program run
+    """
+
+    py = sys.executable
+    path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    data = os.path.join(workspace, "data")
+    results = os.path.join(workspace, "results")
+    run = os.path.join(workspace, "run")
+    logs = os.path.join(workspace, "logs")
+
+    for d in [results, run, logs]:
+        if os.path.exists(d):
+            shutil.rmtree(d)
+        os.makedirs(d)
+
+    # the programs run in this order, since each one needs the outputs of
+    # the previous ones
+    steps = [
+        ("count", lambda: [[py, f"{path}/count.py", "-a",
+            f"{data}/an_files.txt", "-t", f"{data}/tr_files.txt", "-w",
+            str(workers)]]),
+        ("attributes", lambda: [[py, f"{path}/attributes.py", "-s", f, "-a",
+            f"{data}/an_files.txt", "-t", f"{data}/metdb.csv"]
+            for f in get_files_from_argument(f"{data}/records_files")]),
+        ("add", lambda: [[py, f"{path}/add.py", "-v", f"{data}/vertices.csv",
+            "-o", "nodes.csv", "-a", list_attribute_files(results, run)]]),
+        ("filter", lambda: [[py, f"{path}/filter.py", "-n",
+            f"{data}/diamond.tsv", "-o", "raw_ssn", "-ov", "80", "-id", "40"]]),
+        ("match", lambda: [[py, f"{path}/match.py", "-f",
+            compress_file(f"{data}/diamond.tsv"), "-p", "MMETSP", "-o",
+            "match.tsv.gz"]]),
+        ("network", lambda: [[py, f"{path}/network.py", "-e",
+            write_network_edges("raw_ssn_pcov80_pident40",
+            "metdb_ssn_pcov80_pident40"), "-v", "nodes.csv", "-p",
+            str(workers)]])
+    ]
+
+    rows = []
+    cwd = os.getcwd()
+    os.chdir(run)
+
+    try:
+        for program, commands in steps:
+            if program not in programs:
+                continue
+
+            # the time and memory of a program run several times, like
+            # attributes.py once by strain, are its total time and its
+            # largest peak memory
+            seconds, peak, status = 0, 0, "ok"
+            with open(f"{logs}/{program}.log", "w") as log:
+                for command in commands():
+                    t, m, code = run_measured(command, log)
+                    seconds += t
+                    peak = max(peak, m)
+                    if code != 0:
+                        status = f"failed ({code})"
+                        break
+
+            rows.append({"scale" : scale, "program" : program,
+                "seconds" : round(seconds, 3), "peak_mb" : round(peak, 1),
+                "status" : status})
+            print(f"{scale}\t{program}\t{seconds:.2f} s\t{peak:.1f} MB\t"
+                f"{status}")
+
+    finally:
+        os.chdir(cwd)
+
+    return rows
+
+
+def compress_file(file):
+    """
+    Compresses a file with gzip, if not already done
+
+    Parameters
+    ----------
+
+        file : a file
+
+    Returns
+    -------
+
+        output : the compressed file
+    """
+
+    output = f"{file}.gz"
+
+    if not os.path.exists(output):
+        with open(file, "rb") as f_in, gzip.open(output, "wb") as f_out:
+            shutil.copyfileobj(f_in, f_out, 1 << 20)
+
+    return output
+
+
+def list_attribute_files(results, run):
+    """
+    Lists the attributes files written by attributes.py in a file
+
+    Parameters
+    ----------
+
+        results : the results directory
+        run : the directory where to save the list
+
+    Returns
+    -------
+
+        output : the file listing the attributes files
+    """
+
+    output = os.path.join(run, "attribute_files.txt")
+
+    with open(output, "w") as f_out:
+        for f in sorted(glob.glob(f"{results}/attributes/*_attributes.txt")):
+            f_out.write(f"{f}\n")
+
+    return output
+
+
+def run_measured(command, log):
+    """
+    Runs a command, measuring its time and peak memory
+
+    Parameters
+    ----------
+
+        command : the command line as a list
+        log : the open file where to write the output of the command
+
+    Returns
+    -------
+
+        seconds : the elapsed time in seconds
+        peak : the peak resident memory of the command in MB
+        code : the return code of the command
+    """
+
+    start = time.perf_counter()
+    process = subprocess.Popen(command, stdout = log,
+        stderr = subprocess.STDOUT)
+    pid, status, usage = os.wait4(process.pid, 0)
+    seconds = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+
+    # ru_maxrss is in kilobytes on Linux
+    return seconds, usage.ru_maxrss / 1024, process.returncode
+
+
+def save_benchmark(file, rows):
+    """
+    Appends the benchmark rows to a TSV file, writing its header if the file
+    is new
+
+    Parameters
+    ----------
+
+        file : the TSV file
+        rows : a list of dictionaries containing the scale, program, time,
+        peak memory and status of each program run
+    """
+
+    fieldnames = ["date", "scale", "program", "seconds", "peak_mb", "status"]
+    new = not os.path.exists(file)
+    date = time.strftime("%Y-%m-%d %H:%M:%S")
+
+    with open(file, "a") as f_out:
+        if new:
+            f_out.write("\t".join(fieldnames) + "\n")
+        for row in rows:
+            row = dict(row, date = date)
+            f_out.write("\t".join(str(row[k]) for k in fieldnames) + "\n")
+
+
+def write_network_edges(inputfile, outputfile):
+    """
+    Converts a filtered diamond output into the edges file read by
+    network.py, separated by ";" with a header
+
+    Parameters
+    ----------
+
+        inputfile : the filtered diamond output
+        outputfile : the edges file
+
+    Returns
+    -------
+
+        outputfile : the edges file
+    """
+
+    fieldnames = ["qseqid", "qlen", "qstart", "qend", "sseqid", "slen",
+    "sstart", "send", "length", "pident", "ppos", "score", "evalue",
+    "bitscore"]
+
+    with open(inputfile, "r") as f_in, open(outputfile, "w") as f_out:
+        f_out.write(";".join(fieldnames) + "\n")
+        for line in f_in:
+            f_out.write(line.replace("\t", ";"))
+
+    return outputfile
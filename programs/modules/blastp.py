@@ -0,0 +1,193 @@
+"""
+This module file contains the functions necessary for the operation of
+blastp.py
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+A copy of the GNU General Public License is available at
+http://www.gnu.org/licenses/gpl-3.0.html
+"""
+
+__author__ = "KLEIN Dylan"
+__license__ = "GPL"
+__version__ = "1.0.0"
+__email__ = "klein.dylan@outlook.com"
+
+
+#================================== Modules ==================================#
+
+import json
+import os
+import shutil
+import subprocess
+from subprocess import DEVNULL
+from modules.functions import (get_balanced_chunks, open_file,
+    read_fasta_lengths)
+
+#=============================================================================#
+
+
+def get_diamond_command(diamond, db, query, output, evalue, threads):
+    """
+    Retrieves the diamond blastp command line of the SSN
+
+    Parameters
+    ----------
+
+        diamond : the diamond executable
+        db : the diamond database
+        query : the query FASTA file
+        output : the output file, None to write on the standard output
+        evalue : the maximum e-value
+        threads : the number of threads of diamond, None for its default
+
+    Returns
+    -------
+
+        command : the command line as a list
+    """
+
+    fieldnames = ["qseqid", "qlen", "qstart", "qend", "sseqid", "slen",
+    "sstart", "send", "length", "pident", "ppos", "score", "evalue",
+    "bitscore"]
+
+    command = [diamond, "blastp", "-d", db, "-q", query, "-e", str(evalue),
+        "--sensitive", "-f", "6"]
+    command += fieldnames
+    if output:
+        command += ["-o", output]
+    if threads:
+        command += ["--threads", str(threads)]
+
+    return command
+
+
+def merge_files(files, output):
+    """
+    Concatenates several files into one, replacing the output only once
+    fully written
+
+    Parameters
+    ----------
+
+        files : the files to concatenate
+        output : the output file
+    """
+
+    with open(f"{output}.tmp", "wb") as f_out:
+        for file in files:
+            with open(file, "rb") as f_in:
+                shutil.copyfileobj(f_in, f_out, 1 << 20)
+
+    os.replace(f"{output}.tmp", output)
+
+
+def run_diamond_shard(shard, output, diamond, db, evalue, threads):
+    """
+    Runs diamond blastp on a query shard, unless the shard is already done.
+    The output is written under a temporary name and a .done file is
+    created once diamond succeeded, so that an interrupted shard is run
+    again on restart.
+
+    Parameters
+    ----------
+
+        shard : the query FASTA shard
+        output : the output file of the shard
+        diamond : the diamond executable
+        db : the diamond database
+        evalue : the maximum e-value
+        threads : the number of threads of diamond, None for its default
+
+    Returns
+    -------
+
+        True if diamond was run, False if the shard was already done
+    """
+
+    if os.path.exists(f"{output}.done") and os.path.exists(output):
+        return False
+
+    command = get_diamond_command(diamond, db, shard, f"{output}.tmp",
+        evalue, threads)
+    subprocess.run(command, stdout = DEVNULL, check = True)
+
+    os.replace(f"{output}.tmp", output)
+    open(f"{output}.done", "w").close()
+
+    return True
+
+
+def split_fasta(file, nb_shards, shards_dir):
+    """
+    Splits a FASTA file into shards balanced by residue count, unless the
+    shards of this file already exist. The shards and the outputs of an
+    other split are removed first, so that they are not taken as done
+
+    Parameters
+    ----------
+
+        file : the query FASTA file
+        nb_shards : the number of shards
+        shards_dir : the directory where to save the shards
+
+    Returns
+    -------
+
+        shards : the list of shard files
+    """
+
+    os.makedirs(shards_dir, exist_ok = True)
+
+    st = os.stat(file)
+    manifest = {"file" : os.path.abspath(file), "size" : st.st_size,
+        "mtime" : st.st_mtime_ns, "nb_shards" : nb_shards}
+    manifest_file = f"{shards_dir}/shards.json"
+
+    if os.path.exists(manifest_file):
+        with open(manifest_file, "r") as f_in:
+            old = json.load(f_in)
+        shards = old.pop("shards", None)
+        if old == manifest and shards is not None:
+            return [f"{shards_dir}/shard_{i}.fasta" for i in range(shards)]
+        os.remove(manifest_file)
+
+    for name in os.listdir(shards_dir):
+        if name.startswith("shard_"):
+            os.remove(f"{shards_dir}/{name}")
+
+    # assign each record to a shard, the longest records first
+    lengths = [length for seq_id, length in read_fasta_lengths(file)]
+    chunks = get_balanced_chunks(lengths, nb_shards)
+    shard_of = [0] * len(lengths)
+    for i, chunk in enumerate(chunks):
+        for k in chunk:
+            shard_of[k] = i
+
+    shards = [f"{shards_dir}/shard_{i}.fasta" for i in range(len(chunks))]
+    outs = [open(shard, "wb") for shard in shards]
+
+    try:
+        index = -1
+        with open_file(file, "rb") as f_in:
+            for line in f_in:
+                if line.startswith(b">"):
+                    index += 1
+                if index >= 0:
+                    outs[shard_of[index]].write(line)
+    finally:
+        for f_out in outs:
+            f_out.close()
+
+    # fewer shards than requested are made if there are fewer records
+    manifest["shards"] = len(shards)
+    with open(manifest_file, "w") as f_out:
+        json.dump(manifest, f_out)
+
+    return shards
@@ -0,0 +1,615 @@
+"""
+This module file contains the functions necessary for the operation of
+count.py
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+A copy of the GNU General Public License is available at
+http://www.gnu.org/licenses/gpl-3.0.html
+"""
+
+__author__ = "KLEIN Dylan"
+__license__ = "GPL"
+__version__ = "1.0.0"
+__email__ = "klein.dylan@outlook.com"
+
+
+#================================== Modules ==================================#
+
+import gzip
+import json
+import multiprocessing as mp
+import os
+from modules.functions import (get_file_hash, get_id, get_max_memory,
+    get_size, read_fasta_lengths, read_tsv_columns, report_progress, save_ids)
+
+#=============================================================================#
+
+
+def count_an_files(dan, an_files):
+    """
+    Retrieves the count of each database and fills the annotation dictionary
+    for each annotation file, in a single pass over each file reading only
+    the peptides and database columns
+
+    Parameters
+    ----------
+
+        dan : initiated annotation dictionary
+        an_files : all annotation files
+
+    Returns
+    -------
+
+        dan : annotation dictionary filled
+        db_count : a dictionary containing the count of each database by file
+    """
+
+    db_count = {}
+
+    for file in an_files:
+
+        name = get_id(file)
+        if name not in dan.keys():
+            dan[name] = {}
+
+        dbs, peps = {}, {}
+
+        for pep, db in read_tsv_columns(file, ["peptides", "database"]):
+
+            if db not in dbs:
+                dbs[db] = 0
+            dbs[db] += 1
+
+            if pep not in peps:
+                peps[pep] = 0
+            peps[pep] += 1
+
+        db_count[name] = dbs
+        dan[name].update(peps)
+
+    return dan, db_count
+
+
+def count_strain(task):
+    """
+    Counts the ORFs, transcript lengths, databases and annotations of one
+    strain
+
+    Parameters
+    ----------
+
+        task : a tuple containing the strain ID, its transdecoder files and
+        its annotation files
+
+    Returns
+    -------
+
+        name : the strain ID
+        dtr : transdecoder dictionary of the strain
+        transcript : dictionary containing the length by sequence ID
+        seq_count : the number of sequences of the strain
+        db_count : a dictionary containing the count of each database
+        dan : annotation dictionary of the strain
+    """
+
+    name, tr_files, an_files = task
+
+    dtr = {name : {"nb_orf" : 0, "records" : []}}
+    dtr, transcript, seq_count = fill_dtr(dtr, tr_files)
+    dan, db_count = count_an_files({}, an_files)
+
+    return name, dtr, transcript, seq_count, db_count, dan
+
+
+def count_strains(transdecoder_files, an_files, workers):
+    """
+    Counts the ORFs, transcript lengths, databases and annotations of all
+    strains, each strain being processed by a pool of processes, and merges
+    the results in the order of the files given. Beyond the memory budget,
+    the strains counted are saved and removed from the results
+
+    Parameters
+    ----------
+
+        transdecoder_files : all transdecoder files
+        an_files : all annotation files
+        workers : the number of processes
+
+    Returns
+    -------
+
+        dtr : transdecoder dictionary of the strains to save
+        transcript : dictionary containing the length by sequence ID of the
+        strains to save
+        seq_count : the total number of sequences
+        db_count : a dictionary containing the count of each database by file
+        dan : annotation dictionary of the strains to save
+        tr_ids : the IDs of all strains having a transdecoder file
+    """
+
+    tasks, tr_ids, an_ids = get_strain_tasks(transdecoder_files, an_files)
+    names = [t[0] for t in tasks]
+    budget = get_max_memory()
+
+    results = {}
+    size, pending = 0, []
+    with mp.Pool(workers) as pool:
+        for r in pool.imap_unordered(count_strain, tasks):
+            results[r[0]] = r[1:]
+            report_progress("strains", len(results))
+
+            if budget is None:
+                continue
+
+            size += get_size(r)
+            pending.append(r[0])
+            if size > budget:
+                for name in pending:
+                    results[name] = save_strain(name, results[name], tr_ids)
+                size, pending = 0, []
+
+    dtr, transcript, db_count, dan = {}, {}, {}, {}
+    seq_count = 0
+
+    for name in tr_ids:
+        s_dtr, s_transcript, s_count = results[name][0:3]
+        if s_dtr is not None:
+            dtr.update(s_dtr)
+            transcript.update(s_transcript)
+        seq_count += s_count
+
+    for name in an_ids:
+        db_count.update(results[name][3])
+
+    for name in names:
+        if results[name][4] is not None:
+            dan[name] = results[name][4].get(name, {})
+
+    return dtr, transcript, seq_count, db_count, dan, tr_ids
+
+
+def count_strains_cached(transdecoder_files, an_files, workers, cache):
+    """
+    Counts the ORFs, transcript lengths, databases and annotations of the
+    new or changed strains only, using a manifest of the input files and a
+    cache of the results of each strain
+
+    Parameters
+    ----------
+
+        transdecoder_files : all transdecoder files
+        an_files : all annotation files
+        workers : the number of processes
+        cache : the cache directory
+
+    Returns
+    -------
+
+        dtr : transdecoder dictionary of the strains to save
+        transcript : dictionary containing the length by sequence ID of the
+        strains to save
+        seq_count : the total number of sequences
+        db_count : a dictionary containing the count of each database by file
+        dan : annotation dictionary of the strains to save
+        tr_ids : the IDs of all strains having a transdecoder file
+    """
+
+    if not os.path.exists(cache):
+        os.makedirs(cache)
+
+    tasks, tr_ids, an_ids = get_strain_tasks(transdecoder_files, an_files)
+    manifest = load_manifest(cache)
+    files, strains = manifest["files"], manifest["strains"]
+
+    task_files = {name : (tr, an) for name, tr, an in tasks}
+    stale, reload = [], []
+
+    for name, tr, an in tasks:
+
+        # check every file, to update the signature of each one
+        changed = [is_file_changed(f, files) for f in tr + an]
+        entry = strains.get(name)
+
+        if (any(changed) or not entry or entry["tr_files"] != tr
+            or entry["an_files"] != an
+            or not os.path.exists(f"{cache}/{name}.json.gz")):
+            stale.append((name, tr, an))
+
+        elif not os.path.exists(f"../results/{name}/{name}_annotation_count.txt"):
+            reload.append(name)
+
+    if workers > 1 and len(stale) > 1:
+        with mp.Pool(workers) as pool:
+            results = list(pool.imap_unordered(count_strain, stale))
+    else:
+        results = list(map(count_strain, stale))
+
+    data = {}
+
+    for name, s_dtr, s_transcript, s_count, s_db, s_dan in results:
+        data[name] = {"dtr" : s_dtr[name],
+            "transcript" : s_transcript.get(name, {}),
+            "dan" : s_dan.get(name, {})}
+        save_strain_cache(cache, name, data[name])
+        strains[name] = {"tr_files" : task_files[name][0],
+            "an_files" : task_files[name][1], "seq_count" : s_count,
+            "db_count" : s_db.get(name, {})}
+
+    for name in reload:
+        data[name] = load_strain_cache(cache, name)
+
+    dtr, transcript, db_count, dan = {}, {}, {}, {}
+    seq_count = 0
+
+    for name in task_files.keys():
+        if name in data.keys():
+            if name in tr_ids:
+                dtr[name] = data[name]["dtr"]
+                transcript[name] = data[name]["transcript"]
+            dan[name] = data[name]["dan"]
+
+    for name in tr_ids:
+        seq_count += strains[name]["seq_count"]
+
+    for name in an_ids:
+        db_count[name] = strains[name]["db_count"]
+
+    save_manifest(cache, manifest)
+
+    return dtr, transcript, seq_count, db_count, dan, tr_ids
+
+
+def fill_dtr(dtr, transdecoder_files):
+    """
+    Fill transdecoder dictionary, create a transcript dictionary containing
+    the length of each ID, count the number of sequences for all transdecoder
+    files
+
+    Parameters
+    ----------
+
+        dtr : initiated transdecoder dictionary
+        transdecoder_files : all transdecoder files
+
+    Returns
+    -------
+
+        dtr : transdecoder dictionary filled
+        transcript : dictionary containing the length by sequence ID
+        seq_count : the total number of sequences
+    """
+
+    transcript = {}
+    seq_count = 0
+
+    for file in transdecoder_files:
+
+        name = get_id(file) 
+        
+        if name not in transcript.keys():
+            transcript[name] = {}
+
+        for index, (seq_id, length) in enumerate(read_fasta_lengths(file)):
+            
+            dtr[name]["nb_orf"] += 1
+            seq_count += 1
+
+            if index == 0:
+                ilist = set([seq_id])
+                transcript[name][seq_id] = length
+                dtr[name]["records"].append(seq_id)
+
+            else:
+                if seq_id not in ilist:
+                    ilist.add(seq_id)
+                    transcript[name][seq_id] = length
+                    dtr[name]["records"].append(seq_id)
+
+        report_progress("ORFs", seq_count)
+
+
+    return dtr, transcript, seq_count
+
+
+def get_strain_tasks(transdecoder_files, an_files):
+    """
+    Groups the transdecoder and annotation files by strain ID
+
+    Parameters
+    ----------
+
+        transdecoder_files : all transdecoder files
+        an_files : all annotation files
+
+    Returns
+    -------
+
+        tasks : a list of tuples containing a strain ID, its transdecoder
+        files and its annotation files, in the order of the files
+        tr_ids : the IDs of the strains having a transdecoder file
+        an_ids : the IDs of the strains having an annotation file
+    """
+
+    tr_ids = list(dict.fromkeys(get_id(transdecoder_files)))
+    an_ids = list(dict.fromkeys(get_id(an_files)))
+    names = list(dict.fromkeys(tr_ids + an_ids))
+
+    files = {name : ([], []) for name in names}
+    for f in transdecoder_files:
+        files[get_id(f)][0].append(f)
+    for f in an_files:
+        files[get_id(f)][1].append(f)
+
+    tasks = [(name, tr, an) for name, (tr, an) in files.items()]
+
+    return tasks, tr_ids, an_ids
+
+
+def is_file_changed(file, files):
+    """
+    Checks if a file changed since it was recorded in the manifest, its
+    content being hashed only if its size or modification time changed,
+    and updates its signature in the manifest
+
+    Parameters
+    ----------
+
+        file : a file
+        files : the signature of each file of the manifest
+
+    Returns
+    -------
+
+        True if the file is new or its content changed, else False
+    """
+
+    st = os.stat(file.split("::", 1)[0])
+    old = files.get(file)
+
+    if old and old["size"] == st.st_size and old["mtime"] == st.st_mtime_ns:
+        return False
+
+    h = get_file_hash(file)
+    files[file] = {"size" : st.st_size, "mtime" : st.st_mtime_ns, "hash" : h}
+
+    return not old or old["hash"] != h
+
+
+def load_manifest(cache):
+    """
+    Loads the manifest of a cache directory
+
+    Parameters
+    ----------
+
+        cache : the cache directory
+
+    Returns
+    -------
+
+        manifest : a dictionary containing the signature of each input file
+        and the summary of each strain
+    """
+
+    file = f"{cache}/manifest.json"
+
+    if not os.path.exists(file):
+        return {"files" : {}, "strains" : {}}
+
+    with open(file, "r") as f_in:
+        return json.load(f_in)
+
+
+def load_strain_cache(cache, name):
+    """
+    Loads the cached results of a strain
+
+    Parameters
+    ----------
+
+        cache : the cache directory
+        name : the strain ID
+
+    Returns
+    -------
+
+        a dictionary containing the transdecoder, transcript and annotation
+        data of the strain
+    """
+
+    with gzip.open(f"{cache}/{name}.json.gz", "rt") as f_in:
+        return json.load(f_in)
+
+
+def save_dan(dan):
+    """
+    Saves the annotation dictionary into a file
+
+    Parameters
+    ----------
+
+        dan : annotation dictionary filled
+    """
+
+    for k, v in dan.items():
+        
+        p = f"../results/{k}"
+        if not os.path.exists(p):
+            os.mkdir(p)
+
+        output = f"../results/{k}/{k}_annotation_count.txt"
+        with open(output, "w") as f_out:
+            f_out.write("orf\tnb_annotation\n")
+        
+            for key, val in v.items():
+                f_out.write(f"{key}\t{val}\n")
+
+
+def save_db_count(file, db_count):
+    """
+    Saves the db_count dictionary into a file
+    
+    Parameters
+    ----------
+
+        file : a filename
+        db_count : a dictionary containing the count of each database for
+        each file
+    """
+
+    with open(file, "w") as f_out:
+        for key, value in db_count.items():
+            for key2, value2 in value.items():
+                f_out.write(f"{key} {key2} {value2}\n")
+
+
+def save_dtr(dtr, names = None):
+    """
+    Saves the transdecoder dictionary into several specific files
+
+    Parameters
+    ----------
+
+        dtr : transdecoder dictionary filled
+        names : the strain IDs to list in the records_files, by default
+        all the strain IDs of the transdecoder dictionary
+    """
+
+    records = []
+
+    for k, v in dtr.items():
+        
+        p = f"../results/{k}"
+        if not os.path.exists(p):
+            os.mkdir(p)
+
+        output = f"../results/{k}/{k}_orf_nb.txt"
+        with open(output, "w") as f_out:
+            f_out.write("ORF_number\n")
+            orf = v["nb_orf"]
+            f_out.write(f"{orf}\n")
+        
+        p = "../results/records"
+        if not os.path.exists(p):
+            os.mkdir(p)
+        
+        output = f"../results/records/{k}_records.txt"
+        with open(output, "w") as f_out:
+            for r in v["records"]:
+                f_out.write(f"{r}\n")
+
+    for k in (dtr.keys() if names is None else names):
+        records.append(os.path.abspath(f"../results/records/{k}_records.txt"))
+    
+    files = "../data/records_files"
+    save_ids(records, files)
+
+
+def save_manifest(cache, manifest):
+    """
+    Saves the manifest of a cache directory, replacing the previous one only
+    once fully written
+
+    Parameters
+    ----------
+
+        cache : the cache directory
+        manifest : a dictionary containing the signature of each input file
+        and the summary of each strain
+    """
+
+    file = f"{cache}/manifest.json"
+
+    with open(f"{file}.tmp", "w") as f_out:
+        json.dump(manifest, f_out)
+
+    os.replace(f"{file}.tmp", file)
+
+
+def save_seq_count(file, seq_count):
+    """
+    Saves the seq_count in a file
+
+    Parameters
+    ----------
+
+        file : the output file
+        seq_count : the number of sequences in all fasta files
+    """
+
+    with open(file, "w") as f_out:
+        f_out.write(f"{seq_count}")
+
+
+def save_strain(name, result, tr_ids):
+    """
+    Saves the transdecoder, annotation and transcript dictionaries of a
+    strain counted, to free the memory they use
+
+    Parameters
+    ----------
+
+        name : the strain ID
+        result : a tuple containing the transdecoder dictionary, transcript
+        dictionary, number of sequences, db_count dictionary and annotation
+        dictionary of the strain, as returned by count_strain
+        tr_ids : the IDs of all strains having a transdecoder file
+
+    Returns
+    -------
+
+        result : the same tuple, without the dictionaries saved
+    """
+
+    s_dtr, s_transcript, s_count, s_db, s_dan = result
+
+    if name in tr_ids:
+        save_dtr(s_dtr, tr_ids)
+    save_dan({name : s_dan.get(name, {})})
+    if name in tr_ids:
+        save_transcript(s_transcript)
+
+    return None, None, s_count, s_db, None
+
+
+def save_strain_cache(cache, name, data):
+    """
+    Saves the results of a strain in a compressed JSON file
+
+    Parameters
+    ----------
+
+        cache : the cache directory
+        name : the strain ID
+        data : a dictionary containing the transdecoder, transcript and
+        annotation data of the strain
+    """
+
+    with gzip.open(f"{cache}/{name}.json.gz", "wt") as f_out:
+        json.dump(data, f_out)
+
+
+def save_transcript(transcript):
+    """
+    Saves transcript dictionary in a file
+
+    Parameters
+    ----------
+
+        transcript : dictionary containing the length by sequence ID
+    """
+    for k, v in transcript.items():
+        
+        output = f"../results/{k}/{k}_len_by_transcript.txt"
+        with open(output, "w") as f_out:
+            f_out.write("transcript\tlength\n")
+        
+            for key, val in v.items():
+                f_out.write(f"{key}\t{val}\n")
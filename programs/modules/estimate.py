@@ -0,0 +1,484 @@
+"""
+This module file contains the functions necessary for the operation of
+estimate.py
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+A copy of the GNU General Public License is available at
+http://www.gnu.org/licenses/gpl-3.0.html
+"""
+
+__author__ = "KLEIN Dylan"
+__license__ = "GPL"
+__version__ = "1.0.0"
+__email__ = "klein.dylan@outlook.com"
+
+
+#================================== Modules ==================================#
+
+import contextlib
+import copy
+import csv
+import gzip
+import json
+import math
+import os
+from modules.functions import open_file
+
+#=============================================================================#
+
+
+# the number of bytes read at the start of a file to estimate its number of
+# lines or letters, uncompressed for a gzip file, the whole file being read
+# if it is smaller
+SAMPLE_BYTES = 1 << 23
+
+# the number of query letters diamond loads at once, its default block size
+BLOCK_LETTERS = 2e9
+
+# the cost model of each stage: its peak memory in MB and its time in
+# seconds are an intercept plus a coefficient by feature of its inputs. The
+# models of filter, add and network were fitted with estimate.py --calibrate
+# on the synthetic datasets of benchmark.py. The model of blastp follows the
+# memory of diamond, about 6 bytes by letter of the query block and 1 byte
+# by letter of the database for each process, and a time proportional to the
+# number of pairs of letters compared
+MODELS = {
+    "blastp" : {
+        "memory" : {"intercept" : 0, "jobs" : 500,
+            "block_letters" : 6 / 2 ** 20, "db_letters" : 1 / 2 ** 20},
+        "seconds" : {"intercept" : 60, "letter_pairs" : 1e-14}},
+    "filter" : {
+        "memory" : {"intercept" : 18, "alignments" : 1.5e-5},
+        "seconds" : {"intercept" : 0.07, "alignments" : 8.4e-6}},
+    "add" : {
+        "memory" : {"intercept" : 18, "vertices" : 2.9e-4},
+        "seconds" : {"intercept" : 0.02, "vertices" : 5.4e-5}},
+    "network" : {
+        "memory" : {"intercept" : 81, "edges" : 3.6e-4},
+        "seconds" : {"intercept" : 0.57, "total_edges" : 1.0e-5}}
+}
+
+
+def calibrate_models(models, benchmark_file, work_dir):
+    """
+    Fits the cost models having a single feature, like those of filter,
+    add and network, on the runs of benchmark.py, each model being a line
+    through the measures of the scales
+
+    Parameters
+    ----------
+
+        models : the cost models to update
+        benchmark_file : the TSV file of the measures of benchmark.py
+        work_dir : the directory of the datasets of benchmark.py
+
+    Returns
+    -------
+
+        models : the cost models updated
+        points : a dictionary containing the scale, features, peak memory
+        and time of the measures of each stage
+    """
+
+    # the last successful measure of each stage by scale
+    measures = {}
+    with open(benchmark_file, "r") as f_in:
+        for row in csv.DictReader(f_in, delimiter = "\t"):
+            if row["program"] in models and row["status"] == "ok":
+                measures[(row["scale"], row["program"])] = row
+
+    points = {}
+    for (scale, stage), row in measures.items():
+        features = get_benchmark_features(os.path.join(work_dir, scale))
+        points.setdefault(stage, []).append((scale, features,
+            float(row["peak_mb"]), float(row["seconds"])))
+
+    models = copy.deepcopy(models)
+    for stage, p in points.items():
+        for k, i in [("memory", 2), ("seconds", 3)]:
+            model = models[stage][k]
+            feature = [f for f in model if f != "intercept"]
+            if len(feature) != 1:
+                continue
+            feature = feature[0]
+            measured = [q for q in p if q[1].get(feature) is not None]
+            if not measured:
+                continue
+            model["intercept"], model[feature] = fit_line(
+                [q[1][feature] for q in measured], [q[i] for q in measured],
+                model["intercept"])
+
+    return models, points
+
+
+def estimate_stage(model, features):
+    """
+    Predicts the peak memory and the time of a stage
+
+    Parameters
+    ----------
+
+        model : the cost model of the stage
+        features : a dictionary containing the features of its inputs
+
+    Returns
+    -------
+
+        memory : the peak memory in MB
+        seconds : the time in seconds
+    """
+
+    prediction = []
+    for k in ["memory", "seconds"]:
+        value = model[k]["intercept"]
+        for feature, coef in model[k].items():
+            if feature != "intercept":
+                value += coef * features.get(feature, 0)
+        prediction.append(value)
+
+    return prediction[0], prediction[1]
+
+
+def fit_line(x, y, intercept):
+    """
+    Fits a line by least squares, the intercept being kept if there are not
+    enough distinct points, and the coefficients being kept positive
+
+    Parameters
+    ----------
+
+        x : the values of the feature
+        y : the measures
+        intercept : the intercept used with a single point
+
+    Returns
+    -------
+
+        intercept : the intercept of the line
+        slope : the slope of the line
+    """
+
+    n = len(x)
+    mx, my = sum(x) / n, sum(y) / n
+    sxx = sum((a - mx) ** 2 for a in x)
+
+    if n > 1 and sxx > 0:
+        slope = sum((a - mx) * (b - my) for a, b in zip(x, y)) / sxx
+        intercept = my - slope * mx
+        if slope >= 0 and intercept >= 0:
+            return intercept, slope
+
+    # a line through the intercept and the mean of the points
+    intercept = min(intercept, min(y))
+    slope = max(0, (my - intercept) / mx) if mx else 0
+
+    return intercept, slope
+
+
+def format_request(memory, seconds, safety):
+    """
+    Converts a predicted peak memory and time into SLURM resource requests,
+    with a safety margin
+
+    Parameters
+    ----------
+
+        memory : the peak memory in MB
+        seconds : the time in seconds
+        safety : the factor applied to the predictions
+
+    Returns
+    -------
+
+        mem : the --mem request, in GB
+        time : the --time request, as days-hours:minutes:seconds
+    """
+
+    mem = f"{max(1, math.ceil(memory * safety / 1024))}GB"
+
+    minutes = max(1, math.ceil(seconds * safety / 60))
+    days, minutes = divmod(minutes, 24 * 60)
+    hours, minutes = divmod(minutes, 60)
+    time = f"{days}-{hours:02d}:{minutes:02d}:00"
+
+    return mem, time
+
+
+def get_benchmark_features(workspace):
+    """
+    Retrieves the features of a dataset of benchmark.py and of the outputs
+    of its run
+
+    Parameters
+    ----------
+
+        workspace : the directory of the dataset, containing its data, run
+        and results directories
+
+    Returns
+    -------
+
+        features : a dictionary containing the number of alignments,
+        vertices and edges, None if its file is missing
+    """
+
+    data = os.path.join(workspace, "data")
+    run = os.path.join(workspace, "run")
+    files = {"alignments" : (f"{data}/diamond.tsv", 0),
+        "vertices" : (f"{data}/vertices.csv", 1),
+        "edges" : (f"{run}/metdb_ssn_pcov80_pident40", 1)}
+
+    features = {}
+    for k, (file, header) in files.items():
+        features[k] = (get_line_count(file, header)
+            if os.path.exists(file) else None)
+    features["total_edges"] = features["edges"]
+
+    return features
+
+
+def get_fasta_size(file):
+    """
+    Estimates the number of sequences and of letters of a FASTA file, from
+    its first bytes. A diamond database counts a letter by byte
+
+    Parameters
+    ----------
+
+        file : a FASTA file, possibly compressed, or a diamond database
+
+    Returns
+    -------
+
+        sequences : the number of sequences
+        letters : the number of letters
+    """
+
+    size = os.path.getsize(file)
+    if file.endswith(".dmnd"):
+        return None, size
+
+    sequences, letters, read = 0, 0, 0
+    with open_sample(file) as f_in:
+        for line in f_in:
+            read += len(line)
+            if line.startswith(b">"):
+                sequences += 1
+            else:
+                letters += len(line.rstrip())
+            if read >= SAMPLE_BYTES:
+                break
+        ratio = get_sample_ratio(file, f_in, read)
+
+    # the counts of a sample are extrapolated to the whole file
+    sequences = round(sequences * ratio)
+    letters = round(letters * ratio)
+
+    return sequences, letters
+
+
+def get_line_count(file, header = 0):
+    """
+    Estimates the number of lines of a file, from its first bytes
+
+    Parameters
+    ----------
+
+        file : a file, possibly compressed
+        header : the number of header lines not counted
+
+    Returns
+    -------
+
+        the number of lines
+    """
+
+    lines, read = 0, 0
+
+    with open_sample(file) as f_in:
+        for line in f_in:
+            read += len(line)
+            lines += 1
+            if read >= SAMPLE_BYTES:
+                break
+        ratio = get_sample_ratio(file, f_in, read)
+
+    lines = round(lines * ratio)
+
+    return max(0, lines - header)
+
+
+def get_sample_ratio(file, f_in, read):
+    """
+    Retrieves the factor extrapolating the counts of the start of a file to
+    the whole file, from the position reached in the compressed file for a
+    gzip file
+
+    Parameters
+    ----------
+
+        file : the file sampled
+        f_in : the handle given by open_sample, before it is closed
+        read : the number of bytes read from the handle
+
+    Returns
+    -------
+
+        the size of the file divided by the size of the sample, 1 if the
+        whole file was read
+    """
+
+    size = os.path.getsize(file)
+
+    if isinstance(f_in, gzip.GzipFile):
+        position = f_in.fileobj.tell()
+    else:
+        position = read
+
+    return size / position if 0 < position < size else 1
+
+
+def get_stage_features(args):
+    """
+    Retrieves the features of the inputs of each stage whose inputs are
+    given
+
+    Parameters
+    ----------
+
+        args : the arguments of estimate.py
+
+    Returns
+    -------
+
+        features : a dictionary containing the features of each stage
+        inputs : a dictionary containing the features by input file
+    """
+
+    features, inputs = {}, {}
+
+    if args.query:
+        q_seq, q_letters = get_fasta_size(args.query)
+        inputs[args.query] = {"sequences" : q_seq, "letters" : q_letters}
+        db = args.db or args.query
+        if db != args.query:
+            d_seq, d_letters = get_fasta_size(db)
+            inputs[db] = {"sequences" : d_seq, "letters" : d_letters}
+        else:
+            d_letters = q_letters
+
+        # each of the jobs running at the same time loads the database and
+        # a block of its shard
+        jobs = min(args.jobs, args.shards)
+        block = min(BLOCK_LETTERS, q_letters / args.shards)
+        features["blastp"] = {"jobs" : jobs, "block_letters" : jobs * block,
+            "db_letters" : jobs * d_letters,
+            "letter_pairs" : q_letters * d_letters}
+
+    if args.node_file:
+        alignments = get_line_count(args.node_file)
+        inputs[args.node_file] = {"bytes" : os.path.getsize(args.node_file),
+            "lines" : alignments}
+        features["filter"] = {"alignments" : alignments}
+
+    if args.vertices_file:
+        vertices = get_line_count(args.vertices_file, 1)
+        inputs[args.vertices_file] = {"lines" : vertices}
+        features["add"] = {"vertices" : vertices}
+
+    if args.edges_file:
+
+        # the networks are built one after the other, so the memory depends
+        # on the largest edges file and the time on all of them
+        edges = []
+        for file in args.edges_file:
+            edges.append(get_line_count(file, 1))
+            inputs[file] = {"lines" : edges[-1]}
+        features["network"] = {"edges" : max(edges),
+            "total_edges" : sum(edges)}
+
+    elif args.node_file and args.vertices_file:
+
+        # without the filtered edges, the unfiltered alignments bound them
+        alignments = features["filter"]["alignments"]
+        features["network"] = {"edges" : alignments,
+            "total_edges" : alignments * args.networks}
+
+    return features, inputs
+
+
+def load_models(file):
+    """
+    Loads the cost models, the models of a JSON file written by
+    estimate.py --calibrate replacing the default ones
+
+    Parameters
+    ----------
+
+        file : a JSON file, or None
+
+    Returns
+    -------
+
+        models : a dictionary containing the cost model of each stage
+    """
+
+    models = copy.deepcopy(MODELS)
+
+    if file and os.path.exists(file):
+        with open(file, "r") as f_in:
+            models.update(json.load(f_in))
+
+    return models
+
+
+@contextlib.contextmanager
+def open_sample(file):
+    """
+    Opens a file to read its first bytes, a gzip file being decompressed as
+    it is read
+
+    Parameters
+    ----------
+
+        file : a file, possibly compressed with gzip
+
+    Yields
+    -------
+
+        f_in : the handle of the file, read in binary
+    """
+
+    if file.endswith(".gz"):
+        with gzip.open(file, "rb") as f_in:
+            yield f_in
+
+    else:
+        with open_file(file, "rb") as f_in:
+            yield f_in
+
+
+def save_models(file, models):
+    """
+    Saves the cost models in a JSON file
+
+    Parameters
+    ----------
+
+        file : the JSON file
+        models : a dictionary containing the cost model of each stage
+    """
+
+    p = os.path.dirname(file)
+    if p and not os.path.exists(p):
+        os.makedirs(p)
+
+    with open(file, "w") as f_out:
+        json.dump(models, f_out, indent = 2)
@@ -0,0 +1,374 @@
+"""
+This module file contains the functions necessary for the operation of
+filter.py
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+A copy of the GNU General Public License is available at
+http://www.gnu.org/licenses/gpl-3.0.html
+"""
+
+__author__ = "KLEIN Dylan"
+__license__ = "GPL"
+__version__ = "1.0.0"
+__email__ = "klein.dylan@outlook.com"
+
+
+#================================== Modules ==================================#
+
+import contextlib
+import csv
+import json
+import os
+import time
+from modules.functions import (PROGRESS_EVERY, open_file, report_progress,
+    unique_items)
+
+#=============================================================================#
+
+
+def filter_file(inputfile, outputs, checkpoint = None, state = None,
+    every = 600):
+    """
+    filter the file based on coverage and identity percentage, for several
+    coverage and identity percentages in a single pass, so that the file
+    can be a stream. With a checkpoint file, the byte offsets of the input
+    and of the outputs and the counters are saved periodically, the nodes
+    seen being appended to a log, so that an interrupted run can resume
+    from its last checkpoint
+
+    Parameters
+    ----------
+
+        inputfile : the file needed to be read, "-" for the standard input,
+        or an open file such as the standard output of diamond
+        outputs : a list of tuples containing the file where to write
+        outputs, the coverage percentage and the identity percentage
+        checkpoint : the checkpoint file, None to disable the checkpoints,
+        which need inputfile to be a regular file
+        state : the checkpoint to resume from, as read by load_checkpoint,
+        or None to start from the beginning
+        every : the minimum number of seconds between two checkpoints
+
+    Returns
+    -------
+
+        stats : a list of tuples containing, for each output, al_ssn the
+        number of alignments in inputfile, al_filt the number of alignment in
+        output file, nb_nssn the number of nodes in inputfile and nb_nfilt
+        the number of nodes in outputfile
+    """
+    al_ssn, nb_nssn = 0, 0
+    n_ssn = set([])
+    al_filt = [0 for o in outputs]
+    nb_nfilt = [0 for o in outputs]
+    n_filt = [set([]) for o in outputs]
+
+    fieldnames = ["qseqid", "qlen", "qstart", "qend", "sseqid", "slen",
+    "sstart", "send", "length", "pident", "ppos", "score", "evalue",
+    "bitscore"]
+
+    if state:
+        # drop what was written after the checkpoint, and reload the nodes
+        # seen before it
+        for (outputfile, cov, ident), offset in zip(outputs,
+            state["output_offsets"]):
+            os.truncate(outputfile, offset)
+        os.truncate(f"{checkpoint}.nodes", state["nodes_offset"])
+        n_ssn, n_filt = load_nodes(f"{checkpoint}.nodes", len(outputs))
+        al_ssn, nb_nssn = state["al_ssn"], state["nb_nssn"]
+        al_filt, nb_nfilt = state["al_filt"], state["nb_nfilt"]
+
+    mode = "a" if state else "w"
+    f_outs = [open(outputfile, mode) for outputfile, cov, ident in outputs]
+    writers = [csv.DictWriter(f_out, delimiter = "\t",
+        fieldnames = fieldnames) for f_out in f_outs]
+    f_nodes = open(f"{checkpoint}.nodes", mode) if checkpoint else None
+
+    with open_input(inputfile, binary = checkpoint is not None) as f_in:
+
+        if checkpoint:
+            # the lines are read as bytes, to know the offset of each one
+            start = state["offset"] if state else 0
+            offset = [start, start]
+            f_in.seek(start)
+            lines = read_lines(f_in, offset)
+            last = time.time()
+        else:
+            lines = f_in
+
+        reader = csv.DictReader(lines, delimiter = "\t",
+            fieldnames = fieldnames)
+
+        for index, row in enumerate(reader, al_ssn):
+            
+            al_ssn += 1
+            if index % PROGRESS_EVERY == 0:
+                report_progress("alignments", index)
+
+                # the checkpoint is taken before the current row, which
+                # starts at offset[0]
+                if checkpoint and time.time() - last >= every:
+                    save_checkpoint(checkpoint, inputfile, outputs, f_outs,
+                        f_nodes, offset[0], {"al_ssn" : al_ssn - 1,
+                        "nb_nssn" : nb_nssn, "al_filt" : al_filt,
+                        "nb_nfilt" : nb_nfilt})
+                    last = time.time()
+
+            n = [row["qseqid"], row["sseqid"]]
+            
+            if n[0] not in n_ssn:
+                n_ssn.add(n[0])
+                nb_nssn += 1
+                if f_nodes:
+                    f_nodes.write(f"-1\t{n[0]}\n")
+
+
+            if not row["pident"] or not row["ppos"]:
+                print(index)
+                print(row)
+                continue
+            
+            if n[0] == n[1]:
+                continue
+
+            pident, ppos = float(row["pident"]), float(row["ppos"])
+
+            for k, (outputfile, cov, ident) in enumerate(outputs):
+                if pident >= ident and ppos >= cov:
+                    writers[k].writerow(row)
+                    al_filt[k] += 1
+                    if n[0] not in n_filt[k]:
+                        n_filt[k].add(n[0])
+                        nb_nfilt[k] += 1
+                        if f_nodes:
+                            f_nodes.write(f"{k}\t{n[0]}\n")
+
+    for f_out in f_outs:
+        f_out.close()
+
+    # the run is complete, there is nothing left to resume
+    if checkpoint:
+        f_nodes.close()
+        for file in [checkpoint, f"{checkpoint}.nodes"]:
+            if os.path.exists(file):
+                os.remove(file)
+
+    return [(al_ssn, al_filt[k], nb_nssn, nb_nfilt[k])
+        for k in range(len(outputs))]
+
+
+def get_node_pairs(reader, fieldnames):
+    """
+    Reads the alignments of a node file, with the pair of nodes of each one
+
+    Parameters
+    ----------
+
+        reader : a csv.reader of the node file
+        fieldnames : the fields of the node file, the missing ones being
+        left empty
+
+    Returns
+    -------
+
+        a generator of tuples containing the query and subject IDs of an
+        alignment, separated by a space, and its line without newline
+    """
+
+    nb_fields = len(fieldnames)
+    index = 0
+
+    for row in reader:
+
+        # skip the blank lines, as csv.DictReader does
+        if not row:
+            continue
+
+        if index % PROGRESS_EVERY == 0:
+            report_progress("alignments", index)
+        index += 1
+
+        if len(row) < nb_fields:
+            row += [""] * (nb_fields - len(row))
+
+        n_l = f"{row[0]} {row[4]}"
+        yield n_l, "\t".join(row)
+
+
+def load_checkpoint(checkpoint):
+    """
+    Loads the checkpoint of an interrupted filtration
+
+    Parameters
+    ----------
+
+        checkpoint : the checkpoint file
+
+    Returns
+    -------
+
+        state : a dictionary containing the input file with its size and
+        modification time, the outputs with their byte offsets, the byte
+        offsets of the input and of the log of nodes, and the counters, or
+        None if there is no checkpoint
+    """
+
+    if not os.path.exists(checkpoint):
+        return None
+
+    with open(checkpoint, "r") as f_in:
+        return json.load(f_in)
+
+
+def load_nodes(file, nb_outputs):
+    """
+    Reads the log of the nodes seen by filter_file, each line containing
+    the index of an output, -1 for the input, and a node
+
+    Parameters
+    ----------
+
+        file : the log of nodes
+        nb_outputs : the number of outputs
+
+    Returns
+    -------
+
+        n_ssn : the set of nodes of the input
+        n_filt : a list containing the set of nodes of each output
+    """
+
+    n_ssn = set([])
+    n_filt = [set([]) for k in range(nb_outputs)]
+
+    with open(file, "r") as f_in:
+        for line in f_in:
+            k, node = line.rstrip("\n").split("\t", 1)
+            if k == "-1":
+                n_ssn.add(node)
+            else:
+                n_filt[int(k)].add(node)
+
+    return n_ssn, n_filt
+
+
+@contextlib.contextmanager
+def open_input(inputfile, binary = False):
+    """
+    Opens the input of filter.py, which can be a file, the standard input
+    given as "-", or an already open file
+
+    Parameters
+    ----------
+
+        inputfile : a file, "-" or an open file
+        binary : True to read the lines of a file as bytes
+
+    Yields
+    -------
+
+        f_in : an iterable of the lines of the input
+    """
+
+    if isinstance(inputfile, str):
+        with open_file(inputfile, "rb" if binary else "r") as f_in:
+            yield f_in
+    else:
+        yield inputfile
+
+
+def read_lines(f_in, offset):
+    """
+    Decodes the lines of a file read as bytes, keeping the byte offsets of
+    the start and of the end of the last line read
+
+    Parameters
+    ----------
+
+        f_in : a file open in binary mode
+        offset : a list containing the byte offsets of the start and of the
+        end of the last line, updated for each line
+
+    Returns
+    -------
+
+        a generator of the lines decoded
+    """
+
+    for line in f_in:
+        offset[0] = offset[1]
+        offset[1] += len(line)
+        yield line.decode()
+
+
+def remove_repeating_nodes(inputfile, outputfile):
+    """
+    Opens the node file, and remove repeating nodes, saving each lines
+    in a new output file given in argument. The pairs of nodes already seen
+    are spilled to temporary files beyond the memory budget
+
+    Parameters
+    ----------
+
+        inputfile : the input node file, "-" for the standard input, or an
+        open file such as the standard output of diamond
+        outputfile : the output node file
+    """
+
+    fieldnames = ["qseqid", "qlen", "qstart", "qend", "sseqid", "slen",
+    "sstart", "send", "length", "pident", "ppos", "score", "evalue", "bitscore"]
+    
+    with open(outputfile, "w") as f_out, open_input(inputfile) as f_in:
+
+        writer = csv.writer(f_out, delimiter = "\t")
+        reader = csv.reader(f_in, delimiter = "\t")
+
+        for line in unique_items(get_node_pairs(reader, fieldnames)):
+            writer.writerow(line.split("\t"))
+
+
+def save_checkpoint(checkpoint, inputfile, outputs, f_outs, f_nodes, offset,
+    counters):
+    """
+    Saves the checkpoint of a filtration, once the outputs and the log of
+    nodes are written on disk. The checkpoint replaces the previous one
+    atomically, so that an interruption never leaves a partial checkpoint
+
+    Parameters
+    ----------
+
+        checkpoint : the checkpoint file
+        inputfile : the input file
+        outputs : a list of tuples containing the file where to write
+        outputs, the coverage percentage and the identity percentage
+        f_outs : the open outputs
+        f_nodes : the open log of nodes
+        offset : the byte offset of the input where to resume
+        counters : a dictionary containing the number of alignments and of
+        nodes of the input and of each output read before the offset
+    """
+
+    for f in f_outs + [f_nodes]:
+        f.flush()
+        os.fsync(f.fileno())
+
+    info = os.stat(inputfile)
+    state = {"input" : os.path.abspath(inputfile), "size" : info.st_size,
+        "mtime" : info.st_mtime, "offset" : offset,
+        "outputs" : [list(o) for o in outputs],
+        "output_offsets" : [f.tell() for f in f_outs],
+        "nodes_offset" : f_nodes.tell()}
+    state.update(counters)
+
+    with open(f"{checkpoint}.tmp", "w") as f_out:
+        json.dump(state, f_out)
+        f_out.flush()
+        os.fsync(f_out.fileno())
+    os.replace(f"{checkpoint}.tmp", checkpoint)
@@ -0,0 +1,166 @@
+"""
+This module file contains the functions necessary for the operation of
+find.py
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+A copy of the GNU General Public License is available at
+http://www.gnu.org/licenses/gpl-3.0.html
+"""
+
+__author__ = "KLEIN Dylan"
+__license__ = "GPL"
+__version__ = "1.0.0"
+__email__ = "klein.dylan@outlook.com"
+
+
+#================================== Modules ==================================#
+
+from concurrent.futures import ThreadPoolExecutor
+import fnmatch
+import json
+import os
+
+#=============================================================================#
+
+
+def find_files(patterns, path, workers = 8, cache_file = None):
+    """
+    Find all matches of several patterns in the subdirectories of a path,
+    as glob.glob(f"{path}/*/{pattern}") does for each pattern, in a single
+    traversal: the directories are listed with os.scandir by a pool of
+    threads, and their listing can be cached while their modification time
+    does not change
+
+    Parameters
+    ----------
+
+        patterns : the patterns to search for
+        path : the path where to search for the patterns
+        workers : the number of threads listing the directories
+        cache_file : a JSON file where to cache the directory listings
+
+    Returns
+    -------
+
+        result : a dictionary containing the sorted list of files found for
+        each pattern
+    """
+
+    cache = {}
+    if cache_file and os.path.exists(cache_file):
+        with open(cache_file, "r") as f_in:
+            cache = json.load(f_in)
+
+    subdirs = [f"{path}/{d}" for d, is_dir in scan_directory(path, cache)
+        if is_dir and not d.startswith(".")]
+
+    with ThreadPoolExecutor(max_workers = workers) as pool:
+        listings = pool.map(lambda d: scan_directory(d, cache), subdirs)
+
+    result = {p : [] for p in patterns}
+
+    for d, entries in zip(subdirs, listings):
+        for p in patterns:
+            result[p].extend(match_pattern(d, entries, p.split("/"), cache))
+
+    for p in patterns:
+        result[p].sort()
+
+    if cache_file:
+        with open(cache_file, "w") as f_out:
+            json.dump(cache, f_out)
+
+    return result
+
+
+def match_pattern(path, entries, parts, cache):
+    """
+    Matches a pattern against the entries of a directory, one component of
+    the pattern by level of subdirectories, as glob.glob does: the entries
+    starting with "." are only matched by a component starting with "."
+
+    Parameters
+    ----------
+
+        path : a directory
+        entries : the entries of the directory, given by scan_directory
+        parts : the components of the pattern, split on "/"
+        cache : a dictionary containing the modification time and the
+        entries of each directory already listed
+
+    Returns
+    -------
+
+        files : a list of the paths matching the pattern
+    """
+
+    p, files = parts[0], []
+    names = [n for n, is_dir in entries if is_dir or len(parts) == 1]
+
+    for n in fnmatch.filter(names, p):
+        if n.startswith(".") and not p.startswith("."):
+            continue
+        if len(parts) == 1:
+            files.append(f"{path}/{n}")
+        else:
+            d = f"{path}/{n}"
+            files.extend(match_pattern(d, scan_directory(d, cache),
+                parts[1:], cache))
+
+    return files
+
+
+def scan_directory(path, cache):
+    """
+    Lists the entries of a directory, the listing being reused from the
+    cache while the directory modification time does not change
+
+    Parameters
+    ----------
+
+        path : a directory
+        cache : a dictionary containing the modification time and the
+        entries of each directory already listed
+
+    Returns
+    -------
+
+        entries : a list of the name of each entry, and True if the entry
+        is a directory
+    """
+
+    mtime = os.stat(path).st_mtime_ns
+    c = cache.get(path)
+
+    if c and c["mtime"] == mtime:
+        return c["entries"]
+
+    with os.scandir(path) as it:
+        entries = [[e.name, e.is_dir()] for e in it]
+
+    cache[path] = {"mtime" : mtime, "entries" : entries}
+
+    return entries
+
+
+def save_to_txt(result, file):
+    """
+    Saves a list into a txt file
+    
+    Parameters
+    ----------
+
+        result : the list of files found
+        file : the output file
+    """
+
+    with open(file, "w") as f:
+        for i in result:
+            f.write(f"{i}\n")
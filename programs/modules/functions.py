@@ -1,6 +1,7 @@
 """
-This module file contains all the functions necessary for the operation of
-programs capable of managing tables
+This module file contains the functions shared by the programs, like reading
+files and archives. The functions of each program are in a module file named
+after the program, so that a program imports only the libraries it needs
 
 This program is free software: you can redistribute it and/or modify
 it under the terms of the GNU General Public License as published by
@@ -23,1532 +24,1132 @@ __email__ = "klein.dylan@outlook.com"
 #================================== Modules ==================================#
 
 import argparse
-from Bio import SeqIO
-import copy
+import atexit
+import bisect
+import contextlib
 import csv
-import glob
 import gzip
-import igraph as ig
-import math
+import hashlib
+import heapq
+import json
+import mmap
 import os
-import pandas as pd
-import re
-import subprocess
-from subprocess import DEVNULL
+import resource
 import sys
 import tarfile
 import tempfile
+import time
+import zlib
 
 #=============================================================================#
 
-#=============================================================================#
-#============================= General functions =============================#
-#=============================================================================#
-
-
-def determine_fieldnames(files, fieldnames):
-    """
-    Determine field names from the top line of each input files
-    
-    Parameters
-    ----------
-
-        files : one file or a list of files
-        fieldnames : an empty list where the fieldnames will be stored
-
-    Returns
-    -------
-
-        fieldnames : a list containing the fieldnames
-    """
-
-    if type(files) == str:
-        
-
-        with open(files, "r", newline = "") as f_in:
-            dialect = csv.Sniffer().sniff(f_in.readline(), delimiters = ",\t")
-            f_in.seek(0)
-            reader = csv.reader(f_in, dialect)
-            headers = next(reader)
-            for h in headers:
-                if h not in fieldnames:
-                    fieldnames.append(h)
-            return fieldnames
 
-    else:
-        for file in files:
-            fieldnames = determine_fieldnames(file, fieldnames)
-        return fieldnames
+# member indexes and seek points of the tar archives read by open_file
+ARCHIVES = {"indexes" : {}, "points" : {}}
 
+# the smallest number of uncompressed bytes between two seek points of a
+# tar.gz archive, each point keeping a copy of the decompressor of about 40 KB
+ARCHIVE_SPACING = 1 << 20
 
-def get_files_from_argument(file):
-    """
-    Retrieves a list of filenames
-    
-    Parameters
-    ----------
-
-        file : a file given with the argument -f
-
-    Returns
-    -------
+# report_progress is called every PROGRESS_EVERY items of the long loops
+PROGRESS_EVERY = 1 << 16
 
-        files : a list of files contained in the file
-    """
+# the metrics of the run, recorded only if the SSN_METRICS environment
+# variable gives the JSON file, or the directory, where to save them
+METRICS = {"file" : None, "phases" : [], "counts" : {}, "phase" : None}
 
-    files = []
-    with open(file, "r") as f_in:
-        for line in f_in:
-            files.append(line.strip())
+# the memory budget of the largest structures, in bytes, given by the
+# --max_memory option of a program or the SSN_MAX_MEMORY environment variable
+# in MB, beyond which they are spilled to temporary files
+MEMORY = {"budget" : None}
 
-    return files
+# the number of partitions of the keys spilled by unique_items
+SPILL_PARTITIONS = 64
 
+# the approximate memory used by an entry of a set or a dictionary, besides
+# its key and value
+ENTRY_SIZE = 64
 
-def get_id(f):
+def add_count(key, n = 1):
     """
-    Retrieves the ID contained in a file name
+    Adds a number of processed items, like rows, alignments or ORFs, to the
+    metrics of the current phase
 
     Parameters
     ----------
 
-        f : a file name
-
-    Returns
-    -------
-
-        "-".join(name) : the ID
-        idts : a list of ID
+        key : the name of the items
+        n : the number of items processed
     """
 
-    if type(f) == str:
-        name = f.split("/")[-1].replace("_", "-").split("-")[0:3]
-        return "-".join(name)
+    if METRICS["file"] is None:
+        return
 
-    else:
-        idts = []
-        for file in f:
-            name = get_id(file)
-            idts.append(name)
-        return idts
+    METRICS["counts"][key] = METRICS["counts"].get(key, 0) + n
+    if METRICS["phase"]:
+        counts = METRICS["phase"]["counts"]
+        counts[key] = counts.get(key, 0) + n
 
 
-def isfile(path):
+def close_phase():
     """
-    Check if path is an existing file
-    
-    Parameters
-    ----------
-
-        path : a path to a file
-
-    Returns
-    -------
-
-        path : a path to a file
+    Records the wall time, the number of items processed by second, the
+    bytes read and written and the peak memory of the current phase
     """
 
-    if not os.path.isfile(path):
+    phase = METRICS["phase"]
+    if phase is None:
+        return
 
-        if os.path.isdir(path):
-            err = f"{path} is a directory"
-        else:
-            err = f"{path} does not exist"
+    seconds = time.perf_counter() - phase.pop("start")
+    read, written = get_io_counters()
+    phase["seconds"] = round(seconds, 3)
+    phase["rates"] = {k : round(v / seconds, 1) if seconds else None
+        for k, v in phase["counts"].items()}
+    phase["bytes_read"] = read - phase.pop("read")
+    phase["bytes_written"] = written - phase.pop("written")
+    phase["peak_rss_mb"] = get_peak_rss()
 
-        raise argparse.ArgumentTypeError(err)
-
-    return path
+    METRICS["phases"].append(phase)
+    METRICS["phase"] = None
 
+    rates = ", ".join(f"{v} {k}/s" for k, v in phase["rates"].items())
+    print(f"[metrics] {phase['name']} : {seconds:.2f} s"
+        + (f", {rates}" if rates else ""), file = sys.stderr, flush = True)
 
-def read_as_tsv_file(file):
-    """
-    Reads a CSV file with a tabulation delimiter
 
-    Parameters
-    ----------
-
-        file : a CSV file
-
-    Yields
-    -------
-
-        row : a row of the CSV file
-    """
-
-    with open(file, "r") as f_in:
-        reader = csv.DictReader(f_in, delimiter = "\t")
-        for row in reader:
-            yield row
-
-
-def read_compressed_file(file):
-    """
-    Reads a compressed file
-
-    Parameters
-    ----------
-
-        file : a compressed file given with the argument -f
-
-    Yields
-    -------
-
-        line : a line of the file
-    """
-
-    with gzip.open(file, "r") as f_in:
-        for line in f_in:
-            line = line.decode()
-            yield line.strip()
-
-
-def read_csv(file):
-    """
-    Reads a CSV file with a comma delimiter
-
-    Parameters
-    ----------
-
-        file : a CSV file
-
-    Yields
-    -------
-
-        row : a row of the CSV file
-    """
-
-    with open(file, "r") as f_in:
-        dialect = csv.Sniffer().sniff(f_in.readline(), delimiters = ",;")
-        f_in.seek(0)
-        reader = csv.DictReader(f_in, dialect = dialect)
-        for row in reader:
-            yield row
-
-
-def read_file(file):
-    """
-    Reads a file
-
-    Parameters
-    ----------
-
-        file : a file given with the argument -f
-
-    Yields
-    -------
-
-        line : a line of the file
-    """
-
-    with open(file, "r") as f_in:
-        for line in f_in:
-            yield line.strip()
-
-
-#=============================================================================#
-#============================ Functions for add.py ===========================#
-#=============================================================================#
-
-
-def get_fname(n, files):
+def determine_fieldnames(files, fieldnames):
     """
-    Retrieves the file name containing the attributes of an ORF ID
-
+    Determine field names from the top line of each input files
+    
     Parameters
     ----------
 
-        n : an ORF ID
-        files : a list of filenames
+        files : one file or a list of files
+        fieldnames : an empty list where the fieldnames will be stored
 
     Returns
     -------
 
-        file : the file containing the attributes of the ORF ID
-    """
-
-    for file in files:
-        i = "-".join(n.split("-")[0:2])
-        if re.search(i, file):
-            return file
-
-
-def get_prefix(n):
+        fieldnames : a list containing the fieldnames
     """
-    Retrieves the ORF prefix based on an ORF ID
-
-    Parameters
-    ----------
-
-        n : an ORF ID
-
-    Returns
-    -------
 
-        an ORF ID prefix
-    """
+    if type(files) == str:
+        
 
-    pr = n.replace("-", ".").split(".")[0:5]
+        with open(files, "r", newline = "") as f_in:
+            dialect = csv.Sniffer().sniff(f_in.readline(), delimiters = ",\t")
+            f_in.seek(0)
+            reader = csv.reader(f_in, dialect)
+            headers = next(reader)
+            for h in headers:
+                if h not in fieldnames:
+                    fieldnames.append(h)
+            return fieldnames
 
-    if pr[3] == "Transcript":
-        return "-".join(pr)
     else:
-        del pr[-1]
-        return "-".join(pr)
+        for file in files:
+            fieldnames = determine_fieldnames(file, fieldnames)
+        return fieldnames
 
 
-def get_rows(nset, file):
+def get_archive_index(archive):
     """
-    Retrieves a list of rows containing the ORF name, prefix and attributes
+    Retrieves the offset and size of each member of a tar archive, the
+    archive being read only once: the index is saved next to the archive
+    and reused while the archive size and modification time do not change
 
     Parameters
     ----------
 
-        nset : a set of ORF IDs
-        file : the file where to search the ORFs
+        archive : a tar or tar.gz archive
 
     Returns
     -------
 
-        rlist : a list of rows
-    """
-
-    rlist = []
-    
-    for row in read_csv(file):
-        if row["peptides"] in nset:
-            row["name"] = row["peptides"]
-            row["prefix"] = get_prefix(row["peptides"])
-            row.pop("peptides")
-            rlist.append(row)
-
-    return rlist
-
-
-def write_rows(writer, rows):
-    """
-    Writes all rows contained in a list of rows in a file
-
-    Parameters
-    ----------
-
-        writer : a csv.DictWriter
-        rows : a list of rows
-    """
-
-    for row in rows:
-        writer.writerow(row)
-
-
-#=============================================================================#
-#======================== Functions for attributes.py ========================#
-#=============================================================================#
-
-
-def add_keys_to_seq_dict(k, name, table_file):
+        members : a dictionary containing the offset in the uncompressed
+        archive and the size of each member
     """
-    Create a dictionary containing taxonomy and trophic information
 
-    Parameters
-    ----------
+    if archive in ARCHIVES["indexes"].keys():
+        return ARCHIVES["indexes"][archive]
 
-        k : a list of fieldnames
-        name : an ID
-        table_file : a CSV file
+    st = os.stat(archive)
+    index_file = f"{archive}.index.json"
+    index = None
 
-    Returns
-    -------
+    if os.path.exists(index_file):
+        with open(index_file, "r") as f_in:
+            index = json.load(f_in)
+        if index["size"] != st.st_size or index["mtime"] != st.st_mtime_ns:
+            index = None
 
-        seq_dict : a dictionary containing all keys, the taxonomy, and the 
-        trophy information
-    """
+    if not index:
+        members = {}
+        with tarfile.open(archive, "r|*") as tf:
+            for m in tf:
+                if m.isfile():
+                    members[os.path.normpath(m.name)] = [m.offset_data, m.size]
 
-    seq_dict = {}.fromkeys(set(k))
+        index = {"size" : st.st_size, "mtime" : st.st_mtime_ns,
+            "members" : members}
 
-    for row in read_csv(table_file):
-        if row["1_Metdb_ID"] == name.upper():
-            for key, v in row.items():
-                if key in seq_dict.keys():
-                    seq_dict[key] = v
+        try:
+            with open(index_file, "w") as f_out:
+                json.dump(index, f_out)
+        except OSError:
+            pass
 
-    for key, val in seq_dict.items():
-        if not val and key != "peptides":
-            seq_dict[key] = []
+    ARCHIVES["indexes"][archive] = index["members"]
 
-    return seq_dict
+    return index["members"]
 
 
-def check_value_in_row(row, seq_dict):
+def get_archive_points(archive):
     """
-    Fill a dictionary where values of specific keys are initiated lists
+    Retrieves the seek points of a tar.gz archive, built once by process in
+    a single pass over the archive at the start of its members, so that a
+    member is decompressed from the closest point before it rather than
+    from the start of the archive
 
     Parameters
     ----------
 
-        row : a dictionary containing the data
-        seq_dict : the dictionary we want to fill
+        archive : a tar or tar.gz archive
 
     Returns
     -------
 
-        seq_dict : the dictionary filled
+        points : a list of tuples containing the uncompressed offset, the
+        compressed offset and a copy of the decompressor at this offset,
+        None for an uncompressed archive
     """
 
-    for key, value in row.items():
-        if key in seq_dict and value not in seq_dict[key]:
-            if value == None:
-                if "NA" not in seq_dict[key]:
-                    seq_dict[key].append("NA")
-            else:
-                seq_dict[key].append(value)
-
-    return seq_dict
+    key = (archive, os.getpid())
 
+    if key in ARCHIVES["points"].keys():
+        return ARCHIVES["points"][key]
 
-def fill_seq_dict(seq_dict, an_file, seq):
-    """
-    Fill the dictionary with the annotation linked to the sequence ID
-
-    Parameters
-    ----------
+    with open(archive, "rb") as f_in:
+        if f_in.read(2) != b"\x1f\x8b":
+            ARCHIVES["points"][key] = None
+            return None
 
-        seq_dict : the dictionary we want to fill
-        an_file : the file containing the data
-        seq : the ID
-
-    Returns
-    -------
-
-        seq_dict : the dictionary filled
-    """
-
-    seq_dict["peptides"] = seq
-    for an in read_as_tsv_file(an_file):
-        if an["peptides"] == seq:
-            seq_dict = check_value_in_row(an, seq_dict)
-
-    seq_dict = replace_values(seq_dict)
-
-    return seq_dict
+        # the members closer than ARCHIVE_SPACING to the previous point are
+        # read from it
+        targets = []
+        for offset, size in sorted(get_archive_index(archive).values()):
+            if offset - (targets[-1] if targets else 0) >= ARCHIVE_SPACING:
+                targets.append(offset)
+        targets.reverse()
 
+        f_in.seek(0)
+        d = zlib.decompressobj(31)
+        points = [(0, 0, d.copy())]
+        u_pos, c_pos = 0, 0
 
-def get_an_file(seq_file, an_filenames):
-    """
-    Retrives the ID and annotation file linked to the seq_file
+        for data in iter(lambda: f_in.read(1 << 16), b""):
+            while data:
+                if d.eof:
+                    d = zlib.decompressobj(31)
 
-    Parameters
-    ----------
+                # the output stops at the next member start to save a point
+                limit = targets[-1] - u_pos if targets else 0
+                u_pos += len(d.decompress(data, limit))
+                c_pos += len(data) - len(d.unconsumed_tail) - \
+                    len(d.unused_data)
+                data = d.unconsumed_tail or d.unused_data
 
-        seq_file : the dictionary we want to fill
-        an_filenames : the file containing the data
+                if targets and u_pos == targets[-1]:
+                    points.append((u_pos, c_pos, d.copy()))
+                    targets.pop()
 
-    Returns
-    -------
+            if not targets:
+                break
 
-        file : the annotation file linked to the seq_file
-        name : the ID linked to the seq_file
-    """
+    ARCHIVES["points"][key] = points
 
-    name = seq_file.split("/")[-1].strip("_records.txt")
-    
-    for file in an_filenames:
-        i = get_id(file)
-        if i == name:
-            return file, name
+    return points
 
 
-def replace_values(seq_dict):
+def get_balanced_chunks(sizes, nb_chunks):
     """
-    Replace values of a sequence dictionary
+    Splits indices into chunks of balanced total size, the largest items
+    being assigned first to the smallest chunk
 
     Parameters
     ----------
 
-        seq_dict : a dictionary
+        sizes : the size of each item, like the number of vertices of a CC
+        nb_chunks : the number of chunks wanted
 
     Returns
     -------
 
-        seq_dict : the dictionary completed
+        chunks : a list of lists of indices, sorted in each chunk
     """
 
-    for k, v in seq_dict.items():
-        if not seq_dict[k]:
-            seq_dict[k] = "NA"
-        elif seq_dict[k] and type(v) == list:
-            seq_dict[k] = "|".join(v)
+    nb_chunks = max(1, min(nb_chunks, len(sizes)))
+    heap = [(0, c) for c in range(nb_chunks)]
+    chunks = [[] for c in range(nb_chunks)]
 
-    return seq_dict
+    for k in sorted(range(len(sizes)), key = lambda k: -sizes[k]):
+        total, c = heapq.heappop(heap)
+        chunks[c].append(int(k))
+        heapq.heappush(heap, (total + int(sizes[k]), c))
 
-
-#=============================================================================#
-#========================== Functions for count.py ===========================#
-#=============================================================================#
+    return [sorted(c) for c in chunks if c]
 
 
-def db_by_an_file(an_files):
+def get_file_hash(file):
     """
-    Retrieves the count of each database for each annotation files
+    Retrieves the hash of the content of a file
 
     Parameters
     ----------
 
-        an_files : all annotation files
+        file : a file, or archive::member
 
     Returns
     -------
 
-        db_count : a dictionary containing the count of each database by file
+        the hexadecimal BLAKE2 hash of the file
     """
 
-    db_count = {}
+    h = hashlib.blake2b(digest_size = 16)
 
-    for file in an_files:
-        name = get_id(file)
-        db_count[name] = {}
-        for row in read_as_tsv_file(file):
-            db = row["database"]
-            if db not in db_count[name].keys():
-                db_count[name][db] = 0
-            db_count[name][db] += 1
+    with open_file(file, "rb") as f_in:
+        for line in f_in:
+            h.update(line)
 
-    return db_count
+    return h.hexdigest()
 
 
-def fill_dan(dan, an_files):
+def get_files_from_argument(file):
     """
-    Fill the annotation dictionary with data contained in annotation files
+    Retrieves a list of filenames
     
     Parameters
     ----------
 
-        dan : initiated annotation dictionary
-        an_files : all annotation files
-
-    Returns
-    -------
-
-        dan : annotation dictionary filled
-    """
-
-    for file in an_files:
-        
-        name = get_id(file)
-        if name not in dan.keys():
-            dan[name] = {}
-        
-        for index, row in enumerate(read_as_tsv_file(file)):
-            
-            pep = row["peptides"]
-            
-            if index == 0:
-                ilist = set([pep])
-                dan[name][pep] = 1
-            
-            else:
-                if pep not in ilist:
-                    ilist.add(pep)
-                    dan[name][pep] = 0
-                dan[name][pep] += 1
-
-    return dan
-
-
-def fill_dtr(dtr, transdecoder_files):
-    """
-    Fill transdecoder dictionary, create a transcript dictionary containing
-    the length of each ID, count the number of sequences for all transdecoder
-    files
-
-    Parameters
-    ----------
-
-        dtr : initiated transdecoder dictionary
-        transdecoder_files : all transdecoder files
+        file : a file given with the argument -f
 
     Returns
     -------
 
-        dtr : transdecoder dictionary filled
-        transcript : dictionary containing the length by sequence ID
-        seq_count : the total number of sequences
-    """
-
-    transcript = {}
-    seq_count = 0
-
-    for file in transdecoder_files:
-
-        name = get_id(file) 
-        
-        if name not in transcript.keys():
-            transcript[name] = {}
-
-        fasta_sequences = SeqIO.parse(open(file), 'fasta')
-        
-        for index, fasta in enumerate(fasta_sequences):
-            
-            dtr[name]["nb_orf"] += 1
-            seq_count += 1
-
-            if index == 0:
-                ilist = set([fasta.id])
-                transcript[name][fasta.id] = len(fasta)
-                dtr[name]["records"].append(fasta.id)
-
-            else:
-                if fasta.id not in ilist:
-                    ilist.add(fasta.id)
-                    transcript[name][fasta.id] = len(fasta)
-                    dtr[name]["records"].append(fasta.id)
-
-
-    return dtr, transcript, seq_count
-
-
-def save_dan(dan):
-    """
-    Saves the annotation dictionary into a file
-
-    Parameters
-    ----------
-
-        dan : annotation dictionary filled
-    """
-
-    for k, v in dan.items():
-        
-        p = f"../results/{k}"
-        if not os.path.exists(p):
-            os.mkdir(p)
-
-        output = f"../results/{k}/{k}_annotation_count.txt"
-        with open(output, "w") as f_out:
-            f_out.write("orf\tnb_annotation\n")
-        
-            for key, val in v.items():
-                f_out.write(f"{key}\t{val}\n")
-
-
-def save_db_count(file, db_count):
-    """
-    Saves the db_count dictionary into a file
-    
-    Parameters
-    ----------
-
-        file : a filename
-        db_count : a dictionary containing the count of each database for
-        each file
-    """
-
-    with open(file, "w") as f_out:
-        for key, value in db_count.items():
-            for key2, value2 in value.items():
-                f_out.write(f"{key} {key2} {value2}\n")
-
-
-def save_dtr(dtr):
-    """
-    Saves the transdecoder dictionary into several specific files
-
-    Parameters
-    ----------
-
-        dtr : transdecoder dictionary filled
-    """
-
-    records = []
-
-    for k, v in dtr.items():
-        
-        p = f"../results/{k}"
-        if not os.path.exists(p):
-            os.mkdir(p)
-
-        output = f"../results/{k}/{k}_orf_nb.txt"
-        with open(output, "w") as f_out:
-            f_out.write("ORF_number\n")
-            orf = v["nb_orf"]
-            f_out.write(f"{orf}\n")
-        
-        p = "../results/records"
-        if not os.path.exists(p):
-            os.mkdir(p)
-        
-        output = f"../results/records/{k}_records.txt"
-        with open(output, "w") as f_out:
-            for r in v["records"]:
-                f_out.write(f"{r}\n")
-        
-        records.append(os.path.abspath(output))
-    
-    files = "../data/records_files"
-    save_ids(records, files)
-
-
-def save_ids(seq_ids, ids_file):
-    """
-    Saves all sequence IDs into a file
-
-    Parameters
-    ----------
-
-        seq_ids : sequence IDs
-        ids_file : the output file
-    """
-
-    with open(ids_file, "w") as f_out:
-        for i in seq_ids:
-            f_out.write(f"{i}\n")
-
-
-def save_seq_count(file, seq_count):
-    """
-    Saves the seq_count in a file
-
-    Parameters
-    ----------
-
-        file : the output file
-        seq_count : the number of sequences in all fasta files
-    """
-
-    with open(file, "w") as f_out:
-        f_out.write(f"{seq_count}")
-
-
-def save_transcript(transcript):
-    """
-    Saves transcript dictionary in a file
-
-    Parameters
-    ----------
-
-        transcript : dictionary containing the length by sequence ID
+        files : a list of files contained in the file
     """
-    for k, v in transcript.items():
-        
-        output = f"../results/{k}/{k}_len_by_transcript.txt"
-        with open(output, "w") as f_out:
-            f_out.write("transcript\tlength\n")
-        
-            for key, val in v.items():
-                f_out.write(f"{key}\t{val}\n")
 
+    files = []
+    with open(file, "r") as f_in:
+        for line in f_in:
+            files.append(line.strip())
 
-#=============================================================================#
-#========================= Functions for filter.py ===========================#
-#=============================================================================#
+    return files
 
 
-def filter_file(inputfile, outputfile, cov, ident):
+def get_id(f):
     """
-    filter the file based on coverage and identity percentage.
+    Retrieves the ID contained in a file name
 
     Parameters
     ----------
 
-        inputfile : the file needed to be read
-        outputfile : the file where to write outputs
-        cov : the coverage percentage
-        ident : the identity percentage
+        f : a file name
 
     Returns
     -------
 
-        al_ssn : number of alignments in inputfile
-        al_filt : number of alignment in output file
-        nb_nssn : number of nodes in inputfile
-        nb_nfilt : number of nodes in outputfile
+        "-".join(name) : the ID
+        idts : a list of ID
     """
-    al_ssn, al_filt, nb_nssn, nb_nfilt = 0, 0, 0, 0
-    n_ssn = set([])
-    n_filt = set([])
-
-    fieldnames = ["qseqid", "qlen", "qstart", "qend", "sseqid", "slen",
-    "sstart", "send", "length", "pident", "ppos", "score", "evalue",
-    "bitscore"]
-    
-    writer = csv.DictWriter(open(outputfile, "w"), delimiter = "\t",
-        fieldnames = fieldnames)
-    reader = csv.DictReader(open(inputfile), delimiter = "\t",
-        fieldnames = fieldnames)
-    
-    for index, row in enumerate(reader):
-        
-        al_ssn += 1
-        n = [row["qseqid"], row["sseqid"]]
-        
-        if n[0] not in n_ssn:
-            n_ssn.add(n[0])
-            nb_nssn += 1
-
-
-        if not row["pident"] or not row["ppos"]:
-            print(index)
-            print(row)
-            continue
-        
-        else:
-            if float(row["pident"]) >= ident and float(row["ppos"]) >= cov:
-                if n[0] == n[1]:
-                    continue
-                else:
-                    writer.writerow(row)
-                    al_filt += 1
-                    if n[0] not in n_filt:
-                        n_filt.add(n[0])
-                        nb_nfilt += 1
-
-    return al_ssn, al_filt, nb_nssn, nb_nfilt
 
+    if type(f) == str:
+        name = f.split("::")[-1].split("/")[-1].replace("_", "-").split("-")[0:3]
+        return "-".join(name)
 
+    else:
+        idts = []
+        for file in f:
+            name = get_id(file)
+            idts.append(name)
+        return idts
 
 
-def remove_repeating_nodes(inputfile, outputfile):
+def get_io_counters():
     """
-    Opens the node file, and remove repeating nodes, saving each lines
-    in a new output file given in argument
+    Retrieves the number of bytes read and written by the process, on Linux
 
-    Parameters
-    ----------
+    Returns
+    -------
 
-        file : the input node file
-        output : the output node file
+        read : the number of bytes read
+        written : the number of bytes written
     """
 
-    fieldnames = ["qseqid", "qlen", "qstart", "qend", "sseqid", "slen",
-    "sstart", "send", "length", "pident", "ppos", "score", "evalue", "bitscore"]
-    
-    writer = csv.DictWriter(open(outputfile, "w"), delimiter = "\t",
-        fieldnames = fieldnames)
-    reader = csv.DictReader(open(inputfile), delimiter = "\t",
-        fieldnames = fieldnames)
-
-    for index, row in enumerate(reader):
-
-        n = [row["qseqid"], row["sseqid"]]
-        ns = sorted(n)
-        n_l = f"{n[0]} {n[1]}"
+    try:
+        with open("/proc/self/io", "r") as f_in:
+            io = dict(line.split(": ") for line in f_in.read().splitlines())
+        return int(io["rchar"]), int(io["wchar"])
+    except (OSError, KeyError, ValueError):
+        return 0, 0
 
-        if index == 0:
-            slist = set([n_l])
-            writer.writerow(row)
-    
-        else:
-            if n_l not in slist:
-                slist.add(n_l)
-                writer.writerow(row)
-
-
-#=============================================================================#
-#========================== Functions for find.py ============================#
-#=============================================================================#
 
-
-def find_file(pattern, path):
+def get_max_memory():
     """
-    Find all matches of a pattern in a path and save them in a list
-    
-    Parameters
-    ----------
-
-        pattern : the pattern to search for
-        path : the path where to search for the pattern
+    Retrieves the memory budget of the largest structures
 
     Returns
     -------
 
-        result : a list of files found
+        the memory budget in bytes, or None if there is no budget
     """
 
-    result = glob.glob(f"{path}/*/{pattern}")
-    return result
+    return MEMORY["budget"]
 
 
-def save_to_txt(result, file):
+def get_peak_rss(children = False):
     """
-    Saves a list into a txt file
-    
+    Retrieves the peak resident memory of the process, or of its largest
+    child process
+
     Parameters
     ----------
 
-        result : the list of files found
-        file : the output file
-    """
+        children : True to get the peak memory of the child processes
+
+    Returns
+    -------
 
-    with open(file, "w") as f:
-        for i in result:
-            f.write(f"{i}\n")
+        the peak resident memory in MB
+    """
 
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
 
-#=============================================================================#
-#======================== Functions for network.py ===========================#
-#=============================================================================#
+    # ru_maxrss is in kilobytes on Linux
+    return round(resource.getrusage(who).ru_maxrss / 1024, 1)
 
 
-def db(string):
+def get_size(obj):
     """
-    Retrieves the name of the database based on the string provided in argument
+    Estimates the memory used by an object and by the strings, numbers,
+    lists, tuples, sets and dictionaries it contains
 
     Parameters
     ----------
 
-        string : a database ID
+        obj : an object
 
     Returns
     -------
 
-        k : the database associated to the database ID
+        size : the estimated size in bytes
     """
-    ll = [["PFAM", "PF"], ["SMART", "SM"], ["PROSITEPROFILES", "PS5"], 
-         ["GENE3D", "G3DSA"], ["PROSITEPATTERNS", "PS0"], ["SUPERFAMILY", "SSF"],
-         ["CDD", "cd"], ["TIGRFAM", "TIGR"], ["PIRSF", "PIRSF"],
-         ["PRINTS", "PR"], ["HAMAP", "MF"], ["PRODOM", "PD"],
-         ["SFLD", "SFLD"], ["PANTHER", "PTHR"], ["NA", "nan"]]
-    
-    d = {}
-    for l in ll:
-        d[l[0]] = l[1]
-    
-    for k, v in d.items():
-        if string.startswith(v):
-            return k
 
+    size = sys.getsizeof(obj)
+
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            size += get_size(k) + get_size(v)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for i in obj:
+            size += get_size(i)
+
+    return size
 
-def get_abund(l):
+
+def get_strain_prefix(n):
     """
-    Retrieves the abundance of each element of a list
+    Retrieves the strain prefix of a transcript ID
 
     Parameters
     ----------
 
-        l : a list of transcript
+        n : a transcript ID
 
     Returns
     -------
 
-        d : a dictionary representing the abundance of each trancript in the list
+        the strain prefix of the transcript ID
     """
-    d = {}
-    
-    for i in l:
-        iid = "-".join(i.split("-")[0:2])
-    
-        if iid not in d.keys():
-            d[iid] = 0
-        d[iid] += 1
 
-    return d
+    return "-".join(n.split("-")[0:2])
 
 
-def get_abund_distrib(d):
+def init_metrics():
+    """
+    Enables the metrics of the run if the SSN_METRICS environment variable
+    is set, the metrics being saved when the program exits. SSN_PROGRESS
+    gives the minimum number of seconds between two progress lines
     """
-    Retrieves the distribution of the abundance of a dictionary
 
-    Parameters
-    ----------
+    file = os.environ.get("SSN_METRICS")
+    if not file:
+        return
 
-        d : a dictionary with the abundance of each transcript
+    program = os.path.basename(sys.argv[0]).replace(".py", "")
+    program = program.replace(" ", "_") or "python"
+    if file.endswith("/") or os.path.isdir(file):
+        if not os.path.exists(file):
+            os.makedirs(file)
+        file = os.path.join(file, f"{program}_{os.getpid()}.json")
 
-    Returns
-    -------
+    METRICS.update({"file" : file, "program" : program,
+        "argv" : sys.argv[1:], "pid" : os.getpid(),
+        "date" : time.strftime("%Y-%m-%d %H:%M:%S"),
+        "start" : time.perf_counter(), "last" : time.perf_counter(),
+        "progress" : float(os.environ.get("SSN_PROGRESS", 30))})
 
-        ad : a dictionary containing the distribution of the abundance
-    """
-    
-    ad = {}
-    
-    for k, v in d.items():
-        if len(v) == 1:
-    
-            for k2 in v.keys():
-                if k2 not in ad.keys():
-                    ad[k2] = 0
-                ad[k2] += 1
-    return ad
+    atexit.register(save_metrics)
 
 
-def get_cc_len(fn):
+def isfile(path):
     """
-    Retrieves the number of nodes contained in a CC
-
+    Check if path is an existing file, or a member of an existing tar
+    archive given as archive::member
+    
     Parameters
     ----------
 
-        fn : a dictionary containing all Databases in the CC
+        path : a path to a file
 
     Returns
     -------
 
-        cl : a dictionary containing all nodes number of each CC
+        path : a path to a file
     """
-    
-    l, cl = {}, {}
-    
-    for k, v in fn.items():
-        l[k] = len(v)
 
+    if not os.path.isfile(path.split("::", 1)[0]):
+
+        if os.path.isdir(path):
+            err = f"{path} is a directory"
+        else:
+            err = f"{path} does not exist"
 
-    for k, v in l.items():
-        if v not in cl.keys():
-            cl[v] = 0
-        cl[v] += 1
+        raise argparse.ArgumentTypeError(err)
 
-    return cl
+    return path
 
 
-def get_count(l):
+def isinput(path):
     """
-    Retrieves the count of each value on a list
-    
+    Check if path is the standard input given as "-", an existing file or
+    a named pipe
+
     Parameters
     ----------
 
-        l : a list
+        path : a path to a file
 
     Returns
     -------
 
-        c : a dictionary containing the count of each value of the list
+        path : a path to a file
     """
 
-    c = {}
-    
-    for i in l:
-        if i not in c.keys():
-            c[i] = 0
-        c[i] += 1
-    
-    return c
+    if path == "-" or os.path.exists(path) and not os.path.isdir(path):
+        return path
 
+    return isfile(path)
 
-def get_data_from_cc(g_cc):
+
+@contextlib.contextmanager
+def open_file(file, mode = "r"):
     """
-    Retrives all wanted data from a connected component (CC)
+    Opens a file, a member of a tar archive given as archive::member, or the
+    standard input given as "-"
 
     Parameters
     ----------
 
-        g_cc: a connected componant of a graph
+        file : a file, archive::member or "-"
+        mode : "r" to read text, "rb" to read bytes
 
-    Returns
+    Yields
     -------
 
-        fn : a dictionary containing all Databases in the CC
-        tp : a dictionary containing all Phylums in the CC
-        tg : a dictionary containing all Genus in the CC
-        tr : a dictionary containing all Trophies information in the CC
-        ab : a dictionary containing the abundance of transcript in the CC
+        f_in : an iterable of the lines of the file
     """
 
-    fn, tp, tg, tr, ab, db_sp = {}, {}, {}, {}, {}, {}
+    if file == "-":
+        yield sys.stdin.buffer if "b" in mode else sys.stdin
 
-    for index, cc in enumerate(g_cc):
-        f = get_db_id(cc.vs["identifiant"])
-        fn[index] = get_db(f)
-        tp[index] = cc.vs["Phylum_Metdb"]
-        tg[index] = cc.vs["Genus_Metdb"]
-        tr[index] = cc.vs["Trophy"]
-        ab[index] = get_abund(cc.vs["name"])
-        db_sp[index] = get_db_sp(f)
+    elif "::" not in file:
+        with open(file, mode) as f_in:
+            yield f_in
 
-    return fn, tp, tg, tr, ab, db_sp
+    else:
+        yield read_archive_member(file, binary = "b" in mode)
 
 
-def get_data_from_cc_dicts(tr, db_sp, fn_p):
+def read_archive_blocks(archive, start, end):
     """
-    Retrieves different data from the several connected components dictionaries
-    
+    Reads the uncompressed bytes of a tar or tar.gz archive between two
+    offsets, a tar.gz archive being decompressed from the closest seek
+    point before the start
+
     Parameters
     ----------
 
-        tr : a dictionary containing all Trophies information in the CC
-        db_sp : 
-        fn_p : a dictionary containing the percentage of all Databases
-        in the CC
+        archive : a tar or tar.gz archive
+        start : the first offset in the uncompressed archive
+        end : the offset following the last one
 
-    Returns
+    Yields
     -------
 
-        tr_c : a dictionary containing the number of trophies in each CC
-        u_tr : a dictionary containing the number CC with only one trophy
-        hi : a dictionary containing the homogeneity score from each Database
-        of each CC
-        f_en : a dictionary containing the entropy of all Databases on each CC
-
+        block : a block of the bytes
     """
 
-    tr_c, u_tr, hi, f_en = {}, {}, {}, {}
+    points = get_archive_points(archive)
 
-    for k, v in tr.items():
-        if k not in tr_c.keys():
-            tr_c[k] = get_count(v)
+    with open(archive, "rb") as f_in:
 
-    for k, v in tr_c.items():
-        c = len(v)
-        if c == 1:
-            for key in v.keys():
-                if key not in u_tr.keys():
-                    u_tr[key] = 0
-                u_tr[key] += 1
-        else:
-            if "not_unique" not in u_tr.keys():
-                u_tr["not_unique"] = 0
-            u_tr["not_unique"] += 1
+        if points is None:
+            f_in.seek(start)
+            pos = start
+            while pos < end:
+                block = f_in.read(min(1 << 20, end - pos))
+                if not block:
+                    break
+                pos += len(block)
+                yield block
+            return
 
-    for k, v in db_sp.items():
-        for k2, v2 in v.items():
-            if k not in hi.keys():
-                hi[k] = {}
-            if k2 not in hi[k].keys():
-                hi[k][k2] = get_homogeneity_score(v2)
+        k = bisect.bisect_right([p[0] for p in points], start) - 1
+        pos, c_pos, d = points[k]
+        d = d.copy()
+        f_in.seek(c_pos)
 
-    for k, v in fn_p.items():
-        if k not in f_en.keys():
-            f_en[k] = get_entropy(v)
+        for block in iter(lambda: f_in.read(1 << 16), b""):
+            if d.eof:
+                d = zlib.decompressobj(31)
+            data = d.decompress(block)
+            while d.eof and d.unused_data:
+                rest = d.unused_data
+                d = zlib.decompressobj(31)
+                data += d.decompress(rest)
 
-    return tr_c, u_tr, hi, f_en
+            if pos + len(data) > start:
+                yield data[max(0, start - pos):end - pos]
+            pos += len(data)
+            if pos >= end:
+                break
 
 
-def get_data_percent(fn, tp, tg, tr):
+def read_archive_member(file, binary = False):
     """
-    Retrieves data percentage of each information extracted from a CC
+    Reads a member of a tar archive given as archive::member, from its
+    offset in the archive index
 
     Parameters
     ----------
 
-        fn : a dictionary containing all Databases in the CC
-        tp : a dictionary containing all Phylums in the CC
-        tg : a dictionary containing all Genus in the CC
-        tr : a dictionary containing all Trophies information in the CC
+        file : archive::member
+        binary : True to yield bytes, False to yield text
 
-    Returns
+    Yields
     -------
 
-        fn_p : a dictionary containing the percentage of all Databases
-        in the CC
-        tp_p : a dictionary containing the percentage of all Phylums
-        in the CC
-        tg_p : a dictionary containing the percentage of all Genus
-        in the CC
-        tr_p : a dictionary containing the percentage of all Trophies 
-        information in the CC
+        line : a line of the member
     """
 
-    fn_p, tp_p, tg_p, tr_p = {}, {}, {}, {}
+    archive, member = file.split("::", 1)
+    offset, size = get_archive_index(archive)[os.path.normpath(member)]
 
-    for k in fn.keys():
-        fn_p[k] = get_percent(fn[k])
-        tp_p[k] = get_percent(tp[k])
-        tg_p[k] = get_percent(tg[k])
-        tr_p[k] = get_percent(tr[k])
+    rest = b""
 
-    return fn_p, tp_p, tg_p, tr_p
+    for block in read_archive_blocks(archive, offset, offset + size):
 
+        lines = (rest + block).split(b"\n")
+        rest = lines.pop()
 
-def get_db(l):
+        for line in lines:
+            line += b"\n"
+            yield line if binary else line.decode().replace("\r\n", "\n")
+
+    if rest:
+        yield rest if binary else rest.decode()
+
+
+def read_as_tsv_file(file):
     """
-    Retrives a list of all database contained in a CC
+    Reads a CSV file with a tabulation delimiter
 
     Parameters
     ----------
 
-        l : a list of database IDs
+        file : a CSV file
 
-    Returns
+    Yields
     -------
 
-        db_l : a list of all database contained in a CC
+        row : a row of the CSV file
     """
 
-    db_l = []
-    
-    for i in l:
-        db_l.append(db(i))
-    
-    return db_l
+    with open_file(file) as f_in:
+        reader = csv.DictReader(f_in, delimiter = "\t")
+        for row in reader:
+            yield row
 
 
-def get_db_id(l_o_l):
+def read_compressed_file(file):
     """
-    Retrieves a list of all database ID contained
-    in a list of long string of database ID
-    
+    Reads a compressed file
+
     Parameters
     ----------
 
-        l_o_l : a list of long string of database ID
+        file : a compressed file given with the argument -f
 
-    Returns
+    Yields
     -------
 
-        a : a list of all database ID contained in l_o_l
+        line : a line of the file
     """
 
-    a = []
-    
-    for l in l_o_l:
-    
-        if l == "nan":
-            a.append(l)
-    
-        else:
-            l = str(l)
-            sl = l.split("|")
-    
-            for i in sl:
-                a.append(i)
-    
-    return a
+    with gzip.open(file, "r") as f_in:
+        for line in f_in:
+            line = line.decode()
+            yield line.strip()
 
 
-def get_db_sp(l):
+def read_csv(file):
     """
-    Retrieves a dictionary containing all annotations for each CC
-    
+    Reads a CSV file with a comma delimiter
+
     Parameters
     ----------
 
-        l : a list of IDs
+        file : a CSV file
 
-    Returns
+    Yields
     -------
 
-        db_sp : a dictionnary containing all IDs by database
+        row : a row of the CSV file
     """
-    
-    db_sp = {}
-    lt = transform_list(l)
-    
-    for i in lt:
-        name = db(i)
-        if name not in db_sp.keys():
-            db_sp[name] = {}
-        if i not in db_sp[name].keys():
-            db_sp[name][i] = 0
-        db_sp[name][i] += 1
-    
-    return db_sp
+
+    with open(file, "r") as f_in:
+        dialect = csv.Sniffer().sniff(f_in.readline(), delimiters = ",;")
+        f_in.seek(0)
+        reader = csv.DictReader(f_in, dialect = dialect)
+        for row in reader:
+            yield row
 
 
-def get_entropy(d):
+def read_csv_table(file):
     """
-    Retrieves the Shannon entropy of dictionary values
+    Reads a whole CSV file with a comma or semicolon delimiter
 
     Parameters
     ----------
 
-        d : a dictionary containing values on databases
+        file : a CSV file
 
     Returns
     -------
 
-        en : the entropy of the dict values
+        fieldnames : the fieldnames of the file
+        rows : a list of the rows of the file
     """
-    n = len(d)
-    en = 0
-    for v in d.values():
-        val = v/100
-        if val == 1:
-            return val
-        en += -val * math.log(val, n)
-    return round(en, 3)
 
+    with open(file, "r") as f_in:
+        dialect = csv.Sniffer().sniff(f_in.readline(), delimiters = ",;")
+        f_in.seek(0)
+        reader = csv.DictReader(f_in, dialect = dialect)
+        rows = list(reader)
+        fieldnames = list(reader.fieldnames or [])
+
+    return fieldnames, rows
 
-def get_homogeneity_score(d):
+
+def read_fasta_lengths(file):
     """
-    Retrieves an homogeneity score from a dictionary
-    
+    Reads a FASTA file without building sequence objects, the file being
+    memory-mapped
+
     Parameters
     ----------
 
-        d : a dictionary containing values on databases
+        file : a FASTA file
 
-    Returns
+    Yields
     -------
 
-        hi : a dictionary containing the homogeneity score for each database
+        (seq_id, length) : the ID (first word of the header) and the
+        sequence length of each record
     """
 
+    if "::" in file:
+        yield from read_fasta_lengths_by_line(file)
+        return
 
-    le = 0
-    
-    for k, v in d.items():
-        le += v
-    
-    u = len(d)
-    
-    if u == 1:
-        return 1
-    
-    hi = round(1 - (u / le), 3)
-    
-    return hi
-
+    with open(file, "rb") as f_in:
 
-def get_percent(l):
-    """
-    Retrieves a percentage dictionary of all elements in a list
-    
-    Parameters
-    ----------
+        if os.fstat(f_in.fileno()).st_size == 0:
+            return
 
-        l : a list of elements
+        with mmap.mmap(f_in.fileno(), 0, access = mmap.ACCESS_READ) as mm:
 
-    Returns
-    -------
+            start = mm.find(b">")
 
-        d_percent : a dictionary containing all percentages of each element of
-        the list given in argument
-    """
-    
-    tot = len(l)
-    d = {}
-    
-    for i in l:
-        if i not in d.keys():
-            d[i] = 0
-        d[i] += 1
-    
-    d_percent = {}
-    
-    for k, v in d.items():
-        d_percent[k] = round(v / tot * 100, 2)
-    
-    return d_percent
+            while start != -1:
+                end = mm.find(b"\n>", start)
+                stop = len(mm) if end == -1 else end + 1
 
+                eol = mm.find(b"\n", start, stop)
+                if eol == -1:
+                    eol = stop
 
-def save_dict(d, output):
-    """
-    Save all data contained in a dictionary in a file
+                header = mm[start + 1:eol].split(None, 1)
+                seq = mm[eol:stop]
+                length = len(seq) - sum(seq.count(c)
+                    for c in (b"\n", b"\r", b" ", b"\t"))
 
-    Parameters
-    ----------
+                seq_id = header[0].decode() if header else ""
+                yield seq_id, length
 
-        d : a dictionary
-        output : the file where to save the data from the dictionary
-    """
-    
-    with open(output, "w") as f:
-        for k, v in d.items():
-            f.write(f"CC_{k}\t{v}\n")
+                start = -1 if end == -1 else end + 1
 
 
-def save_dict_of_dict(d, output):
+def read_fasta_lengths_by_line(file):
     """
-    Save all data contained in a dictionary of dictionary in a file
+    Reads a FASTA file line by line without building sequence objects, for
+    files that cannot be memory-mapped such as archive members
 
     Parameters
     ----------
 
-        d : a dictionary of dictionary
-        output : the file where to save the data from the dictionary
-    """
-    
-    with open(output, "w") as f:
-        for k, v in d.items():
-            for k2, v2 in v.items():
-                f.write(f"CC_{k}\t{k2}\t{v2}\n")
+        file : a FASTA file, or archive::member
 
+    Yields
+    -------
 
-def save_list_in_dict(d, output):
+        (seq_id, length) : the ID (first word of the header) and the
+        sequence length of each record
     """
-    Save all data contained in a dictionary of lists in a file
 
-    Parameters
-    ----------
+    seq_id, length = None, 0
 
-        d : a dictionary of lists
-        output : the file where to save the data from the dictionary
-    """
+    with open_file(file, "rb") as f_in:
+        for line in f_in:
 
-    with open(output, "w") as f:
-        for k, v in d.items():
-            for i in v:
-                f.write(f"CC_{k}\t{i}\n")
+            if line.startswith(b">"):
+                if seq_id is not None:
+                    yield seq_id, length
+                header = line[1:].split(None, 1)
+                seq_id = header[0].decode() if header else ""
+                length = 0
 
+            elif seq_id is not None:
+                length += len(line) - sum(line.count(c)
+                    for c in (b"\n", b"\r", b" ", b"\t"))
 
-def save_value(v, output):
+    if seq_id is not None:
+        yield seq_id, length
+
+
+def read_file(file):
     """
-    Save data from a variable in a file
+    Reads a file
 
     Parameters
     ----------
 
-        d : a variable containg a value
-        output : the file where to save the data from the variable
+        file : a file given with the argument -f
+
+    Yields
+    -------
+
+        line : a line of the file
     """
-    with open(output, "w") as f:
-        f.write(v)
+
+    with open_file(file) as f_in:
+        for line in f_in:
+            yield line.strip()
 
 
-def transform_list(l):
+def read_tsv_columns(file, columns):
     """
-    Retrieves a list containing all values of another list separated by "|"
+    Reads only some columns of a file with a tabulation delimiter and a
+    header, splitting each line no further than the last column wanted
 
     Parameters
     ----------
 
-        l : a list of long string separated by "|"
+        file : a TSV file
+        columns : the names of the columns wanted
 
-    Returns
+    Yields
     -------
 
-        lt : list of all values contained in l
+        fields : a tuple containing the value of each column wanted
     """
 
-    lt = []
-    for i in l:
-        j = i.split("|")
-        for i in j:
-            lt.append(i)
-    return lt
-
+    with open_file(file) as f_in:
+        lines = iter(f_in)
+        header = next(lines, "").rstrip("\r\n").split("\t")
+        idx = [header.index(c) for c in columns]
+        maxsplit = max(idx) + 1
 
-#=============================================================================#
-#======================== Functions for tables.py ============================#
-#=============================================================================#
+        for line in lines:
+            line = line.rstrip("\r\n")
+            if not line:
+                continue
+            fields = line.split("\t", maxsplit)
+            yield tuple(fields[i] if i < len(fields) else None for i in idx)
 
 
-def add_id(row, file):
+def report_progress(key, count):
     """
-    Creates a new row containing the METdb ID
+    Prints a progress line with the number of items processed so far and
+    their rate, at most every SSN_PROGRESS seconds. Loops call it every
+    PROGRESS_EVERY items, so that it costs nearly nothing when the metrics
+    are disabled
 
     Parameters
     ----------
 
-        row : a dictionary depicting a row of a CSV file
-        file : a file where to search for the ID
+        key : the name of the items
+        count : the number of items processed so far in the current loop
+    """
 
-    Returns
-    -------
+    if METRICS["file"] is None:
+        return
 
-        new_row : the row with the ID added
-    """
+    now = time.perf_counter()
+    if now - METRICS["last"] < METRICS["progress"]:
+        return
 
-    for line in read_file(file):
-        line = line.replace("_", "-").upper()
-        gen, sp, strain = row["Genus_Metdb"].replace(" ", ""), row["Species_Metdb"], row["Strain name_Metdb"].replace(" ", "")
-        check_r = "{}-{}-{}".format(gen, sp, strain)
-        
-        if check_r.lower() in line.lower():
-            new_row = add_id_to_line(line, row)
-            return new_row
+    METRICS["last"] = now
+    phase = METRICS["phase"]
+    seconds = now - (phase["start"] if phase else METRICS["start"])
+    name = phase["name"] if phase else METRICS["program"]
+    print(f"[progress] {name} : {count} {key} in {seconds:.0f} s "
+        f"({count / max(seconds, 1e-9):.0f}/s), {get_peak_rss()} MB",
+        file = sys.stderr, flush = True)
 
 
-def add_id_to_line(line, row):
+def save_ids(seq_ids, ids_file):
     """
-    Adds ID to a key in a dictionary
+    Saves all sequence IDs into a file
 
     Parameters
     ----------
 
-        line : a line of a file
-        row : a dictionary depicting a row of a CSV file
+        seq_ids : sequence IDs
+        ids_file : the output file
+    """
+
+    with open(ids_file, "w") as f_out:
+        for i in seq_ids:
+            f_out.write(f"{i}\n")
 
-    Returns
-    -------
 
-        row : the dictionary with a value added
+def save_metrics():
     """
+    Saves the metrics of the run in a JSON file, once the last phase is
+    closed
+    """
+
+    # the worker processes of a pool do not save metrics
+    if METRICS["file"] is None or os.getpid() != METRICS["pid"]:
+        return
 
-    idt = line.split("-")[0:3]
-    row["Metdb_ID"] = "-".join(idt)
+    close_phase()
+    read, written = get_io_counters()
 
-    return row
+    metrics = {"program" : METRICS["program"], "argv" : METRICS["argv"],
+        "date" : METRICS["date"],
+        "seconds" : round(time.perf_counter() - METRICS["start"], 3),
+        "bytes_read" : read, "bytes_written" : written,
+        "peak_rss_mb" : get_peak_rss(),
+        "children_peak_rss_mb" : get_peak_rss(children = True),
+        "counts" : METRICS["counts"], "phases" : METRICS["phases"]}
 
+    with open(METRICS["file"], "w") as f_out:
+        json.dump(metrics, f_out, indent = 2)
 
-def get_new_row(row, common_column, file):
+
+def set_max_memory(max_memory):
     """
-    Retrieves a new row, which is a merged row from two different rows
-    
+    Sets the memory budget of the largest structures
+
     Parameters
     ----------
 
-        row : a dictionary depicting a row of a CSV file
-        common_column : a common column found in two different rows
-        files : a file
-
-    Returns
-    -------
-
-        row : the dictionary with a value added
+        max_memory : the memory budget in MB, or None for no budget
     """
 
-    for r in read_csv(files[0]):
-                    
-        row_id = row[common_column]
-        r_id = r[common_column]
-
-        if r_id == row_id:
-            new_row = merge_two_rows(row, r)
-            return new_row
+    if max_memory is None or max_memory == "":
+        MEMORY["budget"] = None
+    else:
+        MEMORY["budget"] = int(float(max_memory) * 1024 * 1024)
 
 
-def merge_two_rows(row1, row2):
+def set_phase(name):
     """
-    Merge two rows into one
+    Ends the current phase of the program and starts a new one, whose
+    metrics are recorded separately
 
     Parameters
     ----------
 
-        row1 : a dictionary depicting a row of a CSV file
-        row2 : a dictionary depicting a row of a CSV file
-
-    Returns
-    -------
-
-        row1 : a dictionary containing informations of both rows given in arg
+        name : the name of the new phase
     """
 
-    for k, v in row2.items():
-        if k not in row1.keys() or not row1[k]:
-            row1[k] = v
+    if METRICS["file"] is None:
+        return
 
-    return row1
+    close_phase()
+    read, written = get_io_counters()
+    METRICS["phase"] = {"name" : name, "counts" : {},
+        "start" : time.perf_counter(), "read" : read, "written" : written}
 
 
-def search_for_word(common_fieldnames, string):
+def sorted_unique(items):
     """
-    Search a word in a list
+    Sorts strings and removes their duplicates. If the strings exceed the
+    memory budget, sorted runs of them are spilled to temporary files, then
+    merged
 
     Parameters
     ----------
 
-        common_fieldnames : a list of common fieldnames of two CSV files
-        string : the word to search for
+        items : an iterable of strings without newline
 
     Returns
     -------
 
-        fn : the fieldname where the word is contained in
+        a generator of the unique strings, in sorted order
     """
 
-    for fn in common_fieldnames:
-        if string in fn:
-            return fn
+    budget = get_max_memory()
+    run, size, runs = set(), 0, []
 
+    with tempfile.TemporaryDirectory(prefix = "ssn_runs_") as tmp:
 
-#=============================================================================#
-#========================= Functions for tar.py ==============================#
-#=============================================================================#
+        for item in items:
+            if item in run:
+                continue
+
+            run.add(item)
+            if budget is None:
+                continue
 
+            size += sys.getsizeof(item) + ENTRY_SIZE
+            if size > budget:
+                file = os.path.join(tmp, f"run_{len(runs)}")
+                with open(file, "w") as f_out:
+                    for i in sorted(run):
+                        f_out.write(f"{i}\n")
+                runs.append(file)
+                run, size = set(), 0
 
-def extract_compress_tar_file(tar_file):
+        if not runs:
+            yield from sorted(run)
+            return
+
+        # the last run stays in memory, the others are merged from disk
+        handles = [open(file, "r") for file in runs]
+        try:
+            last = None
+            merged = heapq.merge(sorted(run),
+                *[(line[:-1] for line in f) for f in handles])
+            for item in merged:
+                if item != last:
+                    yield item
+                    last = item
+        finally:
+            for f in handles:
+                f.close()
+
+
+def unique_items(items):
     """
-    Extracts a tar.gz file and compress each file in the archive
+    Keeps the first item of each key, in the order of the items. If the keys
+    exceed the memory budget, the next items are spilled to temporary files
+    partitioned by key, each partition being deduplicated separately before
+    the items kept are merged back in their order
 
     Parameters
     ----------
 
-        tar_file : the tar.gz archive
+        items : an iterable of (key, value) tuples of strings, the keys
+        without tabulation nor newline and the values without newline
+
+    Returns
+    -------
+
+        a generator of the values of the first item of each key
     """
 
-    tf = tarfile.open(tar_file)
-    
-    for file in tf:
-        tf.extract(file, "./extracted_files")
-        command_gzip = ["gzip", f"./extracted_files/{file.name}"]
-        subprocess.call(command_gzip, stdout = DEVNULL)
+    budget = get_max_memory()
+    seen, size = set(), 0
+    items = iter(items)
 
-    tf.close()
+    for key, value in items:
+        if key in seen:
+            continue
+
+        seen.add(key)
+        yield value
+
+        if budget is not None:
+            size += sys.getsizeof(key) + ENTRY_SIZE
+            if size > budget:
+                break
+    else:
+        return
+
+    with tempfile.TemporaryDirectory(prefix = "ssn_partitions_") as tmp:
+
+        # the keys already seen are written first in their partition, with
+        # the index -1, so that the next items with these keys are dropped
+        partitions = [open(os.path.join(tmp, f"part_{p}"), "w")
+            for p in range(SPILL_PARTITIONS)]
+        for key in seen:
+            partitions[hash(key) % SPILL_PARTITIONS].write(f"-1\t{key}\t\n")
+        seen = None
+
+        for index, (key, value) in enumerate(items):
+            partitions[hash(key) % SPILL_PARTITIONS].write(
+                f"{index}\t{key}\t{value}\n")
+
+        for f in partitions:
+            f.close()
+
+        # each partition is written in the order of the items, so the items
+        # kept from it stay in that order
+        runs = []
+        for p in range(SPILL_PARTITIONS):
+            file = os.path.join(tmp, f"part_{p}")
+            kept = os.path.join(tmp, f"kept_{p}")
+            keys = set()
+            with open(file, "r") as f_in, open(kept, "w") as f_out:
+                for line in f_in:
+                    index, key, value = line.split("\t", 2)
+                    if key in keys:
+                        continue
+                    keys.add(key)
+                    if index != "-1":
+                        f_out.write(f"{index}\t{value}")
+            os.remove(file)
+            runs.append(kept)
+
+        handles = [open(file, "r") for file in runs]
+        try:
+            merged = heapq.merge(*handles,
+                key = lambda line: int(line.split("\t", 1)[0]))
+            for line in merged:
+                yield line.split("\t", 1)[1][:-1]
+        finally:
+            for f in handles:
+                f.close()
+
+
+# record the metrics of the program importing this module, if asked for
+init_metrics()
+
+# the memory budget of the programs run by pipeline.py
+set_max_memory(os.environ.get("SSN_MAX_MEMORY"))
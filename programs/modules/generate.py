@@ -0,0 +1,292 @@
+"""
+This module file contains the functions necessary for the operation of
+generate.py
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+A copy of the GNU General Public License is available at
+http://www.gnu.org/licenses/gpl-3.0.html
+"""
+
+__author__ = "KLEIN Dylan"
+__license__ = "GPL"
+__version__ = "1.0.0"
+__email__ = "klein.dylan@outlook.com"
+
+
+#================================== Modules ==================================#
+
+import csv
+import math
+import os
+import random
+
+#=============================================================================#
+
+
+# the databases of the annotations, with the prefix of their identifiers
+DATABASES = [["Pfam", "PF"], ["SMART", "SM"], ["ProSiteProfiles", "PS5"],
+    ["Gene3D", "G3DSA"], ["SUPERFAMILY", "SSF"], ["CDD", "cd"],
+    ["TIGRFAM", "TIGR"], ["PANTHER", "PTHR"], ["PRINTS", "PR"]]
+
+PHYLA = ["Ochrophyta", "Dinophyta", "Haptophyta", "Chlorophyta",
+    "Ciliophora", "Cryptophyta"]
+
+TROPHIES = ["phototroph", "mixotroph", "heterotroph"]
+
+AMINO_ACIDS = "ACDEFGHIKLMNPQRSTVWY"
+
+
+def generate_dataset(output, nb_strains, nb_genes, alpha = 2.5,
+    max_hits = 50, seed = 0):
+    """
+    Generates a synthetic dataset: a TransDecoder FASTA file and an
+    InterProScan TSV file by strain, a MetDB CSV table, the vertices of the
+    SSN and a diamond output
+
+    Parameters
+    ----------
+
+        output : the directory where to save the dataset
+        nb_strains : the number of strains
+        nb_genes : the number of genes by strain
+        alpha : the exponent of the power law of the protein family sizes
+        max_hits : the maximum number of hits of a protein
+        seed : the seed of the random generator
+
+    Returns
+    -------
+
+        summary : a dictionary containing the number of strains, peptides,
+        families and hits of the dataset
+    """
+
+    rng = random.Random(seed)
+    strains_dir = os.path.join(output, "strains")
+    if not os.path.exists(strains_dir):
+        os.makedirs(strains_dir)
+
+    strains = [(f"MMETSP{i:04d}", f"Genus{i % 37}", f"sp{i}")
+        for i in range(nb_strains)]
+
+    lengths = {}
+    tr_files, an_files = [], []
+
+    for strain in strains:
+        name = "-".join(strain)
+        tr_file = os.path.abspath(f"{strains_dir}/{name}-transdecoder.pep")
+        an_file = os.path.abspath(f"{strains_dir}/{name}_annotations.tsv")
+
+        peptides = write_transdecoder_file(tr_file, name, nb_genes, rng)
+        write_annotation_file(an_file, peptides, rng)
+        lengths.update(peptides)
+
+        tr_files.append(tr_file)
+        an_files.append(an_file)
+
+    lists = [("tr_files.txt", tr_files), ("an_files.txt", an_files)]
+    for file, files in lists:
+        with open(os.path.join(output, file), "w") as f_out:
+            for f in files:
+                f_out.write(f"{f}\n")
+
+    write_metdb_table(os.path.join(output, "metdb.csv"), strains, rng)
+
+    with open(os.path.join(output, "vertices.csv"), "w") as f_out:
+        f_out.write("name;strain\n")
+        for peptide in lengths:
+            f_out.write(f"{peptide};{peptide.split('-')[0]}\n")
+
+    families = get_families(list(lengths), alpha, rng)
+    nb_hits = write_diamond_hits(os.path.join(output, "diamond.tsv"),
+        families, lengths, max_hits, rng)
+
+    return {"strains" : nb_strains, "peptides" : len(lengths),
+        "families" : len(families), "hits" : nb_hits}
+
+
+def get_families(peptides, alpha, rng):
+    """
+    Groups peptides into protein families whose sizes follow a power law
+
+    Parameters
+    ----------
+
+        peptides : a list of peptide IDs
+        alpha : the exponent of the power law of the family sizes
+        rng : a random generator
+
+    Returns
+    -------
+
+        families : a list of lists of peptide IDs
+    """
+
+    peptides = list(peptides)
+    rng.shuffle(peptides)
+
+    families = []
+    i = 0
+    while i < len(peptides):
+        size = min(int(rng.paretovariate(alpha - 1)), len(peptides) - i)
+        families.append(peptides[i:i + size])
+        i += size
+
+    return families
+
+
+def write_annotation_file(file, peptides, rng):
+    """
+    Writes the InterProScan TSV file of a strain, most peptides having one
+    or several annotations
+
+    Parameters
+    ----------
+
+        file : the output file
+        peptides : a dictionary containing the length of each peptide ID
+        rng : a random generator
+    """
+
+    fieldnames = ["peptides", "md5", "length", "database", "identifiant",
+        "description", "start", "end", "evalue", "interproscan"]
+
+    with open(file, "w", newline = "") as f_out:
+        writer = csv.writer(f_out, delimiter = "\t")
+        writer.writerow(fieldnames)
+
+        for peptide, length in peptides.items():
+            if rng.random() > 0.7:
+                continue
+            for i in range(rng.randint(1, 4)):
+                database, prefix = rng.choice(DATABASES)
+                start = rng.randint(1, max(1, length // 2))
+                end = rng.randint(start, length)
+                ipr = (f"IPR{rng.randint(0, 50000):06d}"
+                    if rng.random() < 0.8 else "-")
+                writer.writerow([peptide, f"{rng.getrandbits(128):032x}",
+                    length, database, f"{prefix}{rng.randint(0, 20000):05d}",
+                    "synthetic domain", start, end,
+                    f"{10 ** -rng.uniform(3, 60):.1e}", ipr])
+
+
+def write_diamond_hits(file, families, lengths, max_hits, rng):
+    """
+    Writes the hits of an all-versus-all diamond blastp in the tabular
+    format with the 14 fields of the SSN, each protein hitting itself and
+    some proteins of its family
+
+    Parameters
+    ----------
+
+        file : the output file
+        families : a list of lists of peptide IDs
+        lengths : a dictionary containing the length of each peptide ID
+        max_hits : the maximum number of hits of a protein
+        rng : a random generator
+
+    Returns
+    -------
+
+        nb_hits : the number of hits written
+    """
+
+    nb_hits = 0
+
+    with open(file, "w") as f_out:
+        for family in families:
+
+            # the proteins of a family share a level of identity
+            ident = rng.uniform(25, 95)
+
+            for q in family:
+                others = [s for s in family if s != q]
+                if len(others) > max_hits - 1:
+                    others = rng.sample(others, max_hits - 1)
+
+                for s in [q] + others:
+                    qlen, slen = lengths[q], lengths[s]
+                    length = min(qlen, slen)
+                    if s == q:
+                        pident = ppos = 100.0
+                    else:
+                        pident = min(100.0, max(10.0, rng.gauss(ident, 8)))
+                        ppos = min(100.0, pident + rng.uniform(0, 15))
+                        length = rng.randint(length // 2, length)
+                    bitscore = length * pident / 50
+                    evalue = max(1e-180, math.exp(-bitscore / 5) * 1e3)
+                    f_out.write(f"{q}\t{qlen}\t1\t{length}\t{s}\t{slen}\t1\t"
+                        f"{length}\t{length}\t{pident:.1f}\t{ppos:.1f}\t"
+                        f"{int(bitscore * 2)}\t{evalue:.2e}\t{bitscore:.1f}\n")
+                    nb_hits += 1
+
+    return nb_hits
+
+
+def write_metdb_table(file, strains, rng):
+    """
+    Writes the MetDB CSV table containing the taxonomy and the trophy of
+    each strain
+
+    Parameters
+    ----------
+
+        file : the output file
+        strains : a list of tuples containing the ID, genus and species of
+        each strain
+        rng : a random generator
+    """
+
+    fieldnames = ["1_Metdb_ID", "Phylum_Metdb", "Class_Metdb", "Order_Metdb",
+        "Family_Metdb", "Genus_Metdb", "Species_Metdb", "Trophy"]
+
+    with open(file, "w", newline = "") as f_out:
+        writer = csv.writer(f_out)
+        writer.writerow(fieldnames)
+        for strain_id, genus, species in strains:
+            phylum = PHYLA[int(genus[5:]) % len(PHYLA)]
+            writer.writerow(["-".join([strain_id, genus, species]).upper(),
+                phylum, f"{phylum[:5]}ceae", f"{phylum[:5]}ales",
+                f"{genus}aceae", genus, species, rng.choice(TROPHIES)])
+
+
+def write_transdecoder_file(file, name, nb_genes, rng):
+    """
+    Writes the TransDecoder FASTA file of a strain, some genes having
+    several ORFs
+
+    Parameters
+    ----------
+
+        file : the output file
+        name : the ID of the strain, like MMETSP0000-Genus0-sp0
+        nb_genes : the number of genes
+        rng : a random generator
+
+    Returns
+    -------
+
+        peptides : a dictionary containing the length of each peptide ID
+    """
+
+    peptides = {}
+
+    with open(file, "w") as f_out:
+        for g in range(nb_genes):
+            for p in range(1, 2 if rng.random() < 0.8 else 4):
+                length = min(2000, max(50, int(rng.lognormvariate(5.6, 0.5))))
+                peptide = f"{name}-Transcript.{g}-p{p}"
+                peptides[peptide] = length
+
+                seq = "".join(rng.choices(AMINO_ACIDS, k = length))
+                f_out.write(f">{peptide} type:complete len:{length}\n")
+                for i in range(0, length, 60):
+                    f_out.write(f"{seq[i:i + 60]}\n")
+
+    return peptides
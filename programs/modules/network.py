@@ -0,0 +1,1084 @@
+"""
+This module file contains the functions necessary for the operation of
+network.py
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+A copy of the GNU General Public License is available at
+http://www.gnu.org/licenses/gpl-3.0.html
+"""
+
+__author__ = "KLEIN Dylan"
+__license__ = "GPL"
+__version__ = "1.0.0"
+__email__ = "klein.dylan@outlook.com"
+
+
+#================================== Modules ==================================#
+
+import igraph as ig
+import math
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+import os
+import pandas as pd
+from scipy import sparse
+from modules.functions import (get_balanced_chunks, get_strain_prefix,
+    save_ids)
+
+#=============================================================================#
+
+
+# arrays shared with the worker processes of get_data_from_cc_parallel
+CC_WORKER = {}
+
+def build_abund_matrix(cc_idx, prefixes, nb):
+    """
+    Builds the sparse abundance matrix, the strain prefix being used as a
+    categorical column index. The columns follow the first appearance of the
+    strains, and the strains of each row their first appearance in its CC,
+    like the former abundance dictionaries
+
+    Parameters
+    ----------
+
+        cc_idx : the CC index of each transcript
+        prefixes : the strain prefix of each transcript
+        nb : the number of CCs
+
+    Returns
+    -------
+
+        m : the sparse abundance matrix (CC x strain)
+        rows : the label of each row of the matrix
+        cols : the strain prefix of each column of the matrix
+    """
+
+    cat = pd.Categorical(prefixes, categories = pd.unique(prefixes))
+    codes = cat.codes.astype(np.int64)
+    cols = [str(c) for c in cat.categories]
+    rows = [f"CC_{index}" for index in range(nb)]
+
+    # one entry by CC and strain, counted from its first transcript
+    cc_idx = np.asarray(cc_idx, dtype = np.int64)
+    _, first, counts = np.unique(cc_idx * max(1, len(cols)) + codes,
+        return_index = True, return_counts = True)
+    order = np.lexsort((first, cc_idx[first]))
+
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(cc_idx[first],
+        minlength = nb))))
+
+    m = sparse.csr_matrix(
+        (counts[order].astype(np.int32), codes[first[order]], indptr),
+        shape = (len(rows), len(cols)))
+
+    return m, rows, cols
+
+
+def db(string):
+    """
+    Retrieves the name of the database based on the string provided in argument
+
+    Parameters
+    ----------
+
+        string : a database ID
+
+    Returns
+    -------
+
+        k : the database associated to the database ID
+    """
+    ll = [["PFAM", "PF"], ["SMART", "SM"], ["PROSITEPROFILES", "PS5"], 
+         ["GENE3D", "G3DSA"], ["PROSITEPATTERNS", "PS0"], ["SUPERFAMILY", "SSF"],
+         ["CDD", "cd"], ["TIGRFAM", "TIGR"], ["PIRSF", "PIRSF"],
+         ["PRINTS", "PR"], ["HAMAP", "MF"], ["PRODOM", "PD"],
+         ["SFLD", "SFLD"], ["PANTHER", "PTHR"], ["NA", "nan"]]
+    
+    d = {}
+    for l in ll:
+        d[l[0]] = l[1]
+    
+    for k, v in d.items():
+        if string.startswith(v):
+            return k
+
+
+def get_abund_distrib(m, cols):
+    """
+    Retrieves the distribution of the abundance from the abundance matrix,
+    counting for each strain the CCs made only of this strain
+
+    Parameters
+    ----------
+
+        m : the sparse abundance matrix (CC x strain)
+        cols : the strain prefix of each column of the matrix
+
+    Returns
+    -------
+
+        ad : a dictionary containing the distribution of the abundance
+    """
+
+    ad = {}
+
+    nnz = np.diff(m.indptr)
+    single = m.indices[m.indptr[:-1][nnz == 1]]
+
+    for c in single:
+        k = cols[c]
+        if k not in ad.keys():
+            ad[k] = 0
+        ad[k] += 1
+
+    return ad
+
+
+def get_abund_matrix(g_cc):
+    """
+    Retrieves the abundance of each strain in each connected component (CC)
+    as a sparse matrix, the strain prefix being used as a categorical
+    column index
+
+    Parameters
+    ----------
+
+        g_cc : a list of connected components of a graph
+
+    Returns
+    -------
+
+        m : the sparse abundance matrix (CC x strain)
+        rows : the label of each row of the matrix
+        cols : the strain prefix of each column of the matrix
+    """
+
+    cc_idx, prefixes = [], []
+
+    for index, cc in enumerate(g_cc):
+        names = cc.vs["name"]
+        cc_idx.extend([index] * len(names))
+        prefixes.extend(get_strain_prefix(n) for n in names)
+
+    return build_abund_matrix(cc_idx, prefixes, len(g_cc))
+
+
+def get_abund_matrix_from_membership(membership, names, nb):
+    """
+    Retrieves the sparse abundance matrix from the CC membership vector of
+    the vertices of a graph
+
+    Parameters
+    ----------
+
+        membership : the CC index of each vertex, -1 if not in a CC
+        names : the name of each vertex
+        nb : the number of CCs
+
+    Returns
+    -------
+
+        m : the sparse abundance matrix (CC x strain)
+        rows : the label of each row of the matrix
+        cols : the strain prefix of each column of the matrix
+    """
+
+    members = np.flatnonzero(membership >= 0)
+    prefixes = [get_strain_prefix(names[v]) for v in members]
+
+    return build_abund_matrix(membership[members], prefixes, nb)
+
+
+def get_cc_chunk_data(chunk):
+    """
+    Retrieves all wanted data from a chunk of connected components (CC),
+    reading the vertices attributes from the arrays shared with
+    init_cc_worker
+
+    Parameters
+    ----------
+
+        chunk : a list of CC indices
+
+    Returns
+    -------
+
+        data : a dictionary containing, for each CC index, the Databases,
+        the percentages of Databases, Phylums, Genus and Trophies, the
+        trophy count, the homogeneity scores and the entropy
+    """
+
+    arrays, categories = CC_WORKER["arrays"], CC_WORKER["categories"]
+    offsets, order = arrays["offsets"], arrays["order"]
+
+    def decode(a, vs):
+        cat = categories[a]
+        return [cat[c] if c >= 0 else np.nan for c in arrays[a][vs]]
+
+    fn, tp, tg, tr, db_sp = {}, {}, {}, {}, {}
+
+    for k in chunk:
+        vs = order[offsets[k]:offsets[k + 1]]
+        f = get_db_id(decode("identifiant", vs))
+        fn[k] = get_db(f)
+        tp[k] = decode("Phylum_Metdb", vs)
+        tg[k] = decode("Genus_Metdb", vs)
+        tr[k] = decode("Trophy", vs)
+        db_sp[k] = get_db_sp(f)
+
+    fn_p, tp_p, tg_p, tr_p = get_data_percent(fn, tp, tg, tr)
+    tr_c, u_tr, hi, f_en = get_data_from_cc_dicts(tr, db_sp, fn_p)
+
+    data = {}
+    for k in chunk:
+        data[k] = (fn[k], fn_p[k], tp_p[k], tg_p[k], tr_p[k], tr_c[k],
+            hi.get(k), f_en[k])
+
+    return data
+
+
+def get_cc_len(fn):
+    """
+    Retrieves the number of nodes contained in a CC
+
+    Parameters
+    ----------
+
+        fn : a dictionary containing all Databases in the CC
+
+    Returns
+    -------
+
+        cl : a dictionary containing all nodes number of each CC
+    """
+    
+    l, cl = {}, {}
+    
+    for k, v in fn.items():
+        l[k] = len(v)
+
+
+    for k, v in l.items():
+        if v not in cl.keys():
+            cl[v] = 0
+        cl[v] += 1
+
+    return cl
+
+
+def get_count(l):
+    """
+    Retrieves the count of each value on a list
+    
+    Parameters
+    ----------
+
+        l : a list
+
+    Returns
+    -------
+
+        c : a dictionary containing the count of each value of the list
+    """
+
+    c = {}
+    
+    for i in l:
+        if i not in c.keys():
+            c[i] = 0
+        c[i] += 1
+    
+    return c
+
+
+def get_data_from_cc(g_cc):
+    """
+    Retrives all wanted data from a connected component (CC)
+
+    Parameters
+    ----------
+
+        g_cc: a connected componant of a graph
+
+    Returns
+    -------
+
+        fn : a dictionary containing all Databases in the CC
+        tp : a dictionary containing all Phylums in the CC
+        tg : a dictionary containing all Genus in the CC
+        tr : a dictionary containing all Trophies information in the CC
+        db_sp : a dictionary containing all IDs by database in the CC
+    """
+
+    fn, tp, tg, tr, db_sp = {}, {}, {}, {}, {}
+
+    for index, cc in enumerate(g_cc):
+        f = get_db_id(cc.vs["identifiant"])
+        fn[index] = get_db(f)
+        tp[index] = cc.vs["Phylum_Metdb"]
+        tg[index] = cc.vs["Genus_Metdb"]
+        tr[index] = cc.vs["Trophy"]
+        db_sp[index] = get_db_sp(f)
+
+    return fn, tp, tg, tr, db_sp
+
+
+def get_data_from_cc_dicts(tr, db_sp, fn_p):
+    """
+    Retrieves different data from the several connected components dictionaries
+    
+    Parameters
+    ----------
+
+        tr : a dictionary containing all Trophies information in the CC
+        db_sp : 
+        fn_p : a dictionary containing the percentage of all Databases
+        in the CC
+
+    Returns
+    -------
+
+        tr_c : a dictionary containing the number of trophies in each CC
+        u_tr : a dictionary containing the number CC with only one trophy
+        hi : a dictionary containing the homogeneity score from each Database
+        of each CC
+        f_en : a dictionary containing the entropy of all Databases on each CC
+
+    """
+
+    tr_c, u_tr, hi, f_en = {}, {}, {}, {}
+
+    for k, v in tr.items():
+        if k not in tr_c.keys():
+            tr_c[k] = get_count(v)
+
+    u_tr = get_unique_trophy(tr_c)
+
+    for k, v in db_sp.items():
+        for k2, v2 in v.items():
+            if k not in hi.keys():
+                hi[k] = {}
+            if k2 not in hi[k].keys():
+                hi[k][k2] = get_homogeneity_score(v2)
+
+    for k, v in fn_p.items():
+        if k not in f_en.keys():
+            f_en[k] = get_entropy(v)
+
+    return tr_c, u_tr, hi, f_en
+
+
+def get_data_from_cc_parallel(g, membership, nb, workers):
+    """
+    Retrieves all wanted data from the connected components (CC) of a graph
+    with a pool of processes, the CCs being split into chunks balanced by CC
+    size. The workers read the attribute codes and the membership of the
+    vertices from shared memory, and the results are merged in CC index
+    order.
+
+    Parameters
+    ----------
+
+        g : an igraph Graph
+        membership : the CC index of each vertex, -1 if not in a CC
+        nb : the number of CCs
+        workers : the number of processes
+
+    Returns
+    -------
+
+        fn : a dictionary containing all Databases in the CC
+        fn_p : a dictionary containing the percentage of all Databases
+        in the CC
+        tp_p : a dictionary containing the percentage of all Phylums
+        in the CC
+        tg_p : a dictionary containing the percentage of all Genus
+        in the CC
+        tr_p : a dictionary containing the percentage of all Trophies
+        information in the CC
+        tr_c : a dictionary containing the number of trophies in each CC
+        u_tr : a dictionary containing the number CC with only one trophy
+        hi : a dictionary containing the homogeneity score from each Database
+        of each CC
+        f_en : a dictionary containing the entropy of all Databases on each CC
+    """
+
+    attributes = ["identifiant", "Phylum_Metdb", "Genus_Metdb", "Trophy"]
+
+    # vertices sorted by CC, and the offset of each CC in this order
+    members = np.flatnonzero(membership >= 0)
+    order = members[np.argsort(membership[members], kind = "stable")]
+    sizes = np.bincount(membership[members], minlength = nb)
+    offsets = np.concatenate([[0], np.cumsum(sizes)])
+
+    arrays = {"order" : order.astype(np.int64),
+        "offsets" : offsets.astype(np.int64)}
+    categories = {}
+
+    for a in attributes:
+        codes, uniques = pd.factorize(pd.Series(g.vs[a], dtype = object))
+        arrays[a] = codes.astype(np.int64)
+        categories[a] = list(uniques)
+
+    shms, spec = [], {}
+
+    try:
+        for k, v in arrays.items():
+            shm = shared_memory.SharedMemory(create = True,
+                size = max(v.nbytes, 1))
+            np.ndarray(v.shape, dtype = v.dtype, buffer = shm.buf)[:] = v
+            shms.append(shm)
+            spec[k] = (shm.name, v.shape)
+
+        chunks = get_balanced_chunks(sizes, workers * 4)
+
+        with mp.Pool(workers, initializer = init_cc_worker,
+            initargs = (spec, categories)) as pool:
+            results = pool.map(get_cc_chunk_data, chunks)
+
+    finally:
+        for shm in shms:
+            shm.close()
+            shm.unlink()
+
+    # merge the results in CC index order
+    data = {}
+    for r in results:
+        data.update(r)
+
+    fn, fn_p, tp_p, tg_p, tr_p, tr_c, hi, f_en = ({} for i in range(8))
+
+    for k in range(nb):
+        fn[k], fn_p[k], tp_p[k], tg_p[k], tr_p[k], tr_c[k], h, f_en[k] = data[k]
+        if h:
+            hi[k] = h
+
+    u_tr = get_unique_trophy(tr_c)
+
+    return fn, fn_p, tp_p, tg_p, tr_p, tr_c, u_tr, hi, f_en
+
+
+def get_data_percent(fn, tp, tg, tr):
+    """
+    Retrieves data percentage of each information extracted from a CC
+
+    Parameters
+    ----------
+
+        fn : a dictionary containing all Databases in the CC
+        tp : a dictionary containing all Phylums in the CC
+        tg : a dictionary containing all Genus in the CC
+        tr : a dictionary containing all Trophies information in the CC
+
+    Returns
+    -------
+
+        fn_p : a dictionary containing the percentage of all Databases
+        in the CC
+        tp_p : a dictionary containing the percentage of all Phylums
+        in the CC
+        tg_p : a dictionary containing the percentage of all Genus
+        in the CC
+        tr_p : a dictionary containing the percentage of all Trophies 
+        information in the CC
+    """
+
+    fn_p, tp_p, tg_p, tr_p = {}, {}, {}, {}
+
+    for k in fn.keys():
+        fn_p[k] = get_percent(fn[k])
+        tp_p[k] = get_percent(tp[k])
+        tg_p[k] = get_percent(tg[k])
+        tr_p[k] = get_percent(tr[k])
+
+    return fn_p, tp_p, tg_p, tr_p
+
+
+def get_cc_membership(g, minelements = 3):
+    """
+    Retrieves the connected component (CC) index of each vertex of a graph,
+    numbering the CCs as g.decompose(minelements = minelements) does
+
+    Parameters
+    ----------
+
+        g : an igraph Graph
+        minelements : the minimum number of vertices of a CC
+
+    Returns
+    -------
+
+        membership : the CC index of each vertex, -1 if not in a CC
+        nb : the number of CCs
+    """
+
+    clusters = np.asarray(g.clusters().membership, dtype = np.int64)
+    sizes = np.bincount(clusters, minlength = 1)
+
+    # renumber the clusters big enough, keeping their order
+    kept = sizes >= minelements
+    index = np.where(kept, np.cumsum(kept) - 1, -1)
+
+    return index[clusters], int(kept.sum())
+
+
+def get_db(l):
+    """
+    Retrives a list of all database contained in a CC
+
+    Parameters
+    ----------
+
+        l : a list of database IDs
+
+    Returns
+    -------
+
+        db_l : a list of all database contained in a CC
+    """
+
+    db_l = []
+    
+    for i in l:
+        db_l.append(db(i))
+    
+    return db_l
+
+
+def get_db_id(l_o_l):
+    """
+    Retrieves a list of all database ID contained
+    in a list of long string of database ID
+    
+    Parameters
+    ----------
+
+        l_o_l : a list of long string of database ID
+
+    Returns
+    -------
+
+        a : a list of all database ID contained in l_o_l
+    """
+
+    a = []
+    
+    for l in l_o_l:
+    
+        if l == "nan":
+            a.append(l)
+    
+        else:
+            l = str(l)
+            sl = l.split("|")
+    
+            for i in sl:
+                a.append(i)
+    
+    return a
+
+
+def get_db_sp(l):
+    """
+    Retrieves a dictionary containing all annotations for each CC
+    
+    Parameters
+    ----------
+
+        l : a list of IDs
+
+    Returns
+    -------
+
+        db_sp : a dictionnary containing all IDs by database
+    """
+    
+    db_sp = {}
+    lt = transform_list(l)
+    
+    for i in lt:
+        name = db(i)
+        if name not in db_sp.keys():
+            db_sp[name] = {}
+        if i not in db_sp[name].keys():
+            db_sp[name][i] = 0
+        db_sp[name][i] += 1
+    
+    return db_sp
+
+
+def get_entropy(d):
+    """
+    Retrieves the Shannon entropy of dictionary values
+
+    Parameters
+    ----------
+
+        d : a dictionary containing values on databases
+
+    Returns
+    -------
+
+        en : the entropy of the dict values
+    """
+    n = len(d)
+    en = 0
+    for v in d.values():
+        val = v/100
+        if val == 1:
+            return val
+        en += -val * math.log(val, n)
+    return round(en, 3)
+
+
+def get_edge_ids(edges, names):
+    """
+    Retrieves the vertex IDs of both ends of each edge
+
+    Parameters
+    ----------
+
+        edges : a pandas dataframe containing the qseqid and sseqid columns
+        names : a pandas Index of the vertices names
+
+    Returns
+    -------
+
+        src : the vertex ID of the qseqid of each edge
+        tgt : the vertex ID of the sseqid of each edge
+    """
+
+    src = names.get_indexer(edges["qseqid"])
+    tgt = names.get_indexer(edges["sseqid"])
+
+    if (src < 0).any() or (tgt < 0).any():
+        raise ValueError("Some vertices in the edges file are missing from "
+            "the vertices file")
+
+    return src, tgt
+
+
+def get_forest(edges_file, nodes, chunksize = 1000000):
+    """
+    Creates an igraph Graph containing only a spanning forest of the edges
+    file, streaming the edges by chunks, so that the graph has the same
+    connected components as the full graph with a bounded number of edges
+
+    Parameters
+    ----------
+
+        edges_file : the edges file, given by read_edges
+        nodes : a pandas dataframe of the vertices
+        chunksize : the number of edges read at once
+
+    Returns
+    -------
+
+        g : the igraph Graph of the spanning forest
+    """
+
+    names = pd.Index(nodes["name"])
+    seen = np.zeros(len(names), dtype = bool)
+    forest = np.empty((0, 2), dtype = np.int64)
+
+    reader = read_edges(edges_file, ["qseqid", "sseqid"], dtype = str,
+        chunksize = chunksize)
+
+    for edges in reader:
+        src, tgt = get_edge_ids(edges, names)
+        seen[src] = True
+        seen[tgt] = True
+
+        # keep a spanning forest of the previous forest and the new edges
+        pairs = np.concatenate([forest, np.column_stack([src, tgt])])
+        g = ig.Graph(n = len(names), edges = pairs.tolist(), directed = False)
+        forest = pairs[g.spanning_tree(return_tree = False)]
+
+    # keep only vertices found in the edges, renumbered in the table order
+    used = np.flatnonzero(seen)
+    ids = np.searchsorted(used, forest)
+
+    g = ig.Graph(n = len(used), edges = ids.tolist(), directed = False)
+    set_vertices_attributes(g, nodes.iloc[used])
+
+    return g
+
+
+def get_graph(edges_file, nodes, weight = None):
+    """
+    Creates an igraph Graph from an edges file, reading only the qseqid and
+    sseqid columns (and optionally a weight column), mapping them to vertex
+    IDs through the vertices names, and dropping isolated vertices before
+    the graph is built
+
+    Parameters
+    ----------
+
+        edges_file : the edges file, given by read_edges
+        nodes : a pandas dataframe of the vertices
+        weight : the name of a column to keep as edge attribute
+
+    Returns
+    -------
+
+        g : the igraph Graph
+    """
+
+    columns = ["qseqid", "sseqid"]
+    if weight:
+        columns.append(weight)
+
+    edges = read_edges(edges_file, columns,
+        dtype = {"qseqid" : str, "sseqid" : str})
+
+    src, tgt = get_edge_ids(edges, pd.Index(nodes["name"]))
+
+    # keep only vertices found in the edges, renumbered in the table order
+    used, ids = np.unique(np.concatenate([src, tgt]), return_inverse = True)
+    ids = ids.reshape(2, -1).T
+
+    g = ig.Graph(n = len(used), edges = ids.tolist(), directed = False)
+    set_vertices_attributes(g, nodes.iloc[used])
+
+    if weight:
+        g.es[weight] = edges[weight].tolist()
+
+    return g
+
+
+def get_homogeneity_score(d):
+    """
+    Retrieves an homogeneity score from a dictionary
+    
+    Parameters
+    ----------
+
+        d : a dictionary containing values on databases
+
+    Returns
+    -------
+
+        hi : a dictionary containing the homogeneity score for each database
+    """
+
+
+    le = 0
+    
+    for k, v in d.items():
+        le += v
+    
+    u = len(d)
+    
+    if u == 1:
+        return 1
+    
+    hi = round(1 - (u / le), 3)
+    
+    return hi
+
+
+def get_unique_trophy(tr_c):
+    """
+    Retrieves the number of connected components (CC) with only one trophy
+
+    Parameters
+    ----------
+
+        tr_c : a dictionary containing the number of trophies in each CC
+
+    Returns
+    -------
+
+        u_tr : a dictionary containing the number CC with only one trophy
+    """
+
+    u_tr = {}
+
+    for k, v in tr_c.items():
+        c = len(v)
+        if c == 1:
+            for key in v.keys():
+                if key not in u_tr.keys():
+                    u_tr[key] = 0
+                u_tr[key] += 1
+        else:
+            if "not_unique" not in u_tr.keys():
+                u_tr["not_unique"] = 0
+            u_tr["not_unique"] += 1
+
+    return u_tr
+
+
+def get_percent(l):
+    """
+    Retrieves a percentage dictionary of all elements in a list
+    
+    Parameters
+    ----------
+
+        l : a list of elements
+
+    Returns
+    -------
+
+        d_percent : a dictionary containing all percentages of each element of
+        the list given in argument
+    """
+    
+    tot = len(l)
+    d = {}
+    
+    for i in l:
+        if i not in d.keys():
+            d[i] = 0
+        d[i] += 1
+    
+    d_percent = {}
+    
+    for k, v in d.items():
+        d_percent[k] = round(v / tot * 100, 2)
+    
+    return d_percent
+
+
+def get_vertices(file, vertices):
+    """
+    Retrieves the vertices table of a file, loading it only once by path
+    with categorical dtypes and only the columns needed by the analysis
+
+    Parameters
+    ----------
+
+        file : the vertices file
+        vertices : a dictionary of the vertices tables already loaded
+
+    Returns
+    -------
+
+        vertices[path] : a pandas dataframe of the vertices
+    """
+
+    columns = ["name", "prefix", "Phylum_Metdb", "Genus_Metdb", "Trophy",
+    "identifiant"]
+    categories = ["prefix", "Phylum_Metdb", "Genus_Metdb", "Trophy"]
+
+    path = os.path.realpath(file)
+
+    if path not in vertices.keys():
+        vertices[path] = pd.read_csv(file, sep = ";",
+            usecols = lambda c: c in columns,
+            dtype = {c : "category" for c in categories})
+
+    return vertices[path]
+
+
+def init_cc_worker(spec, categories):
+    """
+    Attaches a worker process to the shared arrays of the vertices
+    attributes codes
+
+    Parameters
+    ----------
+
+        spec : a dictionary containing the shared memory name and the shape
+        of each array
+        categories : a dictionary containing the values of each attribute
+        code
+    """
+
+    CC_WORKER["shms"] = []
+    CC_WORKER["arrays"] = {}
+    CC_WORKER["categories"] = categories
+
+    for k, (name, shape) in spec.items():
+        shm = shared_memory.SharedMemory(name = name)
+        CC_WORKER["shms"].append(shm)
+        CC_WORKER["arrays"][k] = np.ndarray(shape, dtype = np.int64,
+            buffer = shm.buf)
+
+
+def read_edges(edges_file, columns, **kwargs):
+    """
+    Reads columns of an edges file, either an output of filter.py, separated
+    by tabulations without header, or a file separated by ";" with a header
+
+    Parameters
+    ----------
+
+        edges_file : the edges file
+        columns : the columns to read
+        kwargs : the other arguments of pandas.read_csv
+
+    Returns
+    -------
+
+        a pandas dataframe of the edges, or an iterator of dataframes with
+        a chunksize
+    """
+
+    fieldnames = ["qseqid", "qlen", "qstart", "qend", "sseqid", "slen",
+    "sstart", "send", "length", "pident", "ppos", "score", "evalue",
+    "bitscore"]
+
+    with open(edges_file, "r") as f_in:
+        first = f_in.readline()
+
+    # filter.py writes an empty file when no alignment is kept
+    if not first:
+        edges = pd.DataFrame({c : pd.Series(dtype = str) for c in columns})
+        return iter([edges]) if kwargs.get("chunksize") else edges
+
+    if "\t" in first or not first.startswith("qseqid"):
+        return pd.read_csv(edges_file, sep = "\t", header = None,
+            names = fieldnames, usecols = columns, **kwargs)
+
+    return pd.read_csv(edges_file, sep = ";", usecols = columns, **kwargs)
+
+
+def save_abund_matrix(m, rows, cols, output):
+    """
+    Saves the sparse abundance matrix in a compressed .npz file, with the
+    row and column labels in two text files
+
+    Parameters
+    ----------
+
+        m : the sparse abundance matrix (CC x strain)
+        rows : the label of each row of the matrix
+        cols : the strain prefix of each column of the matrix
+        output : the output file prefix
+    """
+
+    sparse.save_npz(f"{output}.npz", m, compressed = True)
+    save_ids(rows, f"{output}_rows.txt")
+    save_ids(cols, f"{output}_cols.txt")
+
+
+def save_abund_matrix_tsv(m, rows, cols, output):
+    """
+    Saves the non-zero values of the sparse abundance matrix in a file,
+    one line per CC and strain
+
+    Parameters
+    ----------
+
+        m : the sparse abundance matrix (CC x strain)
+        rows : the label of each row of the matrix
+        cols : the strain prefix of each column of the matrix
+        output : the file where to save the data from the matrix
+    """
+
+    with open(output, "w") as f:
+        for r, row in enumerate(rows):
+            for j in range(m.indptr[r], m.indptr[r + 1]):
+                f.write(f"{row}\t{cols[m.indices[j]]}\t{m.data[j]}\n")
+
+
+def save_dict(d, output):
+    """
+    Save all data contained in a dictionary in a file
+
+    Parameters
+    ----------
+
+        d : a dictionary
+        output : the file where to save the data from the dictionary
+    """
+    
+    with open(output, "w") as f:
+        for k, v in d.items():
+            f.write(f"CC_{k}\t{v}\n")
+
+
+def save_dict_of_dict(d, output):
+    """
+    Save all data contained in a dictionary of dictionary in a file
+
+    Parameters
+    ----------
+
+        d : a dictionary of dictionary
+        output : the file where to save the data from the dictionary
+    """
+    
+    with open(output, "w") as f:
+        for k, v in d.items():
+            for k2, v2 in v.items():
+                f.write(f"CC_{k}\t{k2}\t{v2}\n")
+
+
+def save_list_in_dict(d, output):
+    """
+    Save all data contained in a dictionary of lists in a file
+
+    Parameters
+    ----------
+
+        d : a dictionary of lists
+        output : the file where to save the data from the dictionary
+    """
+
+    with open(output, "w") as f:
+        for k, v in d.items():
+            for i in v:
+                f.write(f"CC_{k}\t{i}\n")
+
+
+def save_value(v, output):
+    """
+    Save data from a variable in a file
+
+    Parameters
+    ----------
+
+        d : a variable containg a value
+        output : the file where to save the data from the variable
+    """
+    with open(output, "w") as f:
+        f.write(v)
+
+
+def set_vertices_attributes(g, vs):
+    """
+    Sets each column of a vertices table as a vertex attribute of a graph
+
+    Parameters
+    ----------
+
+        g : an igraph Graph
+        vs : a pandas dataframe with one row per vertex of the graph
+    """
+
+    for col in vs.columns:
+        g.vs[col] = vs[col].tolist()
+
+
+def transform_list(l):
+    """
+    Retrieves a list containing all values of another list separated by "|"
+
+    Parameters
+    ----------
+
+        l : a list of long string separated by "|"
+
+    Returns
+    -------
+
+        lt : list of all values contained in l
+    """
+
+    lt = []
+    for i in l:
+        j = i.split("|")
+        for i in j:
+            lt.append(i)
+    return lt
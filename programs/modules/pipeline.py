@@ -0,0 +1,309 @@
+"""
+This module file contains the functions necessary for the operation of
+pipeline.py
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+A copy of the GNU General Public License is available at
+http://www.gnu.org/licenses/gpl-3.0.html
+"""
+
+__author__ = "KLEIN Dylan"
+__license__ = "GPL"
+__version__ = "1.0.0"
+__email__ = "klein.dylan@outlook.com"
+
+
+#================================== Modules ==================================#
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import hashlib
+import json
+import os
+import subprocess
+import threading
+from modules.functions import get_file_hash
+
+#=============================================================================#
+
+
+def get_path_hash(path, files, lock):
+    """
+    Retrieves the hash of the content of a file, or of all files of a
+    directory, a file being hashed again only if its size or modification
+    time changed since it was recorded
+
+    Parameters
+    ----------
+
+        path : a file or a directory
+        files : the signature of each file already hashed
+        lock : a lock protecting files
+
+    Returns
+    -------
+
+        the hexadecimal BLAKE2 hash of the path
+    """
+
+    if os.path.isdir(path):
+        h = hashlib.blake2b(digest_size = 16)
+        for root, dirs, names in os.walk(path):
+            dirs.sort()
+            for name in sorted(names):
+                file = os.path.join(root, name)
+                h.update(os.path.relpath(file, path).encode())
+                h.update(get_path_hash(file, files, lock).encode())
+        return h.hexdigest()
+
+    st = os.stat(path)
+    file = os.path.abspath(path)
+
+    with lock:
+        old = files.get(file)
+
+    if old and old["size"] == st.st_size and old["mtime"] == st.st_mtime_ns:
+        return old["hash"]
+
+    h = get_file_hash(path)
+    with lock:
+        files[file] = {"size" : st.st_size, "mtime" : st.st_mtime_ns,
+            "hash" : h}
+
+    return h
+
+
+def get_stage_dependencies(stages):
+    """
+    Retrieves the stages producing the inputs of each stage
+
+    Parameters
+    ----------
+
+        stages : a list of stages, each one a dictionary containing its
+        name, inputs, outputs and commands
+
+    Returns
+    -------
+
+        deps : a dictionary containing the set of the names of the stages
+        each stage depends on
+    """
+
+    producers = {}
+    for stage in stages:
+        for output in stage["outputs"]:
+            producers[os.path.abspath(output)] = stage["name"]
+
+    deps = {}
+    for stage in stages:
+        deps[stage["name"]] = set([producers[os.path.abspath(i)]
+            for i in stage["inputs"] if os.path.abspath(i) in producers])
+        deps[stage["name"]].discard(stage["name"])
+
+    return deps
+
+
+def get_stage_key(stage, files, lock):
+    """
+    Retrieves the fingerprint of a stage, from its commands and the content
+    of its inputs
+
+    Parameters
+    ----------
+
+        stage : a dictionary containing the name, inputs, outputs and
+        commands of the stage
+        files : the signature of each file already hashed
+        lock : a lock protecting files
+
+    Returns
+    -------
+
+        the hexadecimal BLAKE2 hash of the stage, None if an input is missing
+    """
+
+    if not all(os.path.exists(i) for i in stage["inputs"]):
+        return None
+
+    h = hashlib.blake2b(digest_size = 16)
+    h.update(json.dumps(stage["commands"]).encode())
+
+    for i in stage["inputs"]:
+        h.update(i.encode())
+        h.update(get_path_hash(i, files, lock).encode())
+
+    return h.hexdigest()
+
+
+def load_state(file):
+    """
+    Loads the state of the pipeline
+
+    Parameters
+    ----------
+
+        file : the JSON file of the state
+
+    Returns
+    -------
+
+        state : a dictionary containing the signature of each file hashed
+        and the fingerprint of each stage run
+    """
+
+    if not os.path.exists(file):
+        return {"files" : {}, "stages" : {}}
+
+    with open(file, "r") as f_in:
+        return json.load(f_in)
+
+
+def run_pipeline(stages, state_file, jobs = 1, force = (), dry_run = False,
+    log_dir = "../results/logs"):
+    """
+    Runs the stages of the pipeline in the order of their dependencies, the
+    independent stages running concurrently, and skips the stages whose
+    inputs and commands did not change since their last run
+
+    Parameters
+    ----------
+
+        stages : a list of stages, each one a dictionary containing its
+        name, inputs, outputs and commands, the commands being either a list
+        or a function returning the list once the inputs exist
+        state_file : the JSON file of the state
+        jobs : the maximum number of stages running at the same time
+        force : the names of the stages to run even if up to date
+        dry_run : only print the stages that would be run
+        log_dir : the directory where to save the output of each stage
+
+    Returns
+    -------
+
+        status : a dictionary containing the status of each stage, "run",
+        "skipped" or "failed"
+    """
+
+    state = load_state(state_file)
+    deps = get_stage_dependencies(stages)
+    by_name = {stage["name"] : stage for stage in stages}
+    lock = threading.Lock()
+    status = {}
+
+    if not os.path.exists(log_dir) and not dry_run:
+        os.makedirs(log_dir)
+
+    def process(stage):
+        name = stage["name"]
+
+        # in a dry run, the inputs produced by a stage that would be run
+        # are considered as changed
+        if dry_run and any(status.get(d) == "run" for d in deps[name]):
+            return "run", None
+
+        # the commands of some stages depend on the content of their inputs
+        if (callable(stage["commands"])
+            and all(os.path.exists(i) for i in stage["inputs"])):
+                stage = dict(stage, commands = stage["commands"]())
+
+        key = get_stage_key(stage, state["files"], lock)
+
+        if (name not in force and key and state["stages"].get(name) == key
+            and all(os.path.exists(o) for o in stage["outputs"])):
+                return "skipped", key
+
+        if not dry_run:
+            run_stage(stage, f"{log_dir}/{name}.log")
+
+        return "run", key
+
+    pending = [stage["name"] for stage in stages]
+    running = {}
+
+    with ThreadPoolExecutor(max_workers = jobs) as pool:
+
+        while pending or running:
+
+            failed = "failed" in status.values()
+            ready = [n for n in pending if not failed
+                and all(d in status for d in deps[n])]
+
+            for name in ready:
+                pending.remove(name)
+                print(f"*** RUNNING {name} ***" if not dry_run else
+                    f"checking {name}")
+                running[pool.submit(process, by_name[name])] = name
+
+            if not running:
+                break
+
+            done, not_done = wait(running, return_when = FIRST_COMPLETED)
+
+            for future in done:
+                name = running.pop(future)
+                # any error of a stage, including in the function giving
+                # its commands, only fails this stage, so that the state of
+                # the other ones is still saved
+                try:
+                    status[name], key = future.result()
+                except Exception as e:
+                    print(f"ERROR : {name} failed, {e}")
+                    status[name] = "failed"
+                    continue
+
+                print(f"{name} : {status[name]}")
+                if status[name] == "run" and key and not dry_run:
+                    state["stages"][name] = key
+                    with lock:
+                        save_state(state_file, state)
+
+    for name in pending:
+        status[name] = "not run"
+        print(f"{name} : not run")
+
+    return status
+
+
+def run_stage(stage, log):
+    """
+    Runs the commands of a stage one after the other, a command being a list
+    of arguments or a shell command line
+
+    Parameters
+    ----------
+
+        stage : a dictionary containing the name, inputs, outputs and
+        commands of the stage
+        log : the file where to save the output of the stage
+    """
+
+    with open(log, "w") as f_log:
+        for command in stage["commands"]:
+            subprocess.run(command, shell = isinstance(command, str),
+                stdout = f_log, stderr = subprocess.STDOUT, check = True)
+
+
+def save_state(file, state):
+    """
+    Saves the state of the pipeline, replacing the previous one only once
+    fully written
+
+    Parameters
+    ----------
+
+        file : the JSON file of the state
+        state : a dictionary containing the signature of each file hashed
+        and the fingerprint of each stage run
+    """
+
+    with open(f"{file}.tmp", "w") as f_out:
+        json.dump(state, f_out)
+
+    os.replace(f"{file}.tmp", file)
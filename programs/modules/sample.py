@@ -0,0 +1,519 @@
+"""
+This module file contains the functions necessary for the operation of
+sample.py
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+A copy of the GNU General Public License is available at
+http://www.gnu.org/licenses/gpl-3.0.html
+"""
+
+__author__ = "KLEIN Dylan"
+__license__ = "GPL"
+__version__ = "1.0.0"
+__email__ = "klein.dylan@outlook.com"
+
+
+#================================== Modules ==================================#
+
+import hashlib
+import random
+from modules.functions import (PROGRESS_EVERY, get_strain_prefix, open_file,
+    report_progress)
+
+#=============================================================================#
+
+
+def find_root(parent, n):
+    """
+    Finds the representative of the family of a node, halving the path to
+    it on the way
+
+    Parameters
+    ----------
+
+        parent : a dictionary containing the parent of each node
+        n : a node
+
+    Returns
+    -------
+
+        n : the representative of the family of the node
+    """
+
+    while parent[n] != n:
+        parent[n] = parent[parent[n]]
+        n = parent[n]
+
+    return n
+
+
+def get_error_text(error):
+    """
+    Formats the standard error of an estimate
+
+    Parameters
+    ----------
+
+        error : the standard error, or None
+
+    Returns
+    -------
+
+        the text following the estimate
+    """
+
+    return "" if error is None else f" (standard error {error})"
+
+
+def get_estimates(stats):
+    """
+    Estimates the numbers of alignments and of nodes of the full input from
+    those of the sample, each alignment or node being weighted by the
+    inverse of its probability to be sampled
+
+    Parameters
+    ----------
+
+        stats : a dictionary containing the mode and the counts of a sample
+
+    Returns
+    -------
+
+        estimates : a dictionary containing the estimated alignments and
+        nodes of the full input, and the factors to multiply the counts of
+        the sample by, None for the nodes of a uniform sample
+    """
+
+    mode = stats["mode"]
+
+    if mode == "uniform":
+        # each alignment has the same probability to be in the reservoir,
+        # but a node is sampled if any of its alignments is
+        p = min(1, stats["sampled"] / max(1, stats["alignments"]))
+        alignments = stats["sampled"] / p if p else 0
+        nodes = None
+
+    elif mode == "strains":
+        # an alignment within a strain is sampled with the probability of
+        # its strain, an alignment between two strains with its square
+        p = stats["units_sampled"] / max(1, stats["units"])
+        alignments = (stats["intra"] / p + stats["inter"] / p ** 2
+            if p else 0)
+        nodes = stats["nodes"] / p if p else 0
+
+    else:
+        # a family is sampled with all its alignments and nodes
+        p = stats["units_sampled"] / max(1, stats["units"])
+        alignments = stats["sampled"] / p if p else 0
+        nodes = stats["nodes"] / p if p else 0
+
+    estimates = {"probability" : p, "alignments" : round(alignments),
+        "nodes" : None if nodes is None else round(nodes),
+        "alignments_factor" : alignments / max(1, stats["sampled"]),
+        "nodes_factor" : None if nodes is None
+            else nodes / max(1, stats["nodes"])}
+
+    # the strains or the families sampled are a simple random sample of
+    # them, whose sizes vary a lot, hence the standard errors
+    for k in ["alignments", "nodes"]:
+        if f"unit_{k}" in stats:
+            error = get_standard_error(stats[f"unit_{k}"], stats["units"])
+            estimates[f"{k}_error"] = None if error is None else round(error)
+
+    return estimates
+
+
+def get_families(inputfile):
+    """
+    Groups the nodes of the alignments into families, the connected
+    components of the unfiltered SSN, each family being represented by its
+    smallest node ID so that it does not depend on the order of the
+    alignments
+
+    Parameters
+    ----------
+
+        inputfile : the diamond output
+
+    Returns
+    -------
+
+        families : a dictionary containing the family of each node
+    """
+
+    parent = {}
+
+    with open_file(inputfile) as f_in:
+        for index, line in enumerate(f_in):
+
+            if index % PROGRESS_EVERY == 0:
+                report_progress("alignments", index)
+
+            q, s = get_nodes(line)
+            if q is None:
+                continue
+
+            for n in (q, s):
+                if n not in parent:
+                    parent[n] = n
+
+            rq, rs = find_root(parent, q), find_root(parent, s)
+            if rq != rs:
+                parent[rs] = rq
+
+    smallest = {}
+    for n in parent:
+        r = find_root(parent, n)
+        if r not in smallest or n < smallest[r]:
+            smallest[r] = n
+
+    return {n : smallest[find_root(parent, n)] for n in parent}
+
+
+def get_nodes(line):
+    """
+    Retrieves the query and subject IDs of an alignment
+
+    Parameters
+    ----------
+
+        line : a line of a diamond output
+
+    Returns
+    -------
+
+        q : the query ID, None for a blank line
+        s : the subject ID
+    """
+
+    fields = line.rstrip("\n").split("\t", 5)
+    if len(fields) < 5:
+        return None, None
+
+    return fields[0], fields[4]
+
+
+def get_standard_error(values, nb_units):
+    """
+    Computes the standard error of the estimate of a total from the values
+    of a simple random sample of units
+
+    Parameters
+    ----------
+
+        values : the value of each unit sampled
+        nb_units : the number of units of the population
+
+    Returns
+    -------
+
+        the standard error of the estimated total, None if fewer than two
+        units were sampled, the variance of the units being then unknown
+    """
+
+    n = len(values)
+    if n < 2:
+        return None
+
+    mean = sum(values) / n
+    var = sum((v - mean) ** 2 for v in values) / (n - 1)
+
+    return nb_units * (var / n * (1 - n / nb_units)) ** 0.5
+
+
+def is_selected(key, fraction, seed):
+    """
+    Draws whether a strain or a family is sampled, from a hash of its key
+    and of the seed, so that the draw is reproducible and the sample of a
+    larger fraction contains the sample of a smaller one
+
+    Parameters
+    ----------
+
+        key : a strain prefix or a family
+        fraction : the probability to be sampled
+        seed : the seed of the sample
+
+    Returns
+    -------
+
+        True if the key is sampled
+    """
+
+    h = hashlib.blake2b(f"{seed}\t{key}".encode(), digest_size = 8)
+
+    return int.from_bytes(h.digest(), "big") < fraction * 2 ** 64
+
+
+def sample_families(inputfile, output, fraction, seed):
+    """
+    Writes all the alignments of a random subset of protein families, the
+    input being read twice
+
+    Parameters
+    ----------
+
+        inputfile : the diamond output, a regular file
+        output : the sampled diamond output
+        fraction : the probability of a family to be sampled
+        seed : the seed of the sample
+
+    Returns
+    -------
+
+        stats : a dictionary containing the counts of the input and of the
+        sample
+        keep : a function telling whether a node ID is sampled
+    """
+
+    families = get_families(inputfile)
+    units = set(families.values())
+    selected = set(f for f in units if is_selected(f, fraction, seed))
+
+    stats = {"mode" : "families", "alignments" : 0, "sampled" : 0,
+        "units" : len(units), "units_sampled" : len(selected),
+        "input_nodes" : len(families)}
+    unit_alignments = dict.fromkeys(selected, 0)
+
+    with open_file(inputfile) as f_in, open(output, "w") as f_out:
+        for line in f_in:
+            q, s = get_nodes(line)
+            if q is None:
+                continue
+
+            stats["alignments"] += 1
+            if families[q] in selected:
+                f_out.write(line)
+                stats["sampled"] += 1
+                unit_alignments[families[q]] += 1
+
+    unit_nodes = dict.fromkeys(selected, 0)
+    for n, f in families.items():
+        if f in selected:
+            unit_nodes[f] += 1
+
+    stats["nodes"] = sum(unit_nodes.values())
+    stats["unit_alignments"] = list(unit_alignments.values())
+    stats["unit_nodes"] = list(unit_nodes.values())
+
+    # a node without alignment is a family by itself
+    def keep(n):
+        if n in families:
+            return families[n] in selected
+        return is_selected(n, fraction, seed)
+
+    return stats, keep
+
+
+def sample_strains(inputfile, output, fraction, seed):
+    """
+    Writes the alignments between the proteins of a random subset of
+    strains, in a single pass so that the input can be a stream
+
+    Parameters
+    ----------
+
+        inputfile : the diamond output, or "-" for the standard input
+        output : the sampled diamond output
+        fraction : the probability of a strain to be sampled
+        seed : the seed of the sample
+
+    Returns
+    -------
+
+        stats : a dictionary containing the counts of the input and of the
+        sample
+        keep : a function telling whether a node ID is sampled
+    """
+
+    strains = {}
+    stats = {"mode" : "strains", "alignments" : 0, "sampled" : 0,
+        "intra" : 0, "inter" : 0}
+    nodes = set([])
+
+    with open_file(inputfile) as f_in, open(output, "w") as f_out:
+        for index, line in enumerate(f_in):
+
+            if index % PROGRESS_EVERY == 0:
+                report_progress("alignments", index)
+
+            q, s = get_nodes(line)
+            if q is None:
+                continue
+
+            stats["alignments"] += 1
+            sq, ss = get_strain_prefix(q), get_strain_prefix(s)
+            for strain in (sq, ss):
+                if strain not in strains:
+                    strains[strain] = is_selected(strain, fraction, seed)
+
+            if strains[sq] and strains[ss]:
+                f_out.write(line)
+                stats["sampled"] += 1
+                stats["intra" if sq == ss else "inter"] += 1
+                nodes.update((q, s))
+
+    stats["nodes"] = len(nodes)
+    stats["units"] = len(strains)
+    stats["units_sampled"] = sum(strains.values())
+
+    # the alignments between two strains belong to no strain alone, so only
+    # the nodes of the strains sampled have a standard error
+    unit_nodes = dict((k, 0) for k, v in strains.items() if v)
+    for n in nodes:
+        unit_nodes[get_strain_prefix(n)] += 1
+    stats["unit_nodes"] = list(unit_nodes.values())
+
+    def keep(n):
+        return is_selected(get_strain_prefix(n), fraction, seed)
+
+    return stats, keep
+
+
+def sample_uniform(inputfile, output, size, seed):
+    """
+    Writes a uniform sample of the alignments, drawn with a reservoir in a
+    single pass so that the input can be a stream, in the order of the input
+
+    Parameters
+    ----------
+
+        inputfile : the diamond output, or "-" for the standard input
+        output : the sampled diamond output
+        size : the number of alignments sampled
+        seed : the seed of the sample
+
+    Returns
+    -------
+
+        stats : a dictionary containing the counts of the input and of the
+        sample
+        keep : a function telling whether a node ID is sampled
+    """
+
+    rng = random.Random(seed)
+    reservoir = []
+    i = 0
+
+    with open_file(inputfile) as f_in:
+        for line in f_in:
+
+            if i % PROGRESS_EVERY == 0:
+                report_progress("alignments", i)
+
+            if get_nodes(line)[0] is None:
+                continue
+
+            if i < size:
+                reservoir.append((i, line))
+            else:
+                j = rng.randrange(i + 1)
+                if j < size:
+                    reservoir[j] = (i, line)
+            i += 1
+
+    reservoir.sort()
+    nodes = set([])
+
+    with open(output, "w") as f_out:
+        for index, line in reservoir:
+            f_out.write(line)
+            nodes.update(get_nodes(line))
+
+    stats = {"mode" : "uniform", "alignments" : i,
+        "sampled" : len(reservoir), "nodes" : len(nodes)}
+
+    return stats, nodes.__contains__
+
+
+def sample_vertices(vertices_file, output, keep):
+    """
+    Writes the vertices of the sample, so that network.py does not add the
+    vertices left out as isolated nodes
+
+    Parameters
+    ----------
+
+        vertices_file : the vertices file of network.py, separated by ";"
+        with a name column
+        output : the sampled vertices file
+        keep : a function telling whether a node ID is sampled
+
+    Returns
+    -------
+
+        the number of vertices sampled
+    """
+
+    nb = 0
+
+    with open_file(vertices_file) as f_in, open(output, "w") as f_out:
+        header = next(f_in)
+        f_out.write(header)
+        col = header.rstrip("\n").split(";").index("name")
+
+        for line in f_in:
+            if keep(line.rstrip("\n").split(";")[col]):
+                f_out.write(line)
+                nb += 1
+
+    return nb
+
+
+def save_report(file, stats, estimates):
+    """
+    Saves the counts of the input and of the sample, with the estimates of
+    the full input from the sample
+
+    Parameters
+    ----------
+
+        file : the report file
+        stats : a dictionary containing the counts of the input and of the
+        sample
+        estimates : a dictionary containing the estimates of the full input
+        and the factors to multiply the counts of the sample by
+
+    Returns
+    -------
+
+        lines : the lines of the report
+    """
+
+    lines = [f"mode : {stats['mode']}",
+        f"nb of alignments in input : {stats['alignments']}",
+        f"nb of alignments in sample : {stats['sampled']}",
+        f"nb of nodes in sample : {stats['nodes']}"]
+
+    if "units" in stats:
+        unit = stats["mode"]
+        lines += [f"nb of {unit} in input : {stats['units']}",
+            f"nb of {unit} in sample : {stats['units_sampled']}"]
+    if "input_nodes" in stats:
+        lines.append(f"nb of nodes in input : {stats['input_nodes']}")
+
+    lines += [f"sampling probability : {estimates['probability']:.4g}",
+        f"estimated nb of alignments in input : {estimates['alignments']}"
+        + get_error_text(estimates.get("alignments_error")),
+        f"factor of the alignment counts : "
+        f"{estimates['alignments_factor']:.4g}"]
+
+    if estimates["nodes"] is None:
+        lines.append("the nodes of a uniform sample do not scale linearly, "
+            "use the strains or families mode to estimate them")
+    else:
+        lines += [f"estimated nb of nodes in input : {estimates['nodes']}"
+            + get_error_text(estimates.get("nodes_error")),
+            f"factor of the node counts : {estimates['nodes_factor']:.4g}"]
+
+    with open(file, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+    return lines
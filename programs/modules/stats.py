@@ -0,0 +1,265 @@
+"""
+This module file contains the functions necessary for the operation of
+stats.py
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+A copy of the GNU General Public License is available at
+http://www.gnu.org/licenses/gpl-3.0.html
+"""
+
+__author__ = "KLEIN Dylan"
+__license__ = "GPL"
+__version__ = "1.0.0"
+__email__ = "klein.dylan@outlook.com"
+
+
+#================================== Modules ==================================#
+
+import hashlib
+import math
+from modules.functions import PROGRESS_EVERY, open_file, report_progress
+
+#=============================================================================#
+
+
+def add_hll(registers, h, precision):
+    """
+    Adds the hash of an item to the registers of a HyperLogLog
+
+    Parameters
+    ----------
+
+        registers : the bytearray of the 2 ** precision registers
+        h : a 64 bits hash of the item
+        precision : the number of bits of the hash indexing the registers
+    """
+
+    bits = 64 - precision
+    index = h >> bits
+    rank = bits - (h & ((1 << bits) - 1)).bit_length() + 1
+    if rank > registers[index]:
+        registers[index] = rank
+
+
+def add_query(histograms, counts):
+    """
+    Adds the number of hits of a query at each threshold to the degree
+    histograms
+
+    Parameters
+    ----------
+
+        histograms : a list containing, for each threshold, a dictionary
+        containing the number of queries by degree
+        counts : the number of hits of the query at each threshold
+    """
+
+    for k, c in enumerate(counts):
+        histograms[k][c] = histograms[k].get(c, 0) + 1
+
+
+def count_hll(registers, precision):
+    """
+    Estimates the number of distinct items added to a HyperLogLog, with the
+    correction of the small counts
+
+    Parameters
+    ----------
+
+        registers : the bytearray of the 2 ** precision registers
+        precision : the number of bits of the hash indexing the registers
+
+    Returns
+    -------
+
+        the estimated number of distinct items
+    """
+
+    m = 1 << precision
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / sum(2.0 ** -r for r in registers)
+
+    zeros = registers.count(0)
+    if estimate <= 2.5 * m and zeros:
+        estimate = m * math.log(m / zeros)
+
+    return round(estimate)
+
+
+def get_hash(node):
+    """
+    Hashes a node ID on 64 bits, the same way in every run
+
+    Parameters
+    ----------
+
+        node : a node ID
+
+    Returns
+    -------
+
+        the hash as an integer
+    """
+
+    return int.from_bytes(hashlib.blake2b(node.encode(),
+        digest_size = 8).digest(), "big")
+
+
+def get_stream_stats(inputfile, thresholds, precision = 0):
+    """
+    Computes, in a single pass over a diamond output and for several
+    coverage and identity thresholds at once, the number of alignments, the
+    number of distinct nodes over both columns and the histogram of the
+    degrees of the queries, without building a graph. The degree of a query
+    is its number of hits without itself, the alignments of an all-versus-
+    all diamond blastp being nearly symmetric
+
+    Parameters
+    ----------
+
+        inputfile : the diamond output, or "-" for the standard input
+        thresholds : a list of tuples containing a coverage and an identity
+        percentage, kept like filter.py does
+        precision : 0 to count the distinct nodes exactly with sets, else the
+        precision of the HyperLogLog counting them in 2 ** precision bytes
+        by threshold. The degrees are then counted for each run of
+        consecutive alignments of a query, as diamond writes them
+
+    Returns
+    -------
+
+        stats : a list containing, for each threshold, a dictionary of the
+        number of alignments, the number of nodes and the degree histogram
+        grouped : False if a query had several runs of alignments, making
+        the approximate histograms wrong
+    """
+
+    nb = len(thresholds)
+    alignments = [0 for t in thresholds]
+    histograms = [{} for t in thresholds]
+
+    if precision:
+        registers = [bytearray(1 << precision) for t in thresholds]
+        queries = bytearray(1 << precision)
+    else:
+        nodes = [set([]) for t in thresholds]
+        degrees = {}
+
+    runs, previous, counts = 0, None, None
+
+    with open_file(inputfile) as f_in:
+        for index, line in enumerate(f_in):
+
+            if index % PROGRESS_EVERY == 0:
+                report_progress("alignments", index)
+
+            row = line.rstrip("\n").split("\t")
+            if len(row) < 11 or not row[9] or not row[10]:
+                continue
+
+            q, s = row[0], row[4]
+            pident, ppos = float(row[9]), float(row[10])
+
+            if precision:
+                if q != previous:
+                    if counts is not None:
+                        add_query(histograms, counts)
+                    counts = [0] * nb
+                    previous = q
+                    runs += 1
+                    add_hll(queries, get_hash(q), precision)
+                hq, hs = None, None
+            else:
+                counts = degrees.get(q)
+                if counts is None:
+                    counts = degrees[q] = [0] * nb
+
+            if q == s:
+                continue
+
+            for k, (cov, ident) in enumerate(thresholds):
+                if pident >= ident and ppos >= cov:
+                    alignments[k] += 1
+                    counts[k] += 1
+
+                    if precision:
+                        if hq is None:
+                            hq, hs = get_hash(q), get_hash(s)
+                        add_hll(registers[k], hq, precision)
+                        add_hll(registers[k], hs, precision)
+                    else:
+                        nodes[k].add(q)
+                        nodes[k].add(s)
+
+    grouped = True
+    if precision:
+        if counts is not None:
+            add_query(histograms, counts)
+
+        # the runs of a query are counted as distinct queries, which the
+        # HyperLogLog of the queries reveals beyond its error
+        grouped = runs <= count_hll(queries, precision) * (1 + 3 * 1.04
+            / math.sqrt(1 << precision))
+        nb_nodes = [count_hll(r, precision) for r in registers]
+    else:
+        for counts in degrees.values():
+            add_query(histograms, counts)
+        nb_nodes = [len(n) for n in nodes]
+
+    stats = [{"alignments" : alignments[k], "nodes" : nb_nodes[k],
+        "histogram" : histograms[k]} for k in range(nb)]
+
+    return stats, grouped
+
+
+def save_stream_stats(prefix, thresholds, stats):
+    """
+    Saves the statistics of each threshold in <prefix>_thresholds.tsv, with
+    the mean degree and the density of the network, and the degree
+    histograms in <prefix>_degrees.tsv
+
+    Parameters
+    ----------
+
+        prefix : the prefix of the output files
+        thresholds : a list of tuples containing a coverage and an identity
+        percentage
+        stats : a list containing, for each threshold, a dictionary of the
+        number of alignments, the number of nodes and the degree histogram
+
+    Returns
+    -------
+
+        rows : the rows of <prefix>_thresholds.tsv
+    """
+
+    fieldnames = ["pcov", "pident", "alignments", "nodes", "mean_degree",
+        "max_degree", "density"]
+    rows = []
+
+    for (cov, ident), s in zip(thresholds, stats):
+        n, e = s["nodes"], s["alignments"]
+        degrees = [d for d, c in s["histogram"].items() if c]
+        rows.append([cov, ident, e, n, round(e / n, 3) if n else 0,
+            max(degrees) if degrees else 0,
+            f"{e / (n * (n - 1)):.3g}" if n > 1 else 0])
+
+    with open(f"{prefix}_thresholds.tsv", "w") as f_out:
+        f_out.write("\t".join(fieldnames) + "\n")
+        for row in rows:
+            f_out.write("\t".join(str(v) for v in row) + "\n")
+
+    with open(f"{prefix}_degrees.tsv", "w") as f_out:
+        f_out.write("pcov\tpident\tdegree\tqueries\n")
+        for (cov, ident), s in zip(thresholds, stats):
+            for d in sorted(s["histogram"]):
+                f_out.write(f"{cov}\t{ident}\t{d}\t{s['histogram'][d]}\n")
+
+    return [fieldnames] + rows
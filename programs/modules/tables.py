@@ -0,0 +1,306 @@
+"""
+This module file contains the functions necessary for the operation of
+tables.py
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+A copy of the GNU General Public License is available at
+http://www.gnu.org/licenses/gpl-3.0.html
+"""
+
+__author__ = "KLEIN Dylan"
+__license__ = "GPL"
+__version__ = "1.0.0"
+__email__ = "klein.dylan@outlook.com"
+
+
+#================================== Modules ==================================#
+
+import re
+from modules.functions import read_file
+
+#=============================================================================#
+
+
+def add_id(row, index):
+    """
+    Creates a new row containing the METdb ID
+
+    Parameters
+    ----------
+
+        row : a dictionary depicting a row of a CSV file
+        index : the index of the file where to search for the ID, given by
+        get_name_index
+
+    Returns
+    -------
+
+        new_row : the row with the ID added
+
+    Examples
+    --------
+
+    A row without strain name keeps its ID, its key ending with "-":
+
+    >>> index = {"prorocentrum-minimum" :
+    ...     ["METDB0003-PROROCENTRUM-MINIMUM-CCMP1329"]}
+    >>> add_id({"Genus_Metdb" : "Prorocentrum", "Species_Metdb" : "minimum",
+    ...     "Strain name_Metdb" : ""}, index)["Metdb_ID"]
+    'METDB0003-PROROCENTRUM-MINIMUM'
+    """
+
+    gen, sp, strain = row["Genus_Metdb"].replace(" ", ""), row["Species_Metdb"], row["Strain name_Metdb"].replace(" ", "")
+    check_r = "{}-{}-{}".format(gen, sp, strain).lower()
+
+    # only the lines sharing the normalized key are searched, a key starting
+    # or ending inside a word being left to the unmatched rows. The "-" left
+    # by an empty field is not part of the indexed words
+    key = normalize_name(check_r).strip("-")
+    line = next((l for l in index.get(key, []) if check_r in l.lower()),
+        None)
+
+    if line:
+        new_row = add_id_to_line(line, row)
+        return new_row
+
+
+def add_id_to_line(line, row):
+    """
+    Adds ID to a key in a dictionary
+
+    Parameters
+    ----------
+
+        line : a line of a file
+        row : a dictionary depicting a row of a CSV file
+
+    Returns
+    -------
+
+        row : the dictionary with a value added
+    """
+
+    idt = line.split("-")[0:3]
+    row["Metdb_ID"] = "-".join(idt)
+
+    return row
+
+
+def get_name_index(file):
+    """
+    Indexes the lines of the file containing all METdb IDs by every
+    sequence of words they contain, once normalized
+
+    Parameters
+    ----------
+
+        file : the file containing all METdb IDs
+
+    Returns
+    -------
+
+        spans : a dictionary containing the lines of each normalized
+        sequence of words, in the order of the file
+    """
+
+    spans = {}
+
+    for line in read_file(file):
+        line = line.replace("_", "-").upper()
+
+        words = normalize_name(line).split("-")
+        for k in set("-".join(words[i:j]) for i in range(len(words))
+            for j in range(i + 1, len(words) + 1)):
+            spans.setdefault(k, []).append(line)
+
+    return spans
+
+
+def get_new_row(row, common_column, index):
+    """
+    Retrieves a new row, which is a merged row from two different rows
+    
+    Parameters
+    ----------
+
+        row : a dictionary depicting a row of a CSV file
+        common_column : a common column found in two different rows
+        index : the rows of a file by common column value, given by
+        get_row_index
+
+    Returns
+    -------
+
+        row : the dictionary with a value added
+    """
+
+    r = index.get(row.get(common_column, ""))
+
+    if r:
+        new_row = merge_two_rows(row, r)
+        return new_row
+
+
+def get_row_index(rows, common_column):
+    """
+    Indexes rows by the value of a column, keeping the first row of each
+    value
+
+    Parameters
+    ----------
+
+        rows : a list of dictionaries depicting the rows of a CSV file
+        common_column : the column to index
+
+    Returns
+    -------
+
+        index : a dictionary containing the first row of each value
+    """
+
+    index = {}
+
+    for r in rows:
+        index.setdefault(r.get(common_column), r)
+
+    return index
+
+
+def merge_tables(tables, name_index):
+    """
+    Merges several tables in memory: the METdb ID is added to each row of
+    the first table, then the empty values of each row are filled with the
+    row of each following table sharing its ID column
+
+    Parameters
+    ----------
+
+        tables : a list of tuples containing the filename, the fieldnames
+        and the rows of each table, the first one being the table you want
+        the data happened to
+        name_index : the index of the file containing all METdb IDs, given
+        by get_name_index
+
+    Returns
+    -------
+
+        with_id : the rows of the first table with the ID added
+        rows : the merged rows
+        unmatched : a list of tuples containing the filename, the row number
+        and the value of each row that did not match
+    """
+
+    file, fieldnames, rows = tables[0]
+    unmatched = []
+
+    for n, row in enumerate(rows):
+        if not add_id(row, name_index):
+            key = "-".join([row["Genus_Metdb"], row["Species_Metdb"],
+                row["Strain name_Metdb"]])
+            unmatched.append((file, n + 1, key))
+
+    with_id = [dict(row) for row in rows]
+
+    for file, fieldnames_file, table in tables[1:]:
+
+        # set the common column as search_for_word does on the common
+        # fieldnames, in the order of the file
+        common_column = search_for_word(fieldnames_file, "ID")
+
+        if not common_column:
+            raise ValueError(f"Common column not found in {file}")
+
+        row_index = get_row_index(table, common_column)
+
+        for n, row in enumerate(rows):
+            if not get_new_row(row, common_column, row_index):
+                unmatched.append((file, n + 1, row.get(common_column, "")))
+
+    return with_id, rows, unmatched
+
+
+def merge_two_rows(row1, row2):
+    """
+    Merge two rows into one
+
+    Parameters
+    ----------
+
+        row1 : a dictionary depicting a row of a CSV file
+        row2 : a dictionary depicting a row of a CSV file
+
+    Returns
+    -------
+
+        row1 : a dictionary containing informations of both rows given in arg
+    """
+
+    for k, v in row2.items():
+        if k not in row1.keys() or not row1[k]:
+            row1[k] = v
+
+    return row1
+
+
+def normalize_name(name):
+    """
+    Normalizes a name to compare Genus-Species-Strain keys
+
+    Parameters
+    ----------
+
+        name : a name
+
+    Returns
+    -------
+
+        the name in lower case, with "_", "." and " " replaced by "-"
+    """
+
+    return re.sub(r"[_. ]", "-", name.lower())
+
+
+def save_unmatched(unmatched, output):
+    """
+    Saves the rows that did not match in a file
+
+    Parameters
+    ----------
+
+        unmatched : a list of tuples containing the filename, the row number
+        and the value of each row that did not match
+        output : the output file
+    """
+
+    with open(output, "w") as f:
+        f.write("file\trow\tvalue\n")
+        for file, n, value in unmatched:
+            f.write(f"{file}\t{n}\t{value}\n")
+
+
+def search_for_word(common_fieldnames, string):
+    """
+    Search a word in a list
+
+    Parameters
+    ----------
+
+        common_fieldnames : a list of common fieldnames of two CSV files
+        string : the word to search for
+
+    Returns
+    -------
+
+        fn : the fieldname where the word is contained in
+    """
+
+    for fn in common_fieldnames:
+        if string in fn:
+            return fn
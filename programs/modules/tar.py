@@ -0,0 +1,117 @@
+"""
+This module file contains the functions necessary for the operation of
+tar.py
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+A copy of the GNU General Public License is available at
+http://www.gnu.org/licenses/gpl-3.0.html
+"""
+
+__author__ = "KLEIN Dylan"
+__license__ = "GPL"
+__version__ = "1.0.0"
+__email__ = "klein.dylan@outlook.com"
+
+
+#================================== Modules ==================================#
+
+from concurrent.futures import ThreadPoolExecutor
+import fnmatch
+import gzip
+import os
+import shutil
+import tarfile
+import threading
+
+#=============================================================================#
+
+
+def compress_tar_member(data, output, mtime):
+    """
+    Compresses the content of a tar member into a gzip file
+
+    Parameters
+    ----------
+
+        data : the content of the member
+        output : the gzip file
+        mtime : the modification time of the member
+    """
+
+    with open(output, "wb") as f_out:
+        f_out.write(gzip.compress(data, compresslevel = 6, mtime = mtime))
+
+
+def extract_compress_tar_file(tar_file, output = "./extracted_files",
+    workers = 1, max_memory = 1 << 30, pattern = None):
+    """
+    Compresses each file of a tar.gz archive into a gzip file, streaming
+    each member from the archive without extracting it. The members are
+    compressed by a pool of threads, the members being read while the
+    total size of the members waiting to be compressed stays under a
+    memory budget; members larger than the budget are compressed by
+    streaming.
+
+    Parameters
+    ----------
+
+        tar_file : the tar.gz archive
+        output : the directory where to save the gzip files
+        workers : the number of threads compressing the members
+        max_memory : the memory budget, in bytes
+        pattern : a pattern the member names must match
+    """
+
+    root = os.path.realpath(output)
+    in_use = [0]
+    cond = threading.Condition()
+
+    def compress(data, path, mtime):
+        try:
+            compress_tar_member(data, path, mtime)
+        finally:
+            with cond:
+                in_use[0] -= len(data)
+                cond.notify_all()
+
+    with tarfile.open(tar_file, "r|*") as tf, \
+        ThreadPoolExecutor(max_workers = workers) as pool:
+
+        futures = []
+
+        for member in tf:
+
+            if not member.isfile():
+                continue
+            if pattern and not fnmatch.fnmatch(member.name, pattern):
+                continue
+
+            path = os.path.realpath(os.path.join(root, f"{member.name}.gz"))
+            if not path.startswith(root + os.sep):
+                continue
+            os.makedirs(os.path.dirname(path), exist_ok = True)
+
+            f_in = tf.extractfile(member)
+
+            if member.size > max_memory:
+                with gzip.GzipFile(path, "wb", compresslevel = 6,
+                    mtime = member.mtime) as f_out:
+                    shutil.copyfileobj(f_in, f_out, 1 << 20)
+                continue
+
+            with cond:
+                cond.wait_for(lambda: in_use[0] + member.size <= max_memory)
+                in_use[0] += member.size
+
+            futures.append(pool.submit(compress, f_in.read(), path,
+                member.mtime))
+
+        for f in futures:
+            f.result()
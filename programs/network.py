@@ -22,7 +22,9 @@ __email__ = "klein.dylan@outlook.com"
 #================================== Modules ==================================#
 
 import argparse
+import os
 from modules.functions import *
+from modules.network import *
 
 #=============================================================================#
 
@@ -42,6 +44,26 @@ def arguments():
         type = isfile, required = True, nargs = "+",
         help = "")
 
+    # Optional arguments
+    parser.add_argument("-t", "--abund_tsv", dest = "abund_tsv",
+        action = "store_true", required = False, default = False,
+        help = "also export the abundance matrix as a TSV file")
+    parser.add_argument("-w", "--weight", dest = "weight",
+        type = str, required = False, default = None,
+        help = "the edges file column to keep as edge weight")
+    parser.add_argument("-c", "--components_only", dest = "components_only",
+        action = "store_true", required = False, default = False,
+        help = "keep only a spanning forest of the edges, enough for the \
+        connected components outputs, to bound the memory used")
+    parser.add_argument("-f", "--write_forest", dest = "write_forest",
+        action = "store_true", required = False, default = False,
+        help = "with --components_only, save the spanning forest as a \
+        reduced graph")
+    parser.add_argument("-p", "--workers", dest = "workers",
+        type = int, required = False, default = 1,
+        help = "the number of processes computing the connected components \
+        data")
+
     return parser.parse_args()
 
 
@@ -59,6 +81,9 @@ def main():
     # initialize the index
     i = 0
 
+    # vertices tables loaded, by path
+    vertices = {}
+
     while i < l_e:
 
         # get coverage percentage
@@ -67,49 +92,78 @@ def main():
         # get identity percentage
         ident = args.edges_file[i].split("_")[3].split(".")[0]
 
-        # creates pandas dataframe of edges and nodes
-        edges = pd.read_csv(args.edges_file[i], sep = ";")
-        nodes = pd.read_csv(args.vertices_file[i], sep = ";")
+        # get pandas dataframe of nodes
+        set_phase(f"{cov}_{ident} read graph")
+        nodes = get_vertices(args.vertices_file[i], vertices)
 
-        # create an igraph Graph
-        g = ig.Graph.DataFrame(edges, directed = False, vertices = nodes)
-        
-        # remove isolated nodes
-        to_del = [v.index for v in g.vs if v.degree() == 0]
-        g.delete_vertices(to_del)
+        # create an igraph Graph without isolated nodes, or only its
+        # spanning forest if only the connected components are needed
+        if args.components_only:
+            g = get_forest(args.edges_file[i], nodes)
+        else:
+            g = get_graph(args.edges_file[i], nodes, args.weight)
 
-        # decompose graph into subgraph with minimum 3 neighbours
-        g_cc = g.decompose(minelements = 3)
+        add_count("vertices", g.vcount())
+        add_count("edges", g.ecount())
+        set_phase(f"{cov}_{ident} components")
 
-        # get number of connected components
-        nb_of_subgraph = len(g_cc)
+        if args.workers > 1:
 
-        # get function, phylum, genus and trophy dictionaries
-        fn, tp, tg, tr, ab, db_sp = get_data_from_cc(g_cc)
-    
-        # get percentages of function, phylum, genus and trophy dictionaries
-        fn_p, tp_p, tg_p, tr_p = get_data_percent(fn, tp, tg, tr)
+            # get the connected component of each node, with minimum 3 nodes
+            membership, nb_of_subgraph = get_cc_membership(g, minelements = 3)
+
+            # get function, percentages, trophy count, unique trophy,
+            # homogeneity and entropy dictionaries with a pool of processes
+            fn, fn_p, tp_p, tg_p, tr_p, tr_c, u_tr, hi, f_en = \
+                get_data_from_cc_parallel(g, membership, nb_of_subgraph,
+                args.workers)
+
+            # get the sparse abundance matrix (CC x strain)
+            ab, ab_rows, ab_cols = get_abund_matrix_from_membership(
+                membership, g.vs["name"], nb_of_subgraph)
 
+        else:
 
-        # get trophy count, unique trophy, homogeneity and entropy
-        tr_c, u_tr, hi, f_en = get_data_from_cc_dicts(tr, db_sp, fn_p)
+            # decompose graph into subgraph with minimum 3 neighbours
+            g_cc = g.decompose(minelements = 3)
+
+            # get number of connected components
+            nb_of_subgraph = len(g_cc)
+
+            # get function, phylum, genus and trophy dictionaries
+            fn, tp, tg, tr, db_sp = get_data_from_cc(g_cc)
+
+            # get the sparse abundance matrix (CC x strain)
+            ab, ab_rows, ab_cols = get_abund_matrix(g_cc)
+
+            # get percentages of function, phylum, genus and trophy
+            # dictionaries
+            fn_p, tp_p, tg_p, tr_p = get_data_percent(fn, tp, tg, tr)
+
+            # get trophy count, unique trophy, homogeneity and entropy
+            tr_c, u_tr, hi, f_en = get_data_from_cc_dicts(tr, db_sp, fn_p)
 
         # get the number of IDs contained in each connected component
         cl = get_cc_len(fn)
 
         # get abudance distribution
-        ab_d = get_abund_distrib(ab)
+        ab_d = get_abund_distrib(ab, ab_cols)
+        add_count("CCs", nb_of_subgraph)
 
         
         # check path
+        set_phase(f"{cov}_{ident} save")
         p = f"../results/{cov}_{ident}"
 
         if not os.path.exists(p):
             os.mkdir(p)
 
         # save all values extracted from the graph
-        output = f"../results/{cov}_{ident}/abund_matrix_{cov}_{ident}.tsv"
-        save_dict_of_dict(ab, output)
+        output = f"../results/{cov}_{ident}/abund_matrix_{cov}_{ident}"
+        save_abund_matrix(ab, ab_rows, ab_cols, output)
+
+        if args.abund_tsv:
+            save_abund_matrix_tsv(ab, ab_rows, ab_cols, f"{output}.tsv")
 
         output = f"../results/{cov}_{ident}/abund_matrix_distrib_{cov}_{ident}.tsv"
         save_dict(ab_d, output)
@@ -141,8 +195,11 @@ def main():
         output = f"../results/{cov}_{ident}/entropy_by_function_{cov}_{ident}.tsv"
         save_dict(f_en, output)
 
-        # save the graph into a graphml format
-        g.write(f = f"../results/{cov}_{ident}/graph_ssn_{cov}_{ident}", format = "graphml")
+        # save the graph (or the reduced graph) into a graphml format
+        if not args.components_only:
+            g.write(f = f"../results/{cov}_{ident}/graph_ssn_{cov}_{ident}", format = "graphml")
+        elif args.write_forest:
+            g.write(f = f"../results/{cov}_{ident}/forest_ssn_{cov}_{ident}", format = "graphml")
 
         # increment the index to go on the next files
         i += 1
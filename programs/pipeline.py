@@ -0,0 +1,269 @@
+"""
+This script runs the whole workflow, from the tar.gz archive of the strains
+to the analysis of the sequence similarity networks. Each stage declares its
+inputs and outputs, so that the stages run in the order of their
+dependencies, the independent ones concurrently, and a stage is skipped when
+its inputs and parameters did not change since its last run.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+A copy of the GNU General Public License is available at
+http://www.gnu.org/licenses/gpl-3.0.html
+"""
+
+__author__ = "KLEIN Dylan"
+__license__ = "GPL"
+__version__ = "1.0.0"
+__email__ = "klein.dylan@outlook.com"
+
+
+#================================== Modules ==================================#
+
+import argparse
+import json
+import os
+import sys
+from modules.functions import *
+from modules.pipeline import *
+
+#=============================================================================#
+
+
+# the parameters of the workflow, which can be replaced with a JSON file
+CONFIG = {
+    "tar_file" : "../data/metdb.tar.gz",
+    "extracted" : "../data/extracted_files",
+    "tr_pattern" : "*.transdecoder.pep*",
+    "an_pattern" : "*annotation*",
+    "tr_files" : "../data/tr_files.txt",
+    "an_files" : "../data/an_files.txt",
+    "csv_files" : ["../data/metdb.csv"],
+    "name_file" : "../data/metdb_ids.txt",
+    "table_file" : "../data/metdb_full_count_transcript_final.csv",
+    "records_files" : "../data/records_files",
+    "attribute_files" : "../data/attribute_files",
+    "vertices_file" : "../data/vertices.csv",
+    "nodes_file" : "metdb_nodes.csv",
+    "cat_tr" : "cat_tr.fasta",
+    "db" : "metdb_dia_db",
+    "ssn" : "metdb_ssn",
+    "diamond" : "diamond",
+    "evalue" : 1e-5,
+    "shards" : 16,
+    "overlap" : [60, 80],
+    "identity" : [30, 40],
+    "workers" : 1,
+    "max_memory" : None
+}
+
+
+def arguments():
+    """
+    set arguments
+    """
+
+    parser = argparse.ArgumentParser()
+
+    # Optional arguments
+    parser.add_argument("-c", "--config", dest = "config",
+        type = isfile, required = False, default = None,
+        help = "a JSON file replacing the default parameters of the workflow")
+    parser.add_argument("-s", "--stages", dest = "stages",
+        type = str, required = False, default = None, nargs = "+",
+        help = "the stages to run with the stages they depend on, by default \
+        all stages")
+    parser.add_argument("-f", "--force", dest = "force",
+        type = str, required = False, default = [], nargs = "+",
+        help = "the stages to run even if they are up to date")
+    parser.add_argument("-j", "--jobs", dest = "jobs",
+        type = int, required = False, default = 1,
+        help = "the maximum number of stages running at the same time")
+    parser.add_argument("-n", "--dry_run", dest = "dry_run",
+        action = "store_true", required = False, default = False,
+        help = "only print the stages that would be run")
+    parser.add_argument("-st", "--state", dest = "state",
+        type = str, required = False, default = "../results/pipeline.json",
+        help = "the JSON file keeping the fingerprint of each stage")
+    parser.add_argument("-m", "--max_memory", dest = "max_memory",
+        type = float, required = False, default = None,
+        help = "the memory budget of the largest structures of each stage, \
+        in MB, beyond which they are spilled to temporary files")
+
+    return parser.parse_args()
+
+
+def get_stages(config):
+    """
+    Declares the stages of the workflow
+
+    Parameters
+    ----------
+
+        config : a dictionary containing the parameters of the workflow
+
+    Returns
+    -------
+
+        stages : a list of stages, each one a dictionary containing its
+        name, inputs, outputs and commands
+    """
+
+    c = config
+    py = sys.executable
+    w = str(c["workers"])
+
+    edges = [f"{c['ssn']}_pcov{int(j)}_pident{int(i)}"
+        for i in c["identity"] for j in c["overlap"]]
+
+    def attributes():
+        # one command by strain, as with the SLURM array of attributes.sh
+        commands = [[py, "attributes.py", "-s", f, "-a", c["an_files"],
+            "-t", c["table_file"]]
+            for f in get_files_from_argument(c["records_files"])]
+        commands.append(f"ls -d \"$PWD\"/../results/attributes/*_attributes"
+            f".txt > {c['attribute_files']}")
+        return commands
+
+    tables_outputs = ["MetDB_full_verified.csv", "unmatched_rows.tsv"]
+    if len(c["csv_files"]) > 1:
+        tables_outputs.append("metdb_with_ID.csv")
+
+    stages = [
+        {"name" : "tar",
+        "inputs" : ["tar.py", c["tar_file"]],
+        "outputs" : [c["extracted"]],
+        "commands" : [[py, "tar.py", "-t", c["tar_file"], "-o",
+            c["extracted"], "-w", w]]},
+
+        {"name" : "find",
+        "inputs" : ["find.py", c["extracted"]],
+        "outputs" : [c["tr_files"], c["an_files"]],
+        "commands" : [[py, "find.py", "-p", c["tr_pattern"], c["an_pattern"],
+            "-d", os.path.abspath(c["extracted"]), "-o", c["tr_files"],
+            c["an_files"]]]},
+
+        {"name" : "count",
+        "inputs" : ["count.py", c["extracted"], c["tr_files"], c["an_files"]],
+        "outputs" : ["../results/db_count.txt", "../results/seq_count.txt",
+            c["records_files"]],
+        "commands" : [[py, "count.py", "-a", c["an_files"], "-t",
+            c["tr_files"], "-w", w]]},
+
+        {"name" : "tables",
+        "inputs" : ["tables.py", c["name_file"]] + c["csv_files"],
+        "outputs" : tables_outputs,
+        "commands" : [[py, "tables.py", "-c"] + c["csv_files"] + ["-nf",
+            c["name_file"]]]},
+
+        {"name" : "attributes",
+        "inputs" : ["attributes.py", c["records_files"], c["an_files"],
+            c["table_file"]],
+        "outputs" : [c["attribute_files"]],
+        "commands" : attributes},
+
+        {"name" : "add",
+        "inputs" : ["add.py", c["vertices_file"], c["attribute_files"]],
+        "outputs" : [c["nodes_file"]],
+        "commands" : [[py, "add.py", "-v", c["vertices_file"], "-o",
+            c["nodes_file"], "-a", c["attribute_files"]]]},
+
+        {"name" : "cat_tr",
+        "inputs" : [c["extracted"], c["tr_files"]],
+        "outputs" : [c["cat_tr"]],
+        "commands" : [f"cat {c['tr_files']} | xargs zcat -f > {c['cat_tr']}"]},
+
+        {"name" : "db",
+        "inputs" : [c["cat_tr"]],
+        "outputs" : [f"{c['db']}.dmnd"],
+        "commands" : [[c["diamond"], "makedb", "--in", c["cat_tr"], "--db",
+            c["db"]]]},
+
+        {"name" : "blastp",
+        "inputs" : ["blastp.py", c["cat_tr"], f"{c['db']}.dmnd"],
+        "outputs" : [c["ssn"]],
+        "commands" : [[py, "blastp.py", "-d", f"{c['db']}.dmnd", "-q",
+            c["cat_tr"], "-o", c["ssn"], "-e", str(c["evalue"]), "-s",
+            str(c["shards"]), "-j", w, "-x", c["diamond"]]]},
+
+        {"name" : "filter",
+        "inputs" : ["filter.py", c["ssn"]],
+        "outputs" : edges + [f"{e}_stats" for e in edges],
+        "commands" : [[py, "filter.py", "-n", c["ssn"], "-ov"]
+            + [str(j) for j in c["overlap"]] + ["-id"]
+            + [str(i) for i in c["identity"]]]},
+
+        {"name" : "network",
+        "inputs" : ["network.py", c["nodes_file"]] + edges,
+        "outputs" : [f"../results/{e.split('_')[-2]}_{e.split('_')[-1]}"
+            for e in edges],
+        "commands" : [[py, "network.py", "-e"] + edges + ["-v"]
+            + [c["nodes_file"]] * len(edges) + ["-p", w]]}
+    ]
+
+    return stages
+
+
+def main():
+    """
+    Main program function
+    """
+
+    # get arguments
+    args = arguments()
+
+    # the scripts and the paths of the workflow are relative to this
+    # directory
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    config = dict(CONFIG)
+    if args.config:
+        with open(args.config, "r") as f_in:
+            config.update(json.load(f_in))
+    if args.max_memory is not None:
+        config["max_memory"] = args.max_memory
+
+    # the budget is given to the programs by the environment, so that it
+    # does not change the fingerprint of the stages
+    if config["max_memory"] is not None:
+        os.environ["SSN_MAX_MEMORY"] = str(config["max_memory"])
+
+    stages = get_stages(config)
+    names = [stage["name"] for stage in stages]
+
+    for name in (args.stages or []) + args.force:
+        if name not in names:
+            print("*** ERROR ***")
+            print(f"Unknown stage {name}, the stages are : {' '.join(names)}")
+            quit()
+
+    # keep only the stages asked for and the stages they depend on
+    if args.stages:
+        deps = get_stage_dependencies(stages)
+        keep = set([])
+        todo = list(args.stages)
+        while todo:
+            name = todo.pop()
+            if name not in keep:
+                keep.add(name)
+                todo += list(deps[name])
+        stages = [stage for stage in stages if stage["name"] in keep]
+
+    set_phase("pipeline")
+    status = run_pipeline(stages, args.state, args.jobs, args.force,
+        args.dry_run)
+    add_count("stages run", list(status.values()).count("run"))
+
+    if "failed" in status.values():
+        print("*** ERROR ***")
+        print("Some stages failed, see ../results/logs")
+        quit()
+
+
+if __name__ == '__main__':
+    main()
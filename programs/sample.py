@@ -0,0 +1,119 @@
+"""
+This script draws a reproducible subsample of a diamond output, to choose
+the filtration parameters and check the outputs of network.py in minutes
+instead of hours: a uniform sample of the alignments, or all the alignments
+of a random subset of strains or of protein families. A report estimates
+the counts of the full input from those of the sample.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+A copy of the GNU General Public License is available at
+http://www.gnu.org/licenses/gpl-3.0.html
+"""
+
+__author__ = "KLEIN Dylan"
+__license__ = "GPL"
+__version__ = "1.0.0"
+__email__ = "klein.dylan@outlook.com"
+
+
+#================================== Modules ==================================#
+
+import argparse
+import os
+from modules.functions import *
+from modules.sample import *
+
+#=============================================================================#
+
+
+def arguments():
+    """
+    set arguments
+    """
+
+    parser = argparse.ArgumentParser()
+
+    # Mandatory arguments
+    parser.add_argument("-n", "--node_file", dest = "node_file",
+        type = isinput, required = True,
+        help = "the diamond output, \"-\" to read it from the standard \
+        input except in the families mode")
+    parser.add_argument("-o", "--output", dest = "output",
+        type = str, required = True,
+        help = "the sampled diamond output, read by filter.py")
+
+    # Optional arguments
+    parser.add_argument("-m", "--mode", dest = "mode",
+        type = str, required = False, default = "strains",
+        choices = ["uniform", "strains", "families"],
+        help = "a uniform sample of the alignments, or the alignments of a \
+        random subset of strains or of protein families")
+    parser.add_argument("-k", "--size", dest = "size",
+        type = int, required = False, default = 100000,
+        help = "the number of alignments of a uniform sample")
+    parser.add_argument("-f", "--fraction", dest = "fraction",
+        type = float, required = False, default = 0.1,
+        help = "the fraction of strains or of families sampled")
+    parser.add_argument("-s", "--seed", dest = "seed",
+        type = int, required = False, default = 0,
+        help = "the seed of the sample")
+    parser.add_argument("-v", "--vertices_file", dest = "vertices_file",
+        type = isfile, required = False, default = None,
+        help = "the vertices file of network.py, whose sampled vertices are \
+        saved in <output>_vertices.csv")
+
+    return parser.parse_args()
+
+
+def main():
+    """
+    Main program function
+    """
+
+    # get arguments
+    args = arguments()
+
+    if args.mode == "families" and not os.path.isfile(args.node_file):
+        print("*** ERROR ***")
+        print("The families mode reads the diamond output twice, it must be "
+            "a regular file")
+        quit()
+
+    if not 0 < args.fraction <= 1:
+        print("*** ERROR ***")
+        print("The fraction must be above 0 and at most 1")
+        quit()
+
+    set_phase(f"sample {args.mode}")
+    if args.mode == "uniform":
+        stats, keep = sample_uniform(args.node_file, args.output, args.size,
+            args.seed)
+    elif args.mode == "strains":
+        stats, keep = sample_strains(args.node_file, args.output,
+            args.fraction, args.seed)
+    else:
+        stats, keep = sample_families(args.node_file, args.output,
+            args.fraction, args.seed)
+    add_count("alignments", stats["alignments"])
+    add_count("alignments sampled", stats["sampled"])
+
+    if args.vertices_file:
+        set_phase("sample vertices")
+        output = f"{args.output}_vertices.csv"
+        nb = sample_vertices(args.vertices_file, output, keep)
+        print(f"nb of vertices in sample : {nb}, saved in {output}")
+
+    estimates = get_estimates(stats)
+    for line in save_report(f"{args.output}_report", stats, estimates):
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+This script is the single entry point of the programs: "python ssn.py find
+-h" runs find.py with the arguments following the name of the program. Each
+program imports only the libraries it needs, and "python ssn.py startup"
+measures the startup time of each program against its target.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+A copy of the GNU General Public License is available at
+http://www.gnu.org/licenses/gpl-3.0.html
+"""
+
+__author__ = "KLEIN Dylan"
+__license__ = "GPL"
+__version__ = "1.0.0"
+__email__ = "klein.dylan@outlook.com"
+
+
+#================================== Modules ==================================#
+
+import argparse
+import importlib
+import os
+import subprocess
+import sys
+import time
+
+#=============================================================================#
+
+
+# the programs, with the startup time targeted for each one, in seconds
+COMMANDS = {
+    "add" : 0.2,
+    "attributes" : 0.2,
+    "benchmark" : 0.2,
+    "blastp" : 0.2,
+    "count" : 0.2,
+    "estimate" : 0.2,
+    "filter" : 0.2,
+    "find" : 0.2,
+    "generate" : 0.2,
+    "network" : 1.5,
+    "pipeline" : 0.2,
+    "sample" : 0.2,
+    "stats" : 0.2,
+    "tables" : 0.2,
+    "tar" : 0.2
+}
+
+
+def arguments():
+    """
+    set arguments
+    """
+
+    parser = argparse.ArgumentParser(usage = "ssn.py command [arguments]")
+
+    # Mandatory arguments
+    parser.add_argument("command", choices = list(COMMANDS) + ["startup"],
+        help = "the program to run, or startup to measure the startup time \
+        of each program")
+    parser.add_argument("arguments", nargs = argparse.REMAINDER,
+        help = "the arguments of the program")
+
+    return parser.parse_args()
+
+
+def measure_startup(command, repeats):
+    """
+    Measures the startup time of a program, as the time needed to print its
+    help
+
+    Parameters
+    ----------
+
+        command : the name of the program
+        repeats : the number of measures
+
+    Returns
+    -------
+
+        the median time in seconds
+    """
+
+    times = []
+    for i in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, __file__, command, "-h"],
+            stdout = subprocess.DEVNULL, check = True)
+        times.append(time.perf_counter() - start)
+
+    return sorted(times)[len(times) // 2]
+
+
+def main():
+    """
+    Main program function
+    """
+
+    # get arguments
+    args = arguments()
+
+    if args.command == "startup":
+        repeats = int(args.arguments[0]) if args.arguments else 5
+        late = 0
+        print("command\ttarget\tmeasured")
+        for command, target in COMMANDS.items():
+            t = measure_startup(command, repeats)
+            late += t > target
+            print(f"{command}\t{target:.2f}\t{t:.2f}"
+                + ("\t*** TOO SLOW ***" if t > target else ""))
+        if late:
+            quit(1)
+        return
+
+    # run the program as if it was called directly, from its directory
+    sys.argv = [f"ssn.py {args.command}"] + args.arguments
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    importlib.import_module(args.command).main()
+
+
+if __name__ == '__main__':
+    main()
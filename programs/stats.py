@@ -0,0 +1,97 @@
+"""
+This script computes in a single pass over a diamond output, for many
+coverage and identity thresholds at once, the number of alignments, the
+number of distinct nodes over both columns, exactly or with HyperLogLog, and
+the degree histogram of the network of each threshold, without building the
+networks. This gives the density of each network before running network.py.
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+A copy of the GNU General Public License is available at
+http://www.gnu.org/licenses/gpl-3.0.html
+"""
+
+__author__ = "KLEIN Dylan"
+__license__ = "GPL"
+__version__ = "1.0.0"
+__email__ = "klein.dylan@outlook.com"
+
+
+#================================== Modules ==================================#
+
+import argparse
+from modules.functions import *
+from modules.stats import *
+
+#=============================================================================#
+
+
+def arguments():
+    """
+    set arguments
+    """
+
+    parser = argparse.ArgumentParser()
+
+    # Mandatory arguments
+    parser.add_argument("-n", "--node_file", dest = "node_file",
+        type = isinput, required = True,
+        help = "the diamond output, \"-\" to read it from the standard input")
+    parser.add_argument("-ov", "--overlap", dest = "overlap",
+        type = float, required = True, nargs = "+",
+        help = "the coverage thresholds")
+    parser.add_argument("-id", "--identity", dest = "identity",
+        type = float, required = True, nargs = "+",
+        help = "the identity thresholds")
+    parser.add_argument("-o", "--output", dest = "output",
+        type = str, required = True,
+        help = "the prefix of the output files")
+
+    # Optional arguments
+    parser.add_argument("-p", "--precision", dest = "precision",
+        type = int, required = False, default = 0,
+        help = "0 to count the distinct nodes exactly, else the precision of \
+        the HyperLogLog counting them, from 4 to 18, its relative error \
+        being 1.04 / sqrt(2 ** precision)")
+
+    return parser.parse_args()
+
+
+def main():
+    """
+    Main program function
+    """
+
+    # get arguments
+    args = arguments()
+
+    if args.precision and not 4 <= args.precision <= 18:
+        print("*** ERROR ***")
+        print("The precision must be 0, or from 4 to 18")
+        quit()
+
+    # the thresholds in the order of the outputs of filter.py
+    thresholds = [(j, i) for i in args.identity for j in args.overlap]
+
+    set_phase("stream statistics")
+    stats, grouped = get_stream_stats(args.node_file, thresholds,
+        args.precision)
+    add_count("thresholds", len(thresholds))
+
+    if not grouped:
+        print("WARNING : the alignments of some queries are not consecutive, "
+            "the degree histograms are wrong, count them exactly with -p 0")
+
+    rows = save_stream_stats(args.output, thresholds, stats)
+    for row in rows:
+        print("\t".join(str(v) for v in row))
+
+
+if __name__ == '__main__':
+    main()
@@ -25,6 +25,8 @@ __email__ = "klein.dylan@outlook.com"
 import argparse
 import csv
 from modules.functions import *
+from modules.tables import *
+from modules.add import write_rows
 
 #=============================================================================#
 
@@ -56,98 +58,52 @@ def main():
     # get arguments
     args = arguments()
 
-    # save all files in a list
-    files = [f for f in args.csv_files]
+    # load all files once
+    set_phase("read tables")
+    tables = []
+    for file in args.csv_files:
+        fieldnames_file, rows = read_csv_table(file)
+        tables.append((file, fieldnames_file, rows))
+        add_count("rows", len(rows))
 
     # get fieldsnames for all files
     fieldnames = []
-    fieldnames = determine_fieldnames(files, fieldnames)
-
-    # initiate two lists and an index
-    r_ids = []
-    row_ids = []
-    index = 0
-
-    # while files exists
-    while files:
-
-        # if condition is "true", set an output filename and opens it
-        if len(files) == 1:
-            f_name = "MetDB_full_verified.csv"
-            f_out = open(f_name, "w")
-
-        elif index == 0:
-            f_name = "metdb_with_ID.csv"
-            f_out = open(f_name, "w")
-
-        else:
-            file = tempfile.NamedTemporaryFile()
-            f_name = file.name
-            f_out = open(f_name, "w")
-
-        # write header of the output file
-        writer = csv.DictWriter(f_out, fieldnames = fieldnames)
-        writer.writeheader()
-
-        if index == 0:
-
-            # for each row in the first csv file
-            for row in read_csv(files[0]):
-
-                # get new row
-                new_row = add_id(row, args.name_file)
-                
-                # if new_row is not empty, write it in the output, 
-                # else, write the row in the output
-                if new_row:
-                    writer.writerow(new_row)
-                else:
-                    writer.writerow(row)        
-        else:
-
-            # determine fieldnames of the first file in files list
-            fieldnames_file = []
-            fieldnames_file = determine_fieldnames(files[0], fieldnames_file)
-            
-            # get common fielnames between first file fieldnames and all fieldnames
-            common_fieldnames = set(fieldnames_file) & set(fieldnames)
-            
-            # if there is >= 1 fieldname(s), set the common column, 
-            # else, raise an error and end the script
-            if len(common_fieldnames) >= 1:
-                common_column = search_for_word(common_fieldnames, "ID")
-            else:
-                print("ERROR : Your files have no common column names")
-                break
-
-            # if there is a common column
-            if common_column:
-                
-                # for each row in the previous file created
-                for row in read_csv(previous_file_name):
-                    
-                    # get new row to write it in the new file
-                    new_row = get_new_row(row, common_column, files[0])
-                    
-                    # if new_row is not empty, write it in the output, 
-                    # else, write the row in the output
-                    if new_row:
-                        writer.writerow(new_row)
-                    else:                    
-                        writer.writerow(row)
-            # if there is not a common colum, raise an error and end the script
-            else:
-                print("ERROR : Common column not found")
-                break
-
-        # remove the first filename from the file list
-        files.remove(files[0])
-
-        index += 1
-
-        # set the previous file name as the name of the output file
-        # it just created
-        previous_file_name = f_name
+    for file, fieldnames_file, rows in tables:
+        for h in fieldnames_file:
+            if h not in fieldnames:
+                fieldnames.append(h)
+
+    # index the file containing all metdb ids
+    set_phase("merge")
+    name_index = get_name_index(args.name_file)
+
+    # add the metdb ids to the first file and merge all the other files
+    # into it
+    try:
+        with_id, rows, unmatched = merge_tables(tables, name_index)
+    except ValueError as e:
+        print(f"ERROR : {e}")
+        quit()
+
+    # save the first file with the ids if other files were merged into it,
+    # then the merged file
+    set_phase("write")
+    outputs = [("MetDB_full_verified.csv", rows)]
+    if len(tables) > 1:
+        outputs.insert(0, ("metdb_with_ID.csv", with_id))
+
+    for f_name, out_rows in outputs:
+        with open(f_name, "w") as f_out:
+            writer = csv.DictWriter(f_out, fieldnames = fieldnames)
+            writer.writeheader()
+            write_rows(writer, out_rows)
+
+    # report the rows that did not match
+    for file, fieldnames_file, rows in tables:
+        n = len([u for u in unmatched if u[0] == file])
+        print(f"{file} : {n} rows not matched")
+
+    save_unmatched(unmatched, "unmatched_rows.tsv")
 
 
 if __name__ == '__main__':
@@ -23,6 +23,7 @@ __email__ = "klein.dylan@outlook.com"
 
 import argparse
 from modules.functions import *
+from modules.tar import *
 
 #=============================================================================#
 
@@ -39,6 +40,21 @@ def arguments():
         type = isfile, required = True,
         help = "Tar.gz file")
 
+    # Optional arguments
+    parser.add_argument("-o", "--output", dest = "output",
+        type = str, required = False, default = "./extracted_files",
+        help = "the directory where to save the compressed files")
+    parser.add_argument("-w", "--workers", dest = "workers",
+        type = int, required = False, default = 1,
+        help = "the number of threads compressing the files")
+    parser.add_argument("-m", "--max_memory", dest = "max_memory",
+        type = int, required = False, default = 1024,
+        help = "the memory budget of the files waiting to be compressed, \
+        in MB")
+    parser.add_argument("-p", "--pattern", dest = "pattern",
+        type = str, required = False, default = None,
+        help = "a pattern the names of the files to compress must match")
+
     return parser.parse_args()
 
 
@@ -50,8 +66,10 @@ def main():
     # get arguments
     args = arguments()
 
-    # extract the tar.gz file
-    extract_compress_tar_file(args.tar_file)
+    # compress each file of the tar.gz file
+    set_phase("extract")
+    extract_compress_tar_file(args.tar_file, args.output, args.workers,
+        args.max_memory * 1024 * 1024, args.pattern)
 
 if __name__ == '__main__':
 	main()
\ No newline at end of file